@@ -17,6 +17,25 @@ $(function(){
     $("#nav-items img").not(".control").click(function(){
         const page_id = $(this).attr('data-for');
         showPopPage(page_id);
+        if (page_id == 'pop-settings') {
+            loadDiagnostics();
+        }
+    });
+
+    $("#diagnostics-refresh").click(loadDiagnostics);
+    $("#diagnostics-trace").click(function(){
+        pywebview.api.export_trace().then(function(path){
+            if (path) {
+                showPopMessage('', '已导出至 ' + path);
+            } else {
+                showPopMessage('', '未开启追踪 (TRACING)');
+            }
+        });
+    });
+    $("#diagnostics-export").click(function(){
+        pywebview.api.export_metrics().then(function(path){
+            showPopMessage('', '已导出至 ' + path);
+        });
     });
 
     $(".pop-close").click(function(){
@@ -39,48 +58,26 @@ $(function(){
     // set first page at starting
     $(".frame-head>span:last-child").click();
 
-    $(".tree-root").on("click", ".directory, .file-folder", function(e){
-        $(this).children("ul").slideToggle(300);
-        $(this).children("img").toggleClass("arrow-expanded");
-        e.stopPropagation();
-    });
-    $(".tree-root").on("click", ".file", function(e){
+    $(".tree-root").on("click", ".directory, .file-folder, .file", function(e){
         const $this = $(this);
-        // avoid reloading file
+        e.stopPropagation();
         if ($this.attr("data-loaded")){
-            $(this).children("ul").slideToggle(300);
-            $(this).children("img").toggleClass("arrow-expanded");
-            e.stopPropagation();
+            toggleTreeNode($this);
             return;
         }
-        
-        /* Load file data */
-        // get file path
-        let paths = new Array();
-        for (let $li = $this;;){
-            paths.push($li.attr("data-name"));
-            
-            let $upper_li = $li.parent("ul").parent("li");
-            if (!$upper_li.length){
-                break;
-            }
-            $li = $upper_li;
+
+        // load children only when expanded for the first time
+        $this.attr("data-loaded", true);
+        let $tree = $this.children("ul");
+        if (!$tree.length) {
+            $tree = $("<ul>").hide().appendTo($this);
+            $('<img src="svg/arrow.svg"/>').prependTo($this);
         }
-        paths = paths.reverse()
-        console.log(paths);
-
-        // require tree and update DOM 
-        const tree = pywebview.api.load_folder_file(paths).then(function(tree){
-            console.log(tree);
-
-            let $tree = $("<ul>").appendTo($this);
-            setFileTree($tree, tree);
-            $('<img src="svg/arrow.svg" class="arrow-expanded"/>'
-                ).prependTo($this);
-            $this.attr("data-loaded", true);
+        loadTreeLevel($tree, 0).then(function(){
+            toggleTreeNode($this);
         });
-        e.stopPropagation();
     });
+    $(".simplebar-content-wrapper").on("scroll", prefetchVisible);
     $(".tree-root").on("click", ".file-entry", function(e){
         const code = $(this).children(".std-code").text();
         const title = $(this).children(".std-title").text();
@@ -91,6 +88,11 @@ $(function(){
     // fix mask position messed by simplebar
     $("#search-mask").prependTo($(".frame-body"));
     
+    // clicking a mask cancels what it's waiting for
+    $("#search-mask, #loading-mask").click(function(){
+        cancelJob($(this).data("job"));
+    });
+
     $("#search-input").keydown(function(event) {
         if (event.key !== 'Enter') {
             return
@@ -113,7 +115,12 @@ $(function(){
             } 
             $("#search-mask").fadeIn(100);
 
-            pywebview.api.search_standards(query).then(function(standards) {
+            const search = runJob('search_standards', [query]);
+            $("#search-mask").data("job", search.jobId);
+            search.catch(function() {
+                $("#search-mask").fadeOut(200);
+            });
+            search.then(function(standards) {
                 if (standards == 'TOO_MANY_RESULTS') {
                     $results.append($("<p>结果过多，请更换搜索词</p>"));
                     $("#search-mask").fadeOut(200);
@@ -148,7 +155,16 @@ $(function(){
         $icons.hide();
         $icons.filter("#standard-downloading").show();
 
-        pywebview.api.download_standard(code).then(function(status){
+        const download = runJob('download_standard', [code]);
+        $("#standard-downloading").data("job", download.jobId);
+        download.catch(function(error){
+            $icons.filter("#standard-downloading").hide();
+            $icons.filter("#standard-download").show();
+            if (error != 'CANCELLED') {
+                showPopMessage('', code+' 下载失败');
+            }
+        });
+        download.then(function(status){
             $icons.filter("#standard-downloading").hide();
             if (status==true){
                 $icons.filter("#standard-downloaded").show();
@@ -163,6 +179,9 @@ $(function(){
             } 
         });
     });
+    $("#standard-downloading").click(function(){
+        cancelJob($(this).data("job"));
+    });
     $("#standard-downloaded").click(function(){
         let code = $("#standard-main").attr("data-code");
         pywebview.api.open_standard_pdf(code).then(function(success){
@@ -196,7 +215,13 @@ function setStandard(code, title) {
     }
     
     $("#loading-mask").fadeIn(100);
-    pywebview.api.get_fields(code, fields).then(function(results){
+    const loading = runJob('get_fields', [code, fields, ['substitute']]);
+    $("#loading-mask").data("job", loading.jobId);
+    loading.catch(function(){
+        $("#loading-mask").fadeOut(200);
+        $main.removeAttr('data-code');
+    });
+    loading.then(function(results){
         console.log(results);
         $("#loading-mask").fadeOut(200);
         $main.show();
@@ -209,21 +234,188 @@ function setStandard(code, title) {
         for (const field in results){
             $("#standard-"+field).text(results[field]);
         }
-        if (results['status'] == '过时') {
-            pywebview.api.get_fields(code, ['substitute']
-            ).then(function(results){
-                $("#standard-substitute").text(results['substitute']).parent().show();
-            });
+        // only returned for obsolete standards
+        if ('substitute' in results) {
+            $("#standard-substitute").parent().show();
         } else {
             $("#standard-substitute").parent().hide();
         }
 
         $("#standard-download-icon>img").hide();
-        if ($("#downloaded-root").find(".std-code:contains("+code+")").length) {
-            $("#standard-downloaded").show();
-        } else {
-            $("#standard-download").show();
+        pywebview.api.is_downloaded(code).then(function(downloaded){
+            if (downloaded) {
+                $("#standard-downloaded").show();
+            } else {
+                $("#standard-download").show();
+            }
+        });
+    });
+}
+
+function onFieldRefreshed(code, field, value) {
+    // a stale field was refreshed in background
+    if (code != $("#standard-main").attr('data-code')) {
+        return;
+    }
+    $("#standard-"+field).text(value);
+}
+
+let jobs = {};
+let jobCount = 0;
+function runJob(method, args, onProgress) {
+    // run an api method in background, return a promise of its result
+    //  with `jobId` to cancel it
+    const jobId = 'js-' + (++jobCount);
+    const promise = new Promise(function(resolve, reject){
+        jobs[jobId] = {'resolve': resolve, 'reject': reject, 'onProgress': onProgress};
+    });
+    promise.jobId = jobId;
+    pywebview.api.start_job(jobId, method, args).catch(function(error){
+        onJobError(jobId, String(error));
+    });
+    return promise;
+}
+function cancelJob(jobId) {
+    if (jobId in jobs) {
+        pywebview.api.cancel_job(jobId);
+    }
+}
+function onJobResult(jobId, result) {
+    const job = jobs[jobId];
+    delete jobs[jobId];
+    if (job) {
+        job.resolve(result);
+    }
+}
+function onJobError(jobId, error) {
+    const job = jobs[jobId];
+    delete jobs[jobId];
+    console.log(jobId, error);
+    if (job) {
+        job.reject(error);
+    }
+}
+function onJobCancelled(jobId) {
+    onJobError(jobId, 'CANCELLED');
+}
+function onJobProgress(jobId, done, total, message) {
+    const job = jobs[jobId];
+    if (job && job.onProgress) {
+        job.onProgress(done, total, message);
+    }
+}
+
+let fieldsBatches = {};
+let fieldsBatchCount = 0;
+function getFieldsBatch(codes, fields, dependent, onResult, onDone, level) {
+    // results of each code are pushed back by `onFieldsBatch`, codes
+    //  not fetched yet are dropped by a later batch of the same `level`
+    const batchId = ++fieldsBatchCount;
+    fieldsBatches[batchId] = {'onResult': onResult, 'onDone': onDone};
+    pywebview.api.get_fields_batch(batchId, codes, fields, dependent, level);
+}
+function onFieldsBatch(batchId, code, results) {
+    const batch = fieldsBatches[batchId];
+    if (batch && results) {
+        batch.onResult(code, results);
+    }
+}
+function onFieldsBatchDone(batchId) {
+    const batch = fieldsBatches[batchId];
+    delete fieldsBatches[batchId];
+    if (batch && batch.onDone) {
+        batch.onDone();
+    }
+}
+
+let statusBatches = {};
+function annotateStatus($tree, level) {
+    // show status badges of all standards in a tree with a single call,
+    //  along with those of the last batch of the level not shown yet
+    const key = JSON.stringify(level);
+    const last = statusBatches[key];
+    let entries = last ? last.entries : {};
+    $tree.find(".file-entry>.std-code").each(function(){
+        const code = $(this).text();
+        (entries[code] = entries[code] || []).push(this);
+    });
+    const codes = Object.keys(entries);
+    if (!codes.length) {
+        return;
+    }
+    const batch = statusBatches[key] = {'entries': entries};
+    getFieldsBatch(codes, ['status'], [], function(code, results){
+        $(entries[code]).attr("data-status", results['status']);
+        delete entries[code];
+    }, function(){
+        if (statusBatches[key] === batch) {
+            delete statusBatches[key];
+        }
+    }, level);
+}
+
+let prefetchTimer = null;
+function prefetchVisible() {
+    // let the api prefetch standards shown in the folder tree,
+    //  debounced so that scrolling doesn't flood the bridge
+    clearTimeout(prefetchTimer);
+    prefetchTimer = setTimeout(function(){
+        const $root = $("#folder-root");
+        const wrapper = $root.closest(".simplebar-content-wrapper")[0];
+        if (!wrapper || !$root.is(":visible")) {
+            return;
         }
+        const view = wrapper.getBoundingClientRect();
+        let codes = [];
+        $root.find(".file-entry:visible").each(function(){
+            const rect = this.getBoundingClientRect();
+            if (rect.bottom > view.top && rect.top < view.bottom) {
+                codes.push($(this).children(".std-code").text());
+            }
+        });
+        if (codes.length) {
+            pywebview.api.prefetch_standards(codes);
+        }
+    }, 200);
+}
+
+function formatBytes(bytes) {
+    const units = ['B', 'KB', 'MB', 'GB'];
+    let index = 0;
+    while (bytes >= 1024 && index < units.length-1) {
+        bytes /= 1024;
+        index++;
+    }
+    return (index ? bytes.toFixed(1) : bytes) + units[index];
+}
+
+function loadDiagnostics() {
+    // show metrics summarized per origin and per field
+    pywebview.api.get_metrics().then(function(summary){
+        const $origins = $("#diagnostics-origins tbody").empty();
+        $.each(summary.origins, function(name, origin){
+            $("<tr>").append(
+                $("<td>").text(name),
+                $("<td>").text(origin.requests),
+                $("<td>").text(origin.errors),
+                $("<td>").text(formatBytes(origin.bytes)),
+                $("<td>").text(origin.latency_p50 ? '≤'+origin.latency_p50+'s' : '-'),
+                $("<td>").text(origin.latency_p90 ? '≤'+origin.latency_p90+'s' : '-'),
+                $("<td>").text(origin.page_fetches),
+                $("<td>").text(origin.page_errors),
+            ).appendTo($origins);
+        });
+
+        const $fields = $("#diagnostics-fields tbody").empty();
+        $.each(summary.fields, function(name, field){
+            const total = field.hits + field.misses;
+            $("<tr>").append(
+                $("<td>").text(name),
+                $("<td>").text(field.hits),
+                $("<td>").text(field.misses),
+                $("<td>").text(total ? Math.round(field.hits/total*100)+'%' : '-'),
+            ).appendTo($fields);
+        });
     });
 }
 
@@ -304,60 +496,115 @@ function showBZOrgLoginMessage(url){
     showPopMessage('登录', $message, button);
 }
 
-function setTree(node, tree, nodeClass, endNodeClass) {
-    node.children().remove();
-    for (const subnode of tree){
-        let $subnode;
-        if (!Array.isArray(subnode)){
-            $subnode = $(
-                '<li class="'+endNodeClass+'"></li>'
-                );
+function toggleTreeNode($node) {
+    $node.children("ul").slideToggle(300, prefetchVisible);
+    $node.children("img").toggleClass("arrow-expanded");
+}
+
+function getNodePaths($tree) {
+    // names of the nodes from the tree root down to `$tree`, split at
+    //  the classification file if any: [paths, node path in the file]
+    let paths = [];
+    let nodePath = null;
+    const nodes = $tree.parentsUntil("[data-kind]", "li").get().reverse();
+    for (const node of nodes) {
+        const name = $(node).attr("data-name");
+        if (nodePath !== null) {
+            nodePath.push(name);
+            continue;
+        }
+        paths.push(name);
+        if ($(node).hasClass("file")) {
+            nodePath = [];
+        }
+    }
+    return [paths, nodePath];
+}
+
+const moreObserver = new IntersectionObserver(function(entries){
+    // load the next page once the end of a level is scrolled to
+    for (const entry of entries) {
+        if (!entry.isIntersecting) {
+            continue;
+        }
+        moreObserver.unobserve(entry.target);
+        const $more = $(entry.target);
+        loadTreeLevel($more.parent("ul"), parseInt($more.attr("data-cursor")));
+    }
+});
+
+function loadTreeLevel($tree, cursor) {
+    // append a page of the children of `$tree`
+    const kind = $tree.closest("[data-kind]").attr("data-kind");
+    const [paths, nodePath] = getNodePaths($tree);
+    let request, nodeClass, endNodeClass;
+    if (nodePath !== null) {
+        request = pywebview.api.load_folder_file_level(paths, nodePath, cursor);
+        [nodeClass, endNodeClass] = ['file-folder', 'file-entry'];
+    } else if (kind == 'folder') {
+        request = pywebview.api.load_folder_level(paths, cursor);
+        [nodeClass, endNodeClass] = ['directory', 'file'];
+    } else {
+        request = pywebview.api.load_local_level(paths, cursor);
+        [nodeClass, endNodeClass] = ['file-folder', 'file-entry'];
+    }
+
+    return request.then(function(page){
+        $tree.children(".tree-more").remove();
+        if (!page) {
+            return;
+        }
+        const $nodes = appendTreeNodes($tree, page.nodes, nodeClass, endNodeClass);
+        if (page.cursor !== null) {
+            const $more = $('<li class="tree-more">…</li>')
+                .attr("data-cursor", page.cursor)
+                .appendTo($tree);
+            moreObserver.observe($more[0]);
+        }
+        if (nodePath !== null) {
+            annotateStatus($nodes, [paths, nodePath]);
+        }
+        prefetchVisible();
+    });
+}
+
+function appendTreeNodes($tree, nodes, nodeClass, endNodeClass) {
+    // sub-nodes are `[name, null]` and loaded when expanded
+    let $nodes = $();
+    for (const node of nodes){
+        let $node;
+        if (!Array.isArray(node)){
+            $node = $('<li>').addClass(endNodeClass);
             if (endNodeClass=='file'){
-                $subnode.attr('data-name', subnode);
-                text = subnode.split(".", 1)[0];
-                $("<span>").text(text).appendTo($subnode);
+                $node.attr('data-name', node);
+                $("<span>").text(node.split(".", 1)[0]).appendTo($node);
             } else if (endNodeClass=='file-entry'){
-                $('<p class="std-title">').text(subnode.title).appendTo($subnode);
-                $('<p class="std-code">').text(subnode.code).prependTo($subnode);
+                $('<p class="std-code">').text(node.code).appendTo($node);
+                $('<p class="std-title">').text(node.title).appendTo($node);
             }
         } else {
-            let name = subnode[0];
+            let name = node[0];
             if (name.indexOf("_") != -1) {
                 name = name.split("_").pop();
             }
-            $subnode = $('<li class="'+nodeClass+'" data-name="'+subnode[0]+'">' +
-                '<img src="svg/arrow.svg"/>' +
-                "<span>"+name+"</span>" +
-                "<ul></ul>" +
-                "</li>");
-            setTree(
-                $subnode.children("ul"),
-                subnode[1],
-                nodeClass,
-                endNodeClass
-                );
+            $node = $('<li>').addClass(nodeClass).attr('data-name', node[0])
+                .append('<img src="svg/arrow.svg"/>')
+                .append($("<span>").text(name))
+                .append($("<ul>").hide());
         }
-        $subnode.children("ul").slideUp(0);
-        $subnode.appendTo(node);
+        $node.appendTo($tree);
+        $nodes = $nodes.add($node);
     }
-}
-function setDirectoryTree(node, tree){
-    setTree(node, tree, 'directory', 'file');
-}
-function setFileTree(node, tree){
-    setTree(node, tree, 'file-folder', 'file-entry');
+    return $nodes;
 }
 
 function load_local_tree(){
-    pywebview.api.load_local().then(function(tree){
-        console.log(tree);
-        setFileTree($("#downloaded-root"), tree);
-    });
+    const $tree = $("#downloaded-root");
+    $tree.children().remove();
+    loadTreeLevel($tree, 0);
 }
 
 window.addEventListener("pywebviewready", function(){
-    pywebview.api.load_folder().then(function(tree){
-        setDirectoryTree($("#folder-root"), tree);
-    });
+    loadTreeLevel($("#folder-root"), 0);
     load_local_tree();
 });
\ No newline at end of file
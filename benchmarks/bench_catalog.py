@@ -0,0 +1,87 @@
+"""Benchmark memory per standard of `Standard` objects vs a `Catalog`.
+
+Run from the repository root:
+    python -m benchmarks.bench_catalog [-n NUMBER]
+"""
+import time
+import random
+import tracemalloc
+from argparse import ArgumentParser
+
+from sscn.standard import Standard, StandardCode, Status
+from sscn.catalog import Catalog
+
+
+ISSUERS = ('中华人民共和国住房和城乡建设部', '国家市场监督管理总局',
+           '中华人民共和国工业和信息化部')
+
+
+def make_standards(number, seed=0):
+    """Make `number` fake `(code, fields)` of distinct standards."""
+    rand = random.Random(seed)
+    for index in range(number):
+        year = rand.randint(1990, 2023)
+        yield StandardCode(
+            number=index+1, prefix=rand.choice(('GB', 'JGJ', 'CJJ')),
+            is_mandatory=rand.random() < 0.3, year=year,
+        ), {
+            'title': f'某某工程技术标准{index}',
+            'issued_by': rand.choice(ISSUERS),
+            'status': rand.choice(tuple(Status)),
+            'issuance_date': f'{year}-0{rand.randint(1, 9)}-1{rand.randint(0, 9)}',
+            'implementation_date': f'{year+1}-0{rand.randint(1, 9)}-0{rand.randint(1, 9)}',
+        }
+
+
+def measure(build, standards):
+    """Return bytes per standard allocated by `build(standards)`
+    and seconds taken.
+    """
+    start = time.perf_counter()
+    build(standards)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    # pylint: disable=unused-variable
+    # kept alive to be measured
+    kept = build(standards)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(standards), seconds
+
+
+def build_standards(standards):
+    """Hold `standards` as `Standard` objects."""
+    return [Standard(code, **fields) for code, fields in standards]
+
+
+def build_catalog(standards):
+    """Hold `standards` in a `Catalog`."""
+    catalog = Catalog()
+    for code, fields in standards:
+        catalog.add(code, **fields)
+    catalog.get(standards[0][0])     # sort
+    return catalog
+
+
+def bench(number):
+    """Compare holding `number` standards as objects and in a catalog."""
+    standards = list(make_standards(number))
+    # titles are unique strs whatever the structure, so also measure without
+    untitled = [(code, dict(fields, title=None)) for code, fields in standards]
+
+    print(f'{number} standards{"bytes/std":>18}{"untitled":>10}{"build s":>10}')
+    for name, build in (('Standard', build_standards),
+                        ('Catalog', build_catalog)):
+        per_standard, seconds = measure(build, standards)
+        per_untitled, _ = measure(build, untitled)
+        print(f'{name:<20}{per_standard:>12.1f}{per_untitled:>10.1f}'
+              f'{seconds:>10.2f}')
+
+
+argparser = ArgumentParser(description=__doc__.splitlines()[0])
+argparser.add_argument('-n', '--number', type=int, default=100000)
+
+
+if __name__ == '__main__':
+    bench(**vars(argparser.parse_args()))
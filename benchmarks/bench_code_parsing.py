@@ -0,0 +1,105 @@
+"""Microbenchmark `StandardCode` parsing over mixed-format codes.
+
+Run from the repository root:
+    python -m benchmarks.bench_code_parsing [-n NUMBER] [--distinct DISTINCT]
+"""
+import time
+import random
+from argparse import ArgumentParser
+
+from sscn.standard import StandardCode
+
+
+PREFIXES = ('GB', 'GBJ', 'JGJ', 'JG', 'CJJ', 'CJ', 'JCJ', 'JC')
+FORMATS = (
+    '{prefix}{t} {number}-{year}',
+    '{prefix}{t}{number}-{year}',
+    '{prefix}_{t}{number}_{year}',
+    '{prefix_lower}{t_lower} {number} {year}',
+    '{prefix}{t} {number}-{short_year}',
+    '〖{prefix}{t}{number}-{year}〗 某某标准',
+)
+
+
+def make_codes(number, distinct, seed=0):
+    """Make `number` code strs in mixed formats of `distinct` standards."""
+    rand = random.Random(seed)
+    standards = [
+        (rand.choice(PREFIXES), rand.choice(('', '/T')),
+         rand.randint(1, 59999), rand.randint(1990, 2023))
+        for _ in range(distinct)
+    ]
+    codes = []
+    for _ in range(number):
+        prefix, t, num, year = rand.choice(standards)
+        codes.append(rand.choice(FORMATS).format(
+            prefix=prefix, prefix_lower=prefix.lower(),
+            t=t, t_lower=t.lower(),
+            number=num, year=year, short_year=str(year)[2:]
+            if year < 2000 else year,
+        ))
+    return codes
+
+
+def timed(func, *args):
+    """Return seconds taken by calling `func(*args)`."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def parse_all(codes):
+    """Parse every code one by one."""
+    parse = StandardCode.parse
+    for code in codes:
+        parse(code)
+
+
+def parse_uncached(codes):
+    """Parse every code without memoizing or interning, as parsing
+    costs without any cache.
+    """
+    pattern = StandardCode.CODE_PATTERN
+    for code in codes:
+        StandardCode.from_match(pattern.search(code.strip().upper()), intern=False)
+
+
+def parse_cold(func, arg):
+    """Call `func(arg)` with nothing cached."""
+    StandardCode.clear_cache()
+    return timed(func, arg)
+
+
+def bench(number, distinct):
+    """Time parsing `number` codes of `distinct` standards."""
+    codes = make_codes(number, distinct)
+    # every code str once, so that none is parsed from the cache
+    unique = list(dict.fromkeys(codes))
+
+    cold = {
+        'uncached': parse_cold(parse_uncached, unique),
+        'cold parse': parse_cold(parse_all, unique),
+        'cold parse_many': parse_cold(StandardCode.parse_many, '\n'.join(unique)),
+    }
+    StandardCode.clear_cache()
+    warm = {
+        'mixed parse': timed(parse_all, codes),
+        'warm parse': timed(parse_all, codes),
+        'warm parse_many': timed(StandardCode.parse_many, '\n'.join(codes)),
+    }
+    for title, count, results in (
+            (f'{len(unique)} distinct code strs', len(unique), cold),
+            (f'{number} codes of {distinct} distinct standards', number, warm)):
+        print(title)
+        for name, seconds in results.items():
+            print(f'{name:<16}{seconds*1000:>10.1f} ms'
+                  f'{seconds/count*1e9:>10.0f} ns/code')
+
+
+argparser = ArgumentParser(description=__doc__.splitlines()[0])
+argparser.add_argument('-n', '--number', type=int, default=300000)
+argparser.add_argument('--distinct', type=int, default=5000)
+
+
+if __name__ == '__main__':
+    bench(**vars(argparser.parse_args()))
@@ -0,0 +1,61 @@
+"""Benchmark the CPU cost of decoding origin pages with and without
+a declared encoding.
+
+Without a charset in the http headers, `requests` sniffs the encoding
+of the whole body. Run from the repository root:
+    python -m benchmarks.bench_encoding [-n NUMBER]
+"""
+import time
+import timeit
+from argparse import ArgumentParser
+
+from sscn.settings import settings
+from sscn.standard import Standard, StandardCode
+from tests.fixtures import FIXTURE_PAGES, make_response
+
+
+def parse_page(page_cls, origin, fixture):
+    """Parse one fixture page the way `Page.fetch` does."""
+    page = page_cls(origin)
+    response = make_response(fixture)
+    page.url = response.url
+    return page.parse_response(response)
+
+
+def cpu_time_per_page(func, number):
+    """Return the CPU time in ms taken by `func` per call."""
+    return min(timeit.repeat(
+        func, timer=time.process_time, number=number, repeat=3,
+        )) / number * 1000
+
+
+def bench(number):
+    """Time parsing every fixture page with and without declaring encodings."""
+    std = Standard(StandardCode.parse('GB 50016-2014'))
+    print(f'{"page (cpu ms)":<20}{"sniffed":>10}{"declared":>10}'
+          f'{"lxml bytes":>12}{"saved":>10}')
+
+    for origin_cls, page_cls, fixture in FIXTURE_PAGES:
+        origin = origin_cls(std)
+        origin_encoding = origin_cls.encoding
+        bench_parse = lambda: parse_page(page_cls, origin, fixture)  # pylint: disable=cell-var-from-loop
+
+        timings = []
+        for encoding, fast_path in (
+                (None, False), (origin_encoding, False), (origin_encoding, True)):
+            origin_cls.encoding = encoding
+            settings['LXML_FAST_PATH'] = fast_path
+            timings.append(cpu_time_per_page(bench_parse, number))
+        origin_cls.encoding = origin_encoding
+
+        print(f'{fixture:<20}{timings[0]:>10.3f}{timings[1]:>10.3f}'
+              f'{timings[2]:>12.3f}{timings[0]-timings[1]:>10.3f}')
+    settings['LXML_FAST_PATH'] = False
+
+
+argparser = ArgumentParser(description=__doc__.splitlines()[0])
+argparser.add_argument('-n', '--number', type=int, default=50)
+
+
+if __name__ == '__main__':
+    bench(**vars(argparser.parse_args()))
@@ -0,0 +1,62 @@
+"""Benchmark memory retained by standards after fetching their pages.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory [-n NUMBER]
+"""
+import tracemalloc
+from argparse import ArgumentParser
+from unittest.mock import patch
+
+from sscn.settings import settings
+from sscn.standard import Standard, StandardCode
+from sscn.supersession import SupersessionGraph
+from tests.fixtures import FIXTURES, FIXTURE_PAGES, make_response
+
+
+def fetch_standard(code):
+    """Make a standard and fetch every fixture page of it."""
+    std = Standard(code)
+    for origin_cls, page_cls, fixture in FIXTURE_PAGES:
+        page = std.get_subnode(origin_cls).get_subnode(page_cls)
+        with patch.object(page_cls, 'get_url',
+                          return_value=FIXTURES[fixture][0]), \
+             patch.object(origin_cls, 'request',
+                          side_effect=lambda *args, fixture=fixture, **kwargs:
+                              make_response(fixture)):
+            page.fetch()
+    return std
+
+
+def measure(number, code):
+    """Return bytes per standard retained after fetching `number` ones."""
+    tracemalloc.start()
+    # pylint: disable=unused-variable
+    # kept alive to be measured
+    kept = [fetch_standard(code) for _ in range(number)]
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / number, peak / number
+
+
+def bench(number):
+    """Compare memory retained with and without releasing responses."""
+    code = StandardCode.parse('GB 50016-2014')
+
+    print(f'{number} standards{"bytes/std":>18}{"peak/std":>12}')
+    # don't record fetched substitutes into the cached graph
+    with patch('sscn.origins.csres.graph', SupersessionGraph(':memory:')):
+        fetch_standard(code)    # warm up caches of compiled xpaths etc.
+        for release in (False, True):
+            settings['RELEASE_RESPONSES'] = release
+            per_standard, peak = measure(number, code)
+            print(f'{"release" if release else "keep":<20}'
+                  f'{per_standard:>12.1f}{peak:>12.1f}')
+    settings.user_settings.pop('RELEASE_RESPONSES', None)
+
+
+argparser = ArgumentParser(description=__doc__.splitlines()[0])
+argparser.add_argument('-n', '--number', type=int, default=200)
+
+
+if __name__ == '__main__':
+    bench(**vars(argparser.parse_args()))
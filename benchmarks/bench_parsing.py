@@ -0,0 +1,67 @@
+"""Benchmark html parsing and field extraction over saved origin pages.
+
+Run from the repository root:
+    python -m benchmarks.bench_parsing [-n NUMBER]
+"""
+import timeit
+from argparse import ArgumentParser
+
+from sscn.settings import settings
+from sscn.standard import Standard, StandardCode
+from tests.fixtures import FIXTURE_PAGES, make_response
+
+
+def parse_page(origin, page_cls, fixture):
+    """Parse one fixture page the way `Page.fetch` does."""
+    page = page_cls(origin)
+    response = make_response(fixture)
+    page.url = response.url
+    content = page.parse_response(response)
+    return page.extract_fields(content)
+
+
+# mode name: settings to apply
+MODES = {
+    'parsel': {'LXML_FAST_PATH': False, 'INCREMENTAL_SEARCH_PARSE': False},
+    'lxml': {'LXML_FAST_PATH': True, 'INCREMENTAL_SEARCH_PARSE': False},
+    'incremental': {'LXML_FAST_PATH': True, 'INCREMENTAL_SEARCH_PARSE': True},
+}
+
+
+def print_row(name, timings):
+    """Print timings in ms and the speedup of the last mode."""
+    print(f'{name:<20}'
+          + ''.join(f'{timing:>14.3f}' for timing in timings)
+          + f'{timings[0]/timings[-1]:>9.2f}x')
+
+
+def bench(number):
+    """Time every fixture page under every parse mode."""
+    std = Standard(StandardCode.parse('GB 50016-2014'))
+    print(f'{"page (ms)":<20}'
+          + ''.join(f'{mode:>14}' for mode in MODES)
+          + f'{"speedup":>10}')
+
+    totals = [0] * len(MODES)
+    for origin_cls, page_cls, fixture in FIXTURE_PAGES:
+        origin = origin_cls(std)
+        timings = []
+        for mode_settings in MODES.values():
+            settings.update(mode_settings)
+            timing = min(timeit.repeat(
+                lambda: parse_page(origin, page_cls, fixture),  # pylint: disable=cell-var-from-loop
+                number=number, repeat=3,
+                )) / number * 1000
+            timings.append(timing)
+        totals = [total+timing for total, timing in zip(totals, timings)]
+        print_row(fixture, timings)
+
+    print_row('total', totals)
+
+
+argparser = ArgumentParser(description=__doc__.splitlines()[0])
+argparser.add_argument('-n', '--number', type=int, default=50)
+
+
+if __name__ == '__main__':
+    bench(**vars(argparser.parse_args()))
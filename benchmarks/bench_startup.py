@@ -0,0 +1,73 @@
+"""Benchmark the cold start of the gui until its window is created.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup [-n NUMBER] [-t TOP]
+"""
+import sys
+import subprocess
+from argparse import ArgumentParser
+
+
+# modules that should only be imported once the window is shown
+DEFERRED_MODULES = ('requests', 'urllib3', 'parsel', 'lxml', 'yaml', 'rarfile')
+
+STARTUP_SCRIPT = f"""\
+import sys, time
+start = time.perf_counter()
+import sscn_gui
+sscn_gui.create_window()
+print(time.perf_counter() - start)
+print(','.join(name for name in {DEFERRED_MODULES!r} if name in sys.modules))
+"""
+
+
+def run_startup(*options):
+    """Start a fresh interpreter creating the window, return its
+    `(seconds, loaded deferred modules, stderr)`.
+    """
+    process = subprocess.run(
+        [sys.executable, *options, '-c', STARTUP_SCRIPT],
+        capture_output=True, text=True, check=True)
+    seconds, loaded = process.stdout.splitlines()[-2:]
+    return float(seconds), [name for name in loaded.split(',') if name], process.stderr
+
+
+def parse_importtime(stderr):
+    """Return `(cumulative us, self us, module)` of every import from
+    the output of `-X importtime`, slowest first.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue    # the header
+        imports.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(imports, reverse=True)
+
+
+def bench(number, top):
+    """Print the import time breakdown and the time to window."""
+    _, _, stderr = run_startup('-X', 'importtime')
+    print(f'{"module":<32}{"cumulative ms":>16}{"self ms":>10}')
+    for cumulative_us, self_us, name in parse_importtime(stderr)[:top]:
+        print(f'{name:<32}{cumulative_us/1000:>16.1f}{self_us/1000:>10.1f}')
+
+    times = []
+    for _ in range(number):
+        seconds, loaded, _ = run_startup()
+        times.append(seconds)
+    print(f'\ntime to window: min {min(times)*1000:.1f} ms, '
+          f'max {max(times)*1000:.1f} ms in {number} runs')
+    if loaded:
+        print(f'loaded before the window: {", ".join(loaded)}')
+
+
+argparser = ArgumentParser(description=__doc__.splitlines()[0])
+argparser.add_argument('-n', '--number', type=int, default=5)
+argparser.add_argument('-t', '--top', type=int, default=15)
+
+
+if __name__ == '__main__':
+    bench(**vars(argparser.parse_args()))
@@ -0,0 +1,146 @@
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .settings import settings
+from .standard import standards
+from .exceptions import ContentUnavailable, RequestError
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes \d+-\d+/(\d+)')
+
+
+def get_size(response):
+    """Get the size of the file requested by `response`, or None."""
+    match = CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+    if match:
+        return int(match.group(1))
+    length = response.headers.get('Content-Length')
+    if length and length.isdigit() and response.status_code != 206:
+        return int(length)
+    return None
+
+
+def is_file_response(response):
+    """Whether `response` is a file but not e.g. a login page."""
+    if not response.ok:
+        return False
+    content_type = response.headers.get('Content-Type', '')
+    return ('attachment' in response.headers.get('Content-Disposition', '')
+            or not content_type.startswith('text/html'))
+
+
+def probe_url(origin, url):
+    """Check if the file of `url` could be downloaded from `origin`
+    without downloading it.
+
+    A HEAD request is made first. If the server doesn't answer HEAD
+    properly, fallback to a GET for the first byte only.
+    Return `(available, size)`, where size is None if unknown.
+    An url failing to be requested is regarded as not available.
+    """
+    # pylint: disable=import-outside-toplevel
+    # for its exceptions, loaded already with the sessions of origins
+    import requests
+    try:
+        response = origin.request(url, method='HEAD', allow_redirects=True)
+        if is_file_response(response) and get_size(response) is not None:
+            return True, get_size(response)
+
+        response = origin.request(
+            url, headers={'Range': 'bytes=0-0'}, stream=True)
+        with response:
+            if not is_file_response(response):
+                return False, None
+            return True, get_size(response)
+    except (requests.RequestException, RequestError) as err:
+        logger.debug('Failed to probe %s: %r.', url, err)
+        return False, None
+
+
+def probe_standard(std):
+    """Probe every origin that could serve the pdf of `std`.
+
+    Only the pages leading to the download urls are fetched.
+    Return a list of `{'origin', 'url', 'size'}` dicts of the
+    available files, in the order they would be downloaded.
+    """
+    results = []
+    for origin_cls in std.iter_subnode_cls('pdf'):
+        origin = std.get_subnode(origin_cls)
+        try:
+            for _, url in origin.iter_download_urls():
+                available, size = probe_url(origin, url)
+                logger.debug(
+                    '%r: %s is %savailable.', std, url,
+                    '' if available else 'not ')
+                if available:
+                    results.append(
+                        {'origin': origin_cls.name, 'url': url, 'size': size})
+        except ContentUnavailable:
+            logger.debug('%r: failed to probe %r.', std, origin)
+            continue
+    return results
+
+
+class AvailabilityCache:
+    """Cached pdf availability of standards, expired after
+    setting `AVAILABILITY_TTL` seconds.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        """Forget all cached availability."""
+        with self.lock:
+            self.entries.clear()
+
+    def get(self, code):
+        """Return cached availability of `code`, or None if missing
+        or expired.
+        """
+        entry = self.entries.get(code)
+        if entry is None:
+            return None
+        checked, results = entry
+        if time.time() - checked > settings['AVAILABILITY_TTL']:
+            return None
+        return results
+
+    def set(self, code, results):
+        """Cache availability `results` of `code`."""
+        with self.lock:
+            self.entries[code] = (time.time(), results)
+
+
+availability_cache = AvailabilityCache()
+
+
+def availability(code, std=None):
+    """Return which origins could serve the pdf of concret `code`
+    and at what size. See `probe_standard()`.
+
+    The pages of `std` are reused if given.
+    """
+    results = availability_cache.get(code)
+    if results is None:
+        results = probe_standard(std or standards.get(code))
+        availability_cache.set(code, results)
+    return results
+
+
+def availability_many(codes):
+    """Return a dict of the availability of every concret code in
+    `codes`, probed concurrently with `AVAILABILITY_WORKERS` threads.
+    """
+    codes = list(dict.fromkeys(codes))
+    with ThreadPoolExecutor(settings['AVAILABILITY_WORKERS']) as executor:
+        return dict(zip(codes, executor.map(availability, codes)))
@@ -0,0 +1,74 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """A shared thread pool running tasks nobody is waiting for,
+    e.g. refreshing stale fields or prefetching.
+
+    Threads are only started on the first submitted task, and the
+    errors of tasks are logged since no one would check them.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._executor = None
+        # futures of the tasks not done yet
+        self._futures = set()
+
+    @property
+    def executor(self):
+        """The lazily created `ThreadPoolExecutor`."""
+        if self._executor is None:
+            with self.lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        settings['BACKGROUND_WORKERS'],
+                        thread_name_prefix='sscn-background')
+        return self._executor
+
+    @staticmethod
+    def log_error(future):
+        """Log the error raised by the task of `future` if any."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error('Background task errored:', exc_info=error)
+
+    def _done(self, future):
+        with self.lock:
+            self._futures.discard(future)
+        self.log_error(future)
+
+    def submit(self, func, *args, **kwargs):
+        """Run `func(*args, **kwargs)` in background, return a `Future`."""
+        future = self.executor.submit(func, *args, **kwargs)
+        with self.lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def shutdown(self, wait=True):
+        """Stop the threads after the submitted tasks are done, or
+        without waiting, after the running ones are done and the
+        others are cancelled.
+        """
+        with self.lock:
+            executor, self._executor = self._executor, None
+            futures, self._futures = self._futures, set()
+        if executor is None:
+            return
+        if not wait:
+            # `cancel_futures` of `shutdown()` is only accepted since python 3.9
+            for future in futures:
+                future.cancel()
+        executor.shutdown(wait=wait)
+
+
+background = BackgroundTasks()
@@ -0,0 +1,93 @@
+import sys
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+from .settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def sizeof(value):
+    """Estimate the bytes taken by a field `value`, including the items
+    of containers.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sizeof(key) + sizeof(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item) for item in value)
+    return size
+
+
+class StandardCache:
+    """A process-wide registry of standards, keyed by `StandardCode`,
+    so that fields fetched for a standard are shared by every user.
+
+    Recently used standards are kept in a LRU bounded by the estimated
+    bytes of their fields, see setting `MAX_CACHED_BYTES`. Standards
+    evicted from it are still returned while referenced elsewhere.
+
+    The bytes of a standard are tracked in its `size`, grown by
+    `resize()` whenever a field of it or its subnodes is set.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.size = 0
+        self.alive = weakref.WeakValueDictionary()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, code):
+        return code in self.alive
+
+    def get(self, code):
+        """Return the standard of `code`, making it if needed."""
+        with self.lock:
+            std = self.entries.get(code)
+            if std is not None:
+                self.entries.move_to_end(code)
+                return std
+
+            std = self.alive.get(code)
+            if std is None:
+                std = self.alive[code] = self.factory(code)
+            self.entries[code] = std
+            self._measure(std)
+            self._evict()
+        return std
+
+    def resize(self, std, delta):
+        """Account `delta` bytes `std` grew by after a field was set."""
+        with self.lock:
+            std.size += delta
+            if self.entries.get(std.code) is not std:
+                return
+            self.sizes[std.code] += delta
+            self.size += delta
+            self._evict()
+
+    def _measure(self, std):
+        self.size += std.size - self.sizes.get(std.code, 0)
+        self.sizes[std.code] = std.size
+
+    def _evict(self):
+        # keep at least the most recently used one
+        while self.size > settings['MAX_CACHED_BYTES'] and len(self.entries) > 1:
+            code, std = self.entries.popitem(last=False)
+            self.size -= self.sizes.pop(code)
+            logger.debug('%r evicted from cache.', std)
+
+    def clear(self):
+        """Forget all cached standards."""
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.size = 0
+            self.alive.clear()
@@ -0,0 +1,413 @@
+import io
+import re
+import mmap
+import json
+import array
+import bisect
+import datetime
+
+from .utils import NotFound
+from .standard import StandardCode, Status
+
+
+# bit layout of a packed code key, from the most significant bit:
+#  prefix(15) | mandatory(2) | number(27) | part(4) | year(12)
+# so that sorting keys sorts codes by prefix, mandatory, number, part and year
+PREFIX_BITS, MANDATORY_BITS, NUMBER_BITS, PART_BITS, YEAR_BITS = 15, 2, 27, 4, 12
+YEAR_SHIFT = 0
+PART_SHIFT = YEAR_SHIFT + YEAR_BITS
+NUMBER_SHIFT = PART_SHIFT + PART_BITS
+MANDATORY_SHIFT = NUMBER_SHIFT + NUMBER_BITS
+PREFIX_SHIFT = MANDATORY_SHIFT + MANDATORY_BITS
+
+MANDATORY_CODES = {None: 0, True: 1, False: 2}
+MANDATORY_VALUES = {value: key for key, value in MANDATORY_CODES.items()}
+
+
+def _mask(bits):
+    return (1 << bits) - 1
+
+
+def pack_prefix(prefix):
+    """Pack a prefix of up to 3 capital letters into 15 bits."""
+    if prefix is None:
+        return 0
+    if not (prefix.isascii() and prefix.isalpha() and len(prefix) <= 3):
+        raise ValueError(f'Can not pack prefix "{prefix}".')
+    packed = 0
+    for char in prefix.upper().ljust(3, '@'):
+        packed = (packed << 5) | (ord(char) - ord('@'))    # '@' -> 0, 'A' -> 1
+    return packed
+
+
+def unpack_prefix(packed):
+    """Reverse of `pack_prefix()`."""
+    chars = []
+    for shift in (10, 5, 0):
+        value = (packed >> shift) & _mask(5)
+        if value:
+            chars.append(chr(value + ord('@')))
+    return ''.join(chars) or None
+
+
+def pack_code(code):
+    """Pack `StandardCode` into a 64-bit unsigned int key.
+
+    Numbers with leading zeros can't be packed.
+    """
+    number = int(code.number)
+    if str(number) != code.number or number >> NUMBER_BITS:
+        raise ValueError(f'Can not pack number "{code.number}".')
+    part = 0 if code.part is None else code.part + 1
+    year = code.year or 0
+    if part >> PART_BITS or year >> YEAR_BITS:
+        raise ValueError(f'Can not pack code "{code}".')
+
+    return (
+        pack_prefix(code.prefix) << PREFIX_SHIFT
+        | MANDATORY_CODES[code.is_mandatory] << MANDATORY_SHIFT
+        | number << NUMBER_SHIFT
+        | part << PART_SHIFT
+        | year << YEAR_SHIFT
+    )
+
+
+def unpack_code(key):
+    """Reverse of `pack_code()`. Returns an interned `StandardCode`."""
+    part = (key >> PART_SHIFT) & _mask(PART_BITS)
+    code = StandardCode(
+        number=(key >> NUMBER_SHIFT) & _mask(NUMBER_BITS),
+        prefix=unpack_prefix((key >> PREFIX_SHIFT) & _mask(PREFIX_BITS)),
+        is_mandatory=MANDATORY_VALUES[
+            (key >> MANDATORY_SHIFT) & _mask(MANDATORY_BITS)],
+        year=(key >> YEAR_SHIFT) & _mask(YEAR_BITS),
+        part=part - 1 if part else None,
+    )
+    return StandardCode.intern(code)
+
+
+class Column:
+    """Base class of array-backed columns of a catalog.
+
+    Each value is encoded into an int of `typecode`, with `MISSING`
+    representing a missing value.
+    """
+    typecode = None
+    MISSING = 0
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def encode(self, value):
+        """Encode `value` into an int."""
+        raise NotImplementedError()
+
+    def decode(self, value):
+        """Decode int `value` back."""
+        raise NotImplementedError()
+
+
+class StrColumn(Column):
+    """Column of strs interned in the string table of the catalog."""
+    typecode = 'I'
+
+    def encode(self, value):
+        return self.catalog.strings.intern(value)
+
+    def decode(self, value):
+        return self.catalog.strings[value]
+
+
+class StatusColumn(Column):
+    """Column of enum-coded `Status`."""
+    typecode = 'B'
+    STATUSES = (None,) + tuple(Status)
+
+    def encode(self, value):
+        return self.STATUSES.index(value)
+
+    def decode(self, value):
+        return self.STATUSES[value]
+
+
+class DateColumn(Column):
+    """Column of dates packed as YYYYMMDD ints.
+
+    Values are iso format date strs, as returned by the origins.
+    """
+    typecode = 'I'
+
+    PATTERN = re.compile(r'([0-9]{4})\D([0-9]{1,2})\D([0-9]{1,2})')
+
+    def encode(self, value):
+        match = self.PATTERN.search(value)
+        if not match:
+            raise ValueError(f'"{value}" is not a valid date.')
+        date = datetime.date(*map(int, match.groups()))
+        return date.year*10000 + date.month*100 + date.day
+
+    def decode(self, value):
+        return f'{value//10000:04d}-{value//100%100:02d}-{value%100:02d}'
+
+
+class StringTable:
+    """Interned strs of a catalog. Index 0 is reserved for missing values.
+
+    Strs of a memory-mapped catalog are decoded lazily.
+    """
+    def __init__(self, blob=None, offsets=None):
+        self.strings = [None]
+        self.ids = {}
+        self.blob = blob
+        self.offsets = offsets
+        if offsets is not None:
+            self.strings.extend([NotFound] * (len(offsets)-1))
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __getitem__(self, index):
+        string = self.strings[index]
+        if string is NotFound:
+            start, end = self.offsets[index-1], self.offsets[index]
+            string = str(self.blob[start:end], 'UTF-8')
+            self.strings[index] = string
+        return string
+
+    def intern(self, string):
+        """Return the index of `string`, adding it if new."""
+        index = self.ids.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(string)
+            self.ids[string] = index
+        return index
+
+    def dump(self):
+        """Return `(blob, offsets)` for persisting."""
+        offsets = array.array('I', [0])
+        blob = io.BytesIO()
+        for index in range(1, len(self.strings)):
+            blob.write(self[index].encode('UTF-8'))
+            offsets.append(blob.tell())
+        return blob.getvalue(), offsets
+
+
+class Catalog:
+    """A compact, columnar in-memory catalog of standards.
+
+    Standards are stored in arrays sorted by their packed code keys,
+    with one array per field in `COLUMNS`. Strs are interned and
+    `Status` enum-coded, so a standard costs tens of bytes.
+    """
+    COLUMNS = {
+        'title': StrColumn,
+        'title_english': StrColumn,
+        'issued_by': StrColumn,
+        'status': StatusColumn,
+        'issuance_date': DateColumn,
+        'implementation_date': DateColumn,
+    }
+    MAGIC = b'SSCNCAT1'
+
+    def __init__(self):
+        self.keys = array.array('Q')
+        self.strings = StringTable()
+        self.columns = {name: cls(self) for name, cls in self.COLUMNS.items()}
+        self.values = {
+            name: array.array(column.typecode)
+            for name, column in self.columns.items()}
+        self._sorted_length = 0
+        self._unsorted = {}     # key: index of keys added after sorting
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, code):
+        return self._index(pack_code(code)) is not None
+
+    def __iter__(self):
+        self._sort()
+        for index in range(len(self.keys)):
+            yield unpack_code(self.keys[index]), self._get_fields(index)
+
+    def add(self, code, **fields):
+        """Add or update standard of `code` with `fields`.
+
+        Fields not in `COLUMNS` are ignored.
+        """
+        self._make_writable()
+        key = pack_code(code)
+        index = self._index(key, sort=False)
+        if index is None:
+            index = len(self.keys)
+            self.keys.append(key)
+            for name, column in self.columns.items():
+                self.values[name].append(column.MISSING)
+            self._unsorted[key] = index
+
+        for name, value in fields.items():
+            column = self.columns.get(name)
+            if column is None:
+                continue
+            if value is None or value is NotFound:
+                encoded = column.MISSING
+            else:
+                encoded = column.encode(value)
+            self.values[name][index] = encoded
+
+    def add_standard(self, std):
+        """Add a `Standard` instance with its cached fields."""
+        self.add(std.code, **std.fields)
+
+    def get(self, code, default=None):
+        """Return a dict of fields of standard `code`."""
+        index = self._index(pack_code(code))
+        if index is None:
+            return default
+        return self._get_fields(index)
+
+    def query(self, prefix, is_mandatory=None, numbers=(None, None),
+              years=(None, None)):
+        """Iter through `(code, fields)` in order, within a sorted range.
+
+        `numbers` and `years` are inclusive `(from, to)` bounds where
+        None means unbounded. If `is_mandatory` is None, both mandatory
+        and recommended standards are included.
+
+        Eg: all GB/T 50xxx after 2010
+            catalog.query('GB', False, (50000, 50999), (2011, None))
+        """
+        number_from, number_to = numbers
+        number_from = number_from or 0
+        number_to = _mask(NUMBER_BITS) if number_to is None else number_to
+        year_from, year_to = years
+        year_from = year_from or 0
+        year_to = _mask(YEAR_BITS) if year_to is None else year_to
+
+        mandatories = ((True, False, None) if is_mandatory is None
+            else (is_mandatory,))
+        packed_prefix = pack_prefix(prefix) << PREFIX_SHIFT
+        ranges = sorted(
+            (packed_prefix
+                | MANDATORY_CODES[mandatory] << MANDATORY_SHIFT
+                | number_from << NUMBER_SHIFT,
+             packed_prefix
+                | MANDATORY_CODES[mandatory] << MANDATORY_SHIFT
+                | number_to << NUMBER_SHIFT
+                | _mask(NUMBER_SHIFT))
+            for mandatory in mandatories)
+
+        self._sort()
+        for low, high in ranges:
+            start = bisect.bisect_left(self.keys, low)
+            end = bisect.bisect_right(self.keys, high)
+            for index in range(start, end):
+                key = self.keys[index]
+                year = (key >> YEAR_SHIFT) & _mask(YEAR_BITS)
+                if year_from <= year <= year_to:
+                    yield unpack_code(key), self._get_fields(index)
+
+    def _get_fields(self, index):
+        fields = {}
+        for name, column in self.columns.items():
+            value = self.values[name][index]
+            if value != column.MISSING:
+                fields[name] = column.decode(value)
+        return fields
+
+    def _index(self, key, sort=True):
+        """Return the index of `key`, or None if not found.
+
+        Keys added since the last sorting are looked up without
+        sorting if `sort` is falsy.
+        """
+        if sort:
+            self._sort()
+        elif key in self._unsorted:
+            return self._unsorted[key]
+
+        index = bisect.bisect_left(self.keys, key, hi=self._sorted_length)
+        if index < self._sorted_length and self.keys[index] == key:
+            return index
+        return None
+
+    def _sort(self):
+        """Sort all columns by keys."""
+        if not self._unsorted:
+            return
+        order = sorted(range(len(self.keys)), key=self.keys.__getitem__)
+        self.keys = array.array('Q', (self.keys[i] for i in order))
+        for name, values in self.values.items():
+            self.values[name] = array.array(
+                values.typecode, (values[i] for i in order))
+        self._sorted_length = len(self.keys)
+        self._unsorted.clear()
+
+    def _make_writable(self):
+        """Copy memory-mapped columns into arrays."""
+        if self._mmap is None:
+            return
+        self.keys = array.array('Q', self.keys)
+        for name, values in self.values.items():
+            self.values[name] = array.array(values.format, values)
+        strings = StringTable()
+        for index in range(1, len(self.strings)):
+            strings.intern(self.strings[index])
+        self.strings = strings
+        self._mmap = None
+
+    def save(self, path):
+        """Persist the catalog to file `path`."""
+        self._sort()
+        blob, offsets = self.strings.dump()
+        sections = [('keys', self.keys)]
+        sections.extend(self.values.items())
+        sections.append(('string_offsets', offsets))
+
+        # section name: (typecode, offset, count)
+        header = {}
+        body = io.BytesIO()
+        for name, values in sections:
+            header[name] = (values.typecode, body.tell(), len(values))
+            body.write(values.tobytes())
+            body.write(b'\0' * (-body.tell() % 8))    # align to 8 bytes
+        header['strings'] = ('B', body.tell(), len(blob))
+        body.write(blob)
+
+        header = json.dumps(header).encode('UTF-8')
+        header += b' ' * (-len(header) % 8)
+        with open(path, 'wb') as file:
+            file.write(self.MAGIC)
+            file.write(len(header).to_bytes(8, 'little'))
+            file.write(header)
+            file.write(body.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        """Load a catalog persisted at `path` by memory-mapping it.
+
+        Columns are read straight from the mapped file until modified.
+        """
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:8] != cls.MAGIC:
+            raise ValueError(f'"{path}" is not a catalog file.')
+        header_size = int.from_bytes(mapped[8:16], 'little')
+        header = json.loads(bytes(mapped[16:16+header_size]))
+        body = memoryview(mapped)[16+header_size:]
+
+        sections = {}
+        for name, (typecode, offset, count) in header.items():
+            size = array.array(typecode).itemsize
+            sections[name] = body[offset:offset+count*size].cast(typecode)
+
+        catalog = cls()
+        catalog.keys = sections.pop('keys')
+        catalog.strings = StringTable(
+            sections.pop('strings'), sections.pop('string_offsets'))
+        catalog.values.update(sections)
+        catalog._sorted_length = len(catalog.keys)
+        catalog._mmap = mapped
+        return catalog
@@ -0,0 +1,102 @@
+import logging
+import threading
+
+from .settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class OriginStats:
+    """Observed hit rates and latencies of origins, per
+    (origin, field, code prefix).
+
+    Used to try first the origins expected to return a field
+    at the lowest cost, i.e. mean latency divided by hit rate.
+    """
+    # latency in seconds assumed for an origin before any attempt
+    PRIOR_LATENCY = 1.0
+    # skips for the deadline in a row after which an origin is attempted
+    #  anyway, as only attempts update its latency
+    RETRY_AFTER_SKIPS = 10
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key: [attempts, hits, total latency]
+        self.stats = {}
+        # key: skips since the last attempt
+        self.skips = {}
+
+    def __len__(self):
+        return len(self.stats)
+
+    def clear(self):
+        """Forget all observations."""
+        with self.lock:
+            self.stats.clear()
+            self.skips.clear()
+
+    def record(self, origin_cls, field_name, prefix, hit, latency):
+        """Record an attempt of getting `field_name` of a standard
+        with `prefix` from `origin_cls`.
+        """
+        key = (origin_cls, field_name, prefix)
+        with self.lock:
+            stat = self.stats.setdefault(key, [0, 0, 0.0])
+            stat[0] += 1
+            stat[1] += bool(hit)
+            stat[2] += latency
+            self.skips.pop(key, None)
+
+    def record_skip(self, origin_cls, field_name, prefix):
+        """Record that `origin_cls` was expected to miss the deadline.
+
+        Return False if it should be attempted anyway, once skipped
+        `RETRY_AFTER_SKIPS` times in a row.
+        """
+        key = (origin_cls, field_name, prefix)
+        with self.lock:
+            skips = self.skips[key] = self.skips.get(key, 0) + 1
+        return skips % self.RETRY_AFTER_SKIPS != 0
+
+    def get_cost(self, origin_cls, field_name, prefix):
+        """Return the expected seconds to get the field from `origin_cls`.
+
+        Both the hit rate and the mean latency are Laplace smoothed, so
+        rarely attempted origins are not ruled out by few misses.
+        """
+        attempts, hits, latency = self.stats.get(
+            (origin_cls, field_name, prefix), (0, 0, 0.0))
+        hit_rate = (hits + 1) / (attempts + 2)
+        mean_latency = (latency + self.PRIOR_LATENCY) / (attempts + 1)
+        return mean_latency / hit_rate
+
+    def get_latency(self, origin_cls, field_name, prefix):
+        """Return the seconds an attempt to get the field from
+        `origin_cls` is expected to take, or None if it was never
+        attempted.
+
+        The mean latency is Laplace smoothed as in `get_cost()`, so a
+        single slow attempt doesn't rule out the origin.
+        """
+        attempts, _, latency = self.stats.get(
+            (origin_cls, field_name, prefix), (0, 0, 0.0))
+        if not attempts:
+            return None
+        return (latency + self.PRIOR_LATENCY) / (attempts + 1)
+
+    def order(self, origins, field_name, prefix):
+        """Sort `origins` by their expected cost to get `field_name`.
+
+        Origins that have `field_name` in their `preferred_field_set` are
+        kept first, and origins with equal costs keep their order.
+        """
+        if not settings['COST_BASED_ORDERING'] or len(origins) < 2:
+            return origins
+        return tuple(sorted(origins, key=lambda origin_cls: (
+            field_name not in origin_cls.preferred_field_set,
+            self.get_cost(origin_cls, field_name, prefix),
+            )))
+
+
+origin_stats = OriginStats()
@@ -0,0 +1,57 @@
+"""Deadlines carried through field resolution.
+
+Within `with deadline(seconds):`, requests take their timeouts from the
+remaining budget, origins expected to be too slow are skipped, and
+fields that could not be resolved in time are returned as `NotFound`
+without being cached as such.
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+
+from .exceptions import DeadlineExceeded
+
+
+# the `time.monotonic()` to finish by in the current context
+current_deadline = contextvars.ContextVar('current_deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Finish within `seconds` in this context, or within the enclosing
+    deadline if sooner. No deadline is set if `seconds` is None.
+    """
+    if seconds is None:
+        yield
+        return
+    new_deadline = time.monotonic() + seconds
+    enclosing = current_deadline.get()
+    if enclosing is not None:
+        new_deadline = min(new_deadline, enclosing)
+    token = current_deadline.set(new_deadline)
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining():
+    """Return the seconds left before the deadline, or None if
+    there is no deadline.
+    """
+    end = current_deadline.get()
+    if end is None:
+        return None
+    return end - time.monotonic()
+
+
+def is_exceeded():
+    """Whether the deadline, if any, has passed."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check_deadline():
+    """Raise `DeadlineExceeded` if the deadline has passed."""
+    if is_exceeded():
+        raise DeadlineExceeded()
@@ -39,3 +39,11 @@ class RequestError(ContentUnavailable):
 
     def __init__(self, e):
         self.error = e
+
+class DeadlineExceeded(RequestError):
+    """Raised when the deadline of resolving
+    fields has passed, see `sscn.deadline`.
+    """
+
+    def __init__(self, e='Deadline exceeded.'):
+        super().__init__(e)
@@ -1,36 +1,91 @@
 import os
+import json
 import logging
-from collections import OrderedDict
+import threading
 
 from sscn.settings import settings
 from sscn.utils import NotFound, get_absolute_path
-from sscn.standard import Standard, StandardCode
-from sscn.origins import csres
-from .folder import load_folder_tree, load_folder_file, load_downloaded_tree
+from sscn.standard import StandardCode, Status, standards
+from sscn.background import background
+from sscn.deadline import deadline
+from sscn.metrics import metrics
+from sscn.tracing import tracer
+from sscn.sessions import preconnect_origins
+from sscn.origins import registry
+from sscn.supersession import resolve_code
+from sscn.availability import availability, availability_many
+from .prefetch import Prefetcher
+from .jobs import JobManager, current_job, check_cancelled
+from .folder import (
+    load_folder_tree, load_folder_file, load_downloaded_tree, iter_tree_codes,
+    load_folder_level, load_downloaded_level, load_folder_file_level)
 
 
 logger = logging.getLogger(__name__)
 
 
+# dependent field: (field it depends on, values to include it with)
+DEPENDENT_FIELDS = {
+    'substitute': ('status', {Status.OBSOLETE}),
+}
+
+
+def jsonify_field(value):
+    """Turn a field value to something that could be passed to js."""
+    if not isinstance(value, (str, list, dict)):
+        value = str(value)
+    return value
+
+
+def warm_up():
+    """Import the network stack and the origins ahead of the first
+    request, e.g. in background once the window is shown, and connect
+    to the origins if `PRECONNECT_ORIGINS`.
+    """
+    # pylint: disable=import-outside-toplevel,unused-import
+    # imported to be loaded, not used
+    import requests
+    registry.load()
+    if settings['PRECONNECT_ORIGINS']:
+        preconnect_origins()
+
+
+def get_standard_fields(std, fields, dependent=()):
+    """Get `fields` of `std` as values that could be passed to js.
+
+    Fields in `dependent` are only included if the fields they depend
+    on match, see `DEPENDENT_FIELDS`.
+    """
+    values = {}
+    for field in fields:
+        check_cancelled()
+        values[field] = std.get_field(field)
+    for field in dependent:
+        base, base_values = DEPENDENT_FIELDS[field]
+        base_value = values[base] if base in values else std.get_field(base)
+        if base_value in base_values:
+            values[field] = std.get_field(field)
+    return {field: jsonify_field(value) for field, value in values.items()}
+
+
 class Api:
     """Api interface for gui"""
     # pylint: disable=missing-function-docstring
 
+    # methods that could be run as jobs by `start_job()`
+    JOB_METHODS = frozenset((
+        'get_fields', 'search_standards', 'download_standard',
+        'load_local', 'get_availability', 'get_folder_availability',
+    ))
+
     def __init__(self):
-        self.cached_standards = OrderedDict()
+        self.prefetcher = Prefetcher(self._get_standard)
+        self.jobs = JobManager(self._call_js)
         self.window = None
 
     def _get_standard(self, code_str):
-        code = StandardCode.parse(code_str)
-        if code in self.cached_standards:
-            return self.cached_standards[code]
-
-        if len(self.cached_standards) >= settings['MAX_CACHED_STANDARDS']:
-            self.cached_standards.popitem(last=False)
-
-        std = Standard(code)
-        self.cached_standards[code] = std
-        return std
+        code = resolve_code(StandardCode.parse(code_str))
+        return standards.get(code)
 
     def is_concret_code(self, string):
         try:
@@ -40,20 +95,108 @@ class Api:
         return code.is_concret()
 
     def search_standards(self, query):
+        # pylint: disable=import-outside-toplevel
+        # origins are loaded on the first search, not at startup
+        from sscn.origins import csres
         return csres.search_standards(query)
 
-    def get_fields(self, code, fields):
+    def _call_js(self, func, *args):
+        if self.window is None:
+            return
+        args = ', '.join(json.dumps(arg, ensure_ascii=False) for arg in args)
+        self.window.evaluate_js(f'{func}({args})')
+
+    def start_job(self, job_id, method, args):
+        """Run `method(*args)` in background and return `job_id` at once.
+        The result is passed to js `onJobResult(job_id, result)`.
+        """
+        if method not in self.JOB_METHODS:
+            raise ValueError(f'Method `{method}` could not be run as a job.')
+        return self.jobs.submit(getattr(self, method), args, job_id)
+
+    def cancel_job(self, job_id):
+        return self.jobs.cancel(job_id)
+
+    def get_fields(self, code, fields, dependent=()):
         std = self._get_standard(code)
-        results = {}
-        for field in fields:
-            value = std.get_field(field)
-            if not isinstance(value, (str, list, dict)):
-                value = str(value)
-            results[field] = value
+        with self.prefetcher.interactive(), \
+             deadline(settings['FIELDS_DEADLINE']):
+            results = get_standard_fields(std, fields, dependent)
 
         logger.debug('Fields returned: %s', format(results))
+        # the detail view is shown, user may download it next
+        if settings['PREFETCH_DOWNLOAD']:
+            background.submit(
+                std.prefetch_download, head=settings['PREFETCH_HEAD'])
         return results
 
+    def get_fields_batch(self, batch_id, codes, fields, dependent=(), level=None):
+        """Get fields of many standards in background at low priority,
+        see `Prefetcher.submit_batch()`. Results of each code are passed
+        to js `onFieldsBatch(batch_id, code, results)` once ready, with
+        `results` null if the code is invalid, then
+        `onFieldsBatchDone(batch_id)` is called.
+
+        Codes of an earlier batch of the same tree `level` not fetched
+        yet are dropped, as are those of the oldest batches once too
+        many are queued.
+        """
+        codes = list(dict.fromkeys(codes))
+        remaining = [len(codes)]
+        lock = threading.Lock()
+
+        def count_done(number):
+            with lock:
+                remaining[0] -= number
+                done = not remaining[0]
+            if done:
+                self._call_js('onFieldsBatchDone', batch_id)
+
+        def get_fields(code):
+            results = None
+            try:
+                std = self._get_standard(code)
+                with deadline(settings['FIELDS_DEADLINE']):
+                    results = get_standard_fields(std, fields, dependent)
+            except (ValueError, TypeError):
+                logger.debug('Skipped invalid code %s in batch.', code)
+            finally:
+                self._call_js('onFieldsBatch', batch_id, code, results)
+                count_done(1)
+
+        if not codes:
+            self._call_js('onFieldsBatchDone', batch_id)
+            return 0
+        key = ('fields', batch_id if level is None else json.dumps(level))
+        self.prefetcher.submit_batch(
+            key, codes, get_fields, on_drop=lambda dropped: count_done(len(dropped)))
+        return len(codes)
+
+    def prefetch_standards(self, codes):
+        self.prefetcher.prefetch(codes)
+
+    def get_availability(self, code):
+        std = self._get_standard(code)
+        return availability(std.code, std)
+
+    def get_folder_availability(self, paths):
+        file_path = get_absolute_path(settings['FOLDER_DIR']
+            ).joinpath(*paths)
+        if not file_path.is_file():
+            return False
+
+        codes = []
+        for code_str in iter_tree_codes(load_folder_file(file_path)):
+            try:
+                code = StandardCode.parse(code_str)
+            except ValueError:
+                logger.debug('Skipped invalid code "%s".', code_str)
+                continue
+            if code.is_concret():
+                codes.append(code)
+        results = availability_many(codes)
+        return {str(code): result for code, result in results.items()}
+
     def download_standard(self, code):
         std = self._get_standard(code)
         prefix = std.code.prefix
@@ -69,7 +212,13 @@ class Api:
             logger.info('file exists.')
             return 'EXISTS'
 
-        content = std.get_field('pdf')
+        job = current_job.get()
+        if job is not None:
+            # the download may be waiting for logging in
+            job.on_cancel(lambda: self.cancel_login('bzorg'))
+        with self.prefetcher.interactive():
+            content = std.get_field('pdf')
+        check_cancelled()
         if content is NotFound:
             logger.info('file not found.')
             return 'NOT_FOUND'
@@ -78,13 +227,18 @@ class Api:
             file.write(content)
         return True
 
-    def open_standard_pdf(self, code):
-        code = StandardCode.parse(code)
+    def _find_downloaded(self, code):
         dir_path = get_absolute_path(
             settings['DOWNLOAD_DIR']) / code.prefix
-        assert dir_path.is_dir()
+        if not dir_path.is_dir():
+            return []
+        return list(dir_path.glob(f'{code.prefix}*{code.number}*{code.year}*.pdf'))
 
-        matchings = list(dir_path.glob(f'{code.prefix}*{code.number}*{code.year}*.pdf'))
+    def is_downloaded(self, code):
+        return bool(self._find_downloaded(StandardCode.parse(code)))
+
+    def open_standard_pdf(self, code):
+        matchings = self._find_downloaded(StandardCode.parse(code))
         if not matchings:
             return False
         assert len(matchings) == 1
@@ -114,15 +268,62 @@ class Api:
         tree = load_downloaded_tree(local_dir)
         return tree
 
+    def load_folder_level(self, paths, cursor=0):
+        dir_path = get_absolute_path(settings['FOLDER_DIR']).joinpath(*paths)
+        if not dir_path.is_dir():
+            return False
+        return load_folder_level(dir_path, cursor)
+
+    def load_local_level(self, paths, cursor=0):
+        dir_path = get_absolute_path(settings['DOWNLOAD_DIR']).joinpath(*paths)
+        if not dir_path.is_dir():
+            return {'nodes': [], 'cursor': None}
+        return load_downloaded_level(dir_path, cursor)
+
+    def load_folder_file_level(self, paths, node_path, cursor=0):
+        file_path = get_absolute_path(settings['FOLDER_DIR']
+            ).joinpath(*paths)
+        if not file_path.is_file():
+            return False
+        try:
+            return load_folder_file_level(file_path, node_path, cursor)
+        except KeyError:
+            return False
+
     # TODO
     def show_wechat_login_code(self, origin_cls, url):
         self.window.evaluate_js(f'showBZOrgLoginMessage("{url}")')
 
+    def on_field_refreshed(self, std, name, value):
+        self._call_js(
+            'onFieldRefreshed', str(std.code), name, jsonify_field(value))
+
     def cancel_login(self, name):
         from sscn.origins import bzorg
         return bzorg.BZOrgOrigin.cancel_login()
 
+    def get_metrics(self):
+        return metrics.summarize()
+
+    def export_metrics(self):
+        """Write all metrics to `METRICS_FILE`, return its path."""
+        path = get_absolute_path(settings['METRICS_FILE'])
+        metrics.write(path)
+        return str(path)
+
+    def export_trace(self):
+        """Write recorded spans to `TRACE_FILE`, return its path, or
+        False if tracing is off.
+        """
+        if not settings['TRACING']:
+            return False
+        path = get_absolute_path(settings['TRACE_FILE'])
+        tracer.export(path)
+        return str(path)
+
     def close(self):
+        self.prefetcher.stop(wait=False)
+        self.jobs.shutdown()
         self.window.destroy()
 
     def minimize(self):
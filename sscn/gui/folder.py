@@ -1,8 +1,10 @@
+import os
 import logging
 import operator
+import functools
+from pathlib import Path
 
-import yaml
-
+from sscn.settings import settings
 from sscn.standard import StandardCode
 
 
@@ -37,32 +39,100 @@ def load_dir_tree(path, filename_parser, files_sorting_key=None):
     return subdirs
 
 
+def paginate(nodes, cursor=0, limit=None):
+    """Return a page of `nodes` from index `cursor`, along with the
+    cursor of the next page, which is None at the last page.
+    """
+    limit = limit or settings['TREE_PAGE_SIZE']
+    end = cursor + limit
+    return {
+        'nodes': nodes[cursor:end],
+        'cursor': end if end < len(nodes) else None,
+    }
+
+
+@functools.lru_cache(maxsize=64)
+def _list_dir(path, mtime_ns, filename_parser, files_sorting_key):
+    """Underlying func of `load_dir_level()`, cached until the
+    directory is modified.
+    """
+    # pylint: disable=unused-argument
+    # `mtime_ns` is only part of the cache key
+    subdirs = []
+    files = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                subdirs.append((Path(entry.name).stem, None))
+            else:
+                parsed_name = filename_parser(entry.name)
+                if parsed_name is False:
+                    continue
+                files.append(parsed_name)
+
+    subdirs.sort(key=operator.itemgetter(0))
+    files.sort(key=files_sorting_key)
+    return subdirs + files
+
+
+def load_dir_level(path, filename_parser, files_sorting_key=None,
+                   cursor=0, limit=None):
+    """Get a page of the direct children of `path`, like
+    `load_dir_tree()` but with sub-directories as `(dir_name, None)`.
+
+    Returns: {'nodes': list[...], 'cursor': int | None}
+    """
+    nodes = _list_dir(
+        path, path.stat().st_mtime_ns, filename_parser, files_sorting_key)
+    return paginate(nodes, cursor, limit)
+
+
+def parse_folder_name(name):
+    """Parse file names of standards classification files."""
+    if name.endswith('.yaml') or name.endswith('.yml'):
+        return name
+    return False
+
+
+def parse_downloaded_name(name):
+    """Parse file names of downloaded standards."""
+    name = name.replace('_', ' ')
+    if not name.endswith('.pdf'):
+        return False
+    name = name.partition('.')[0]
+
+    match = StandardCode.CODE_PATTERN.match(name)
+    if not match:
+        return False
+    code = StandardCode.parse(name)
+    title = name[match.end(0):].strip()
+    return {'code': str(code), 'title': title}
+
+
 def load_folder_tree(path):
     """Load the file tree of standards classification path."""
-    def parser(name):
-        if name.endswith('.yaml') or name.endswith('.yml'):
-            return name
-        return False
+    return load_dir_tree(path, parse_folder_name)
+
+
+def load_folder_level(path, cursor=0, limit=None):
+    """Load a page of a level of standards classification path."""
+    return load_dir_level(path, parse_folder_name, cursor=cursor, limit=limit)
 
-    return load_dir_tree(path, parser)
+
+# created once to be part of the cache key of `_list_dir()`
+downloaded_sorting_key = operator.itemgetter('code')
 
 
 def load_downloaded_tree(path):
     """Load the file tree of downloaded standards."""
-    def parser(name):
-        name = name.replace('_', ' ')
-        if not name.endswith('.pdf'):
-            return False
-        name = name.partition('.')[0]
+    return load_dir_tree(path, parse_downloaded_name, downloaded_sorting_key)
 
-        match = StandardCode.CODE_PATTERN.match(name)
-        if not match:
-            return False
-        code = StandardCode.parse(name)
-        title = name[match.end(0):].strip()
-        return {'code': str(code), 'title': title}
 
-    return load_dir_tree(path, parser, operator.itemgetter('code'))
+def load_downloaded_level(path, cursor=0, limit=None):
+    """Load a page of a level of downloaded standards."""
+    return load_dir_level(
+        path, parse_downloaded_name, downloaded_sorting_key,
+        cursor=cursor, limit=limit)
 
 
 def _parse_yaml_tree(nodes):
@@ -93,10 +163,50 @@ def _parse_yaml_tree(nodes):
     subtrees.extend(end_nodes)
     return subtrees
 
+def iter_tree_codes(tree):
+    """Iter through the code strs of all standards in `tree`."""
+    for node in tree:
+        if isinstance(node, dict):
+            yield node['code']
+        else:
+            yield from iter_tree_codes(node[1])
+
+
 def load_folder_file(path):
     """Load the standards classification info from a file."""
+    # pylint: disable=import-outside-toplevel
+    # yaml is slow to import and only needed for folder files
+    import yaml
     with open(path, encoding='UTF8') as file:
         tree = yaml.safe_load(file)
 
     assert isinstance(tree, list)
     return _parse_yaml_tree(tree)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cached_folder_file(path, mtime_ns):
+    # pylint: disable=unused-argument
+    # `mtime_ns` is only part of the cache key
+    return load_folder_file(path)
+
+
+def load_folder_file_level(path, node_path=(), cursor=0, limit=None):
+    """Load a page of the children of the node at `node_path`, a
+    sequence of node names, in a standards classification file.
+    Sub-nodes are returned as `(name, None)`.
+
+    Raises KeyError if `node_path` doesn't exist.
+    """
+    nodes = _load_cached_folder_file(path, path.stat().st_mtime_ns)
+    for name in node_path:
+        for node in nodes:
+            if isinstance(node, tuple) and node[0] == name:
+                nodes = node[1]
+                break
+        else:
+            raise KeyError(name)
+
+    level = [(node[0], None) if isinstance(node, tuple) else node
+             for node in nodes]
+    return paginate(level, cursor, limit)
@@ -0,0 +1,155 @@
+import logging
+import itertools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from sscn.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# the job being run in the current thread
+current_job = contextvars.ContextVar('current_job', default=None)
+
+
+class JobCancelled(Exception):
+    """Raised in a job to stop it once it's cancelled."""
+
+
+def check_cancelled():
+    """Raise `JobCancelled` if the current job, if any, is cancelled."""
+    job = current_job.get()
+    if job is not None:
+        job.check_cancelled()
+
+
+class Job:
+    """A unit of work run in background for the webview."""
+    def __init__(self, job_id, manager):
+        self.id = job_id
+        self.manager = manager
+        self.future = None
+        self.cancel_event = threading.Event()
+        self._cancel_callbacks = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'<Job id={self.id!r}>'
+
+    @property
+    def cancelled(self):
+        """Whether the job is cancelled."""
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Ask the job to stop, calling its cancel callbacks."""
+        with self._lock:
+            self.cancel_event.set()
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Call `callback()` once the job is cancelled, e.g. to
+        interrupt what the job is waiting for.
+        """
+        with self._lock:
+            if not self.cancelled:
+                self._cancel_callbacks.append(callback)
+                return
+        callback()
+
+    def check_cancelled(self):
+        """Raise `JobCancelled` if the job is cancelled."""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, done, total=None, message=None):
+        """Report the progress of the job."""
+        self.manager.notify('onJobProgress', self.id, done, total, message)
+
+
+class JobManager:
+    """Run jobs on a thread pool of `JOB_WORKERS` threads.
+
+    Results, errors and progress of jobs are passed to
+    `notify(js_func_name, job_id, *args)`, with functions
+    `onJobResult`, `onJobError`, `onJobCancelled` and `onJobProgress`.
+    """
+    def __init__(self, notify):
+        self.notify = notify
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._executor = None
+
+    @property
+    def executor(self):
+        """The lazily created `ThreadPoolExecutor`."""
+        if self._executor is None:
+            with self.lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        settings['JOB_WORKERS'], thread_name_prefix='sscn-job')
+        return self._executor
+
+    def submit(self, func, args=(), job_id=None):
+        """Run `func(*args)` as a job and return its ID at once."""
+        with self.lock:
+            if job_id is None:
+                job_id = f'job-{next(self._ids)}'
+            job = self.jobs[job_id] = Job(job_id, self)
+        job.future = self.executor.submit(self._run, job, func, args)
+        return job_id
+
+    def _run(self, job, func, args):
+        token = current_job.set(job)
+        # pylint: disable=broad-exception-caught
+        # any error of a job is logged and passed to js
+        try:
+            job.check_cancelled()
+            result = func(*args)
+            job.check_cancelled()
+        except JobCancelled:
+            logger.debug('%r cancelled.', job)
+            self.notify('onJobCancelled', job.id)
+        except Exception as err:
+            logger.error('%r errored:', job, exc_info=1)
+            self.notify('onJobError', job.id, str(err))
+        else:
+            self.notify('onJobResult', job.id, result)
+        finally:
+            current_job.reset(token)
+            with self.lock:
+                self.jobs.pop(job.id, None)
+
+    def _cancel(self, job):
+        job.cancel()
+        # jobs not started yet are dropped, so are resolved here
+        #  instead of by `_run()`
+        if job.future is not None and job.future.cancel():
+            logger.debug('%r cancelled before started.', job)
+            with self.lock:
+                self.jobs.pop(job.id, None)
+            self.notify('onJobCancelled', job.id)
+
+    def cancel(self, job_id):
+        """Cancel job `job_id`. Return False if it's not running."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        self._cancel(job)
+        return True
+
+    def shutdown(self):
+        """Cancel all jobs and stop the threads."""
+        with self.lock:
+            jobs = list(self.jobs.values())
+            executor, self._executor = self._executor, None
+        for job in jobs:
+            # `cancel_futures` of `shutdown()` is only accepted since
+            #  python 3.9, so jobs not started yet are dropped here
+            self._cancel(job)
+        if executor is not None:
+            executor.shutdown(wait=False)
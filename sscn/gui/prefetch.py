@@ -0,0 +1,184 @@
+import logging
+import functools
+import itertools
+import threading
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+
+from sscn.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Prefetch fields of standards in background at low priority,
+    e.g. those visible in the opened folder.
+
+    Only the latest requested codes are prefetched, by at most
+    `PREFETCH_WORKERS` threads, and prefetching pauses while any
+    interactive request is being served.
+
+    The workers also run batches of other low priority tasks, see
+    `submit_batch()`, ahead of the codes to prefetch.
+    """
+    def __init__(self, get_standard):
+        self.get_standard = get_standard
+        self.condition = threading.Condition()
+        self.pending = deque()
+        # key: (items, func, on_drop) of batches, oldest first
+        self.batches = OrderedDict()
+        self.interactive_count = 0
+        # alive worker threads, including stopped ones still finishing
+        #  their fetches
+        self.workers = []
+        # each generation of workers is stopped by its own event
+        self.stop_event = threading.Event()
+        self._worker_ids = itertools.count()
+
+    def prefetch(self, codes):
+        """Prefetch standards of `codes` instead of the pending ones."""
+        with self.condition:
+            self.pending = deque(codes)
+            self.start_workers()
+            self.condition.notify_all()
+
+    def submit_batch(self, key, items, func, on_drop=None):
+        """Run `func(item)` for each of `items` by the workers, ahead of
+        the codes to prefetch.
+
+        Items of a queued batch of the same `key` not run yet are
+        dropped in favor of the new batch, and so are items of the
+        oldest batches once more than `MAX_BATCH_QUEUE` are queued.
+        `on_drop(items)` of a batch is called with its dropped items.
+        """
+        dropped = []
+        with self.condition:
+            old_batch = self.batches.pop(key, None)
+            if old_batch is not None:
+                dropped.append(old_batch)
+            self.batches[key] = (deque(items), func, on_drop)
+
+            queued = sum(len(batch[0]) for batch in self.batches.values())
+            while queued > settings['MAX_BATCH_QUEUE']:
+                oldest_key = next(iter(self.batches))
+                batch_items, batch_func, batch_on_drop = self.batches[oldest_key]
+                excess = min(queued - settings['MAX_BATCH_QUEUE'], len(batch_items))
+                # drop the last items of the oldest batch
+                dropped_items = [batch_items.pop() for _ in range(excess)][::-1]
+                dropped.append((dropped_items, batch_func, batch_on_drop))
+                if not batch_items:
+                    del self.batches[oldest_key]
+                queued -= excess
+
+            self.start_workers()
+            self.condition.notify_all()
+        self._drop(dropped)
+
+    @staticmethod
+    def _drop(batches):
+        for items, _, on_drop in batches:
+            if items and on_drop is not None:
+                on_drop(list(items))
+
+    def start_workers(self):
+        """Start worker threads up to `PREFETCH_WORKERS`, counting the
+        stopped ones still finishing, which are replaced once they exit.
+        """
+        with self.condition:
+            if self.stop_event.is_set():
+                self.stop_event = threading.Event()
+            while len(self.workers) < settings['PREFETCH_WORKERS']:
+                worker = threading.Thread(
+                    target=self.work, args=(self.stop_event,), daemon=True,
+                    name=f'sscn-prefetch-{next(self._worker_ids)}')
+                self.workers.append(worker)
+                worker.start()
+
+    def stop(self, wait=True):
+        """Drop pending codes and batches and stop the workers, waiting for their
+        ongoing fetches if `wait`.
+        """
+        with self.condition:
+            self.pending.clear()
+            dropped = list(self.batches.values())
+            self.batches.clear()
+            self.stop_event.set()
+            workers = list(self.workers)
+            self.condition.notify_all()
+        self._drop(dropped)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    @contextmanager
+    def interactive(self):
+        """Pause prefetching within this context."""
+        with self.condition:
+            self.interactive_count += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.interactive_count -= 1
+                self.condition.notify_all()
+
+    def wait_turn(self, stop_event):
+        """Block while serving interactive requests.
+        Return False if `stop_event` is set.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: stop_event.is_set() or not self.interactive_count)
+            return not stop_event.is_set()
+
+    def next_task(self, stop_event):
+        """Block until a batch item or a code is pending and no
+        interactive request is being served. Return the function to
+        run for it, or None if `stop_event` is set.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: stop_event.is_set() or (
+                (self.batches or self.pending) and not self.interactive_count))
+            if stop_event.is_set():
+                return None
+            if self.batches:
+                key = next(iter(self.batches))
+                items, func, _ = self.batches[key]
+                item = items.popleft()
+                if not items:
+                    del self.batches[key]
+                return functools.partial(func, item)
+            code = self.pending.popleft()
+            return functools.partial(self.prefetch_standard, code, stop_event)
+
+    def work(self, stop_event):
+        """Keep running pending tasks until `stop_event` is set."""
+        try:
+            while (task := self.next_task(stop_event)) is not None:
+                # pylint: disable=broad-exception-caught
+                # a failing task is logged, not stopping the worker
+                try:
+                    task()
+                except Exception:
+                    logger.error('Failed to run %s%r:',
+                                 task.func.__name__, task.args, exc_info=1)
+        finally:
+            with self.condition:
+                self.workers.remove(threading.current_thread())
+                # replace with a worker of the current generation
+                if not self.stop_event.is_set() and (
+                        self.pending or self.batches):
+                    self.start_workers()
+
+    def prefetch_standard(self, code, stop_event):
+        """Get fields `PREFETCH_FIELDS` of the standard of `code`."""
+        std = self.get_standard(code)
+        if not std.concret:
+            return
+        logger.debug('Prefetching %r.', std)
+        for field in settings['PREFETCH_FIELDS']:
+            # a fetch can't be paused, but the next one could wait
+            if not self.wait_turn(stop_event):
+                return
+            std.get_field(field)
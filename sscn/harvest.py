@@ -0,0 +1,56 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from .settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class HarvestCache:
+    """A bounded cache of fields harvested from sibling entries
+    of search result pages, keyed by `StandardCode`.
+
+    For each code, fields are stored per (origin class, page class),
+    exactly as returned by the page's `extract_fields()`.
+    """
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, code):
+        return code in self.entries
+
+    def add(self, code, origin_cls, page_cls, fields):
+        """Cache `fields` extracted by `page_cls` of `origin_cls`
+        for the standard of `code`.
+        """
+        with self.lock:
+            self.entries.setdefault(code, {})[(origin_cls, page_cls)] = fields
+            self.entries.move_to_end(code)
+            while len(self.entries) > settings['MAX_HARVESTED_STANDARDS']:
+                self.entries.popitem(last=False)
+
+    def get(self, code):
+        """Return a list of `(origin_cls, page_cls, fields)` harvested
+        for the standard of `code`.
+        """
+        with self.lock:
+            pages = self.entries.get(code)
+            if pages is None:
+                return []
+            self.entries.move_to_end(code)
+            return [(origin_cls, page_cls, fields)
+                for (origin_cls, page_cls), fields in pages.items()]
+
+    def clear(self):
+        """Forget all harvested fields."""
+        with self.lock:
+            self.entries.clear()
+
+
+harvested = HarvestCache()
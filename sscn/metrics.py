@@ -0,0 +1,211 @@
+"""Counters and latency histograms of requests, pages and fields.
+
+Metrics are recorded by `Origin.request`, `Page.fetch` and
+`ResourceNode.get_field` unless setting `METRICS` is off, and could be
+exported in the Prometheus text format or as a json snapshot.
+"""
+import os
+import json
+import math
+import threading
+from pathlib import Path
+
+from .settings import settings
+
+
+# upper bounds in seconds of the buckets of latency histograms
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf)
+# upper bounds in seconds of the buckets of cpu time histograms
+CPU_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, math.inf)
+
+
+class Histogram:
+    """Observed values counted into buckets by their upper bounds."""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Count `value` into its bucket."""
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate the `q` quantile as the upper bound of the bucket
+        it falls in, or None if nothing is observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return self.bounds[-1]
+
+
+def format_labels(labels, **extra):
+    """Format `labels` items and `extra` labels as Prometheus does."""
+    items = [*labels, *extra.items()]
+    if not items:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{value}"' for name, value in items) + '}'
+
+
+def format_bound(bound):
+    """Format a bucket bound as Prometheus does."""
+    return '+Inf' if bound == math.inf else repr(float(bound))
+
+
+class Metrics:
+    """Thread-safe counters and histograms, keyed by metric name
+    and labels.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        """Add `amount` to counter `name` with `labels`."""
+        if not settings['METRICS']:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """Count `value` into histogram `name` with `labels`."""
+        if not settings['METRICS']:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def clear(self):
+        """Forget all recorded metrics."""
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def get_counter(self, name, **labels):
+        """Sum counter `name` over those matching `labels`."""
+        labels = set(labels.items())
+        with self.lock:
+            return sum(
+                value for (key_name, key_labels), value in self.counters.items()
+                if key_name == name and labels <= set(key_labels))
+
+    def snapshot(self):
+        """Return all metrics as a dict that could be dumped to json."""
+        with self.lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'histograms': [
+                    {'name': name, 'labels': dict(labels),
+                     'buckets': [[format_bound(bound), count] for bound, count
+                                 in zip(histogram.bounds, histogram.counts)],
+                     'sum': histogram.sum, 'count': histogram.count}
+                    for (name, labels), histogram
+                    in sorted(self.histograms.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        """Return all metrics in the Prometheus text format."""
+        lines = []
+        with self.lock:
+            last_name = None
+            for (name, labels), value in sorted(self.counters.items()):
+                if name != last_name:
+                    lines.append(f'# TYPE {name} counter')
+                    last_name = name
+                lines.append(f'{name}{format_labels(labels)} {value}')
+
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name != last_name:
+                    lines.append(f'# TYPE {name} histogram')
+                    last_name = name
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket'
+                        f'{format_labels(labels, le=format_bound(bound))} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum}')
+                lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write all metrics to `path`, as json if it ends with `.json`,
+        otherwise in the Prometheus text format.
+        """
+        path = Path(path)
+        if path.suffix == '.json':
+            text = json.dumps(self.snapshot(), ensure_ascii=False)
+        else:
+            text = self.to_prometheus()
+        temp_path = path.with_name(path.name + '.tmp')
+        temp_path.write_text(text, encoding='UTF-8')
+        os.replace(temp_path, path)
+
+    def summarize(self):
+        """Return a summary for display: per origin, the requests,
+        errors, bytes, latency quantiles and page fetches; per field,
+        the cache hits and misses of standards.
+        """
+        origins = {}
+        fields = {}
+        def get_origin(name):
+            return origins.setdefault(name, {
+                'requests': 0, 'errors': 0, 'bytes': 0,
+                'latency_p50': None, 'latency_p90': None,
+                'page_fetches': 0, 'page_errors': 0,
+            })
+
+        with self.lock:
+            for (name, labels), value in self.counters.items():
+                labels = dict(labels)
+                if name == 'sscn_field_lookups_total':
+                    if labels['node'] == 'Standard':
+                        field = fields.setdefault(
+                            labels['field'], {'hits': 0, 'misses': 0})
+                        field['hits' if labels['result'] == 'hit' else 'misses'] += value
+                elif name == 'sscn_requests_total':
+                    origin = get_origin(labels['origin'])
+                    origin['requests'] += value
+                    if not labels['status'].isdigit() or labels['status'] >= '400':
+                        origin['errors'] += value
+                elif name == 'sscn_page_bytes_total':
+                    get_origin(labels['origin'])['bytes'] += value
+                elif name == 'sscn_page_fetches_total':
+                    origin = get_origin(labels['origin'])
+                    origin['page_fetches'] += value
+                    if labels['result'] != 'ok':
+                        origin['page_errors'] += value
+
+            for (name, labels), histogram in self.histograms.items():
+                if name != 'sscn_request_seconds' or not histogram.count:
+                    continue
+                origin = get_origin(dict(labels)['origin'])
+                origin['latency_p50'] = format_bound(histogram.quantile(0.5))
+                origin['latency_p90'] = format_bound(histogram.quantile(0.9))
+        return {'origins': origins, 'fields': fields}
+
+
+metrics = Metrics()
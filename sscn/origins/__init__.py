@@ -1,9 +1,133 @@
+"""Registry of the origins standards are searched through.
+
+Builtin origins, along with third-party ones registered as entry points
+of group `sscn.origins`, are imported once on first use. Origins could
+be disabled per deployment by their names in setting `DISABLED_ORIGINS`.
+"""
+import logging
+import importlib
+import threading
+from importlib.metadata import entry_points
+
+from ..settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'sscn.origins'
+
+# builtin origins in the order to be searched through
+BUILTIN_ORIGINS = (
+    'sscn.origins.ccsn:CCSNOrigin',
+    'sscn.origins.bzorg:BZOrgOrigin',
+    'sscn.origins.csres:CSRESOrigin',
+    'sscn.origins.bzko:BzkoOrigin',
+)
+
+
+def load_object(path):
+    """Import an object from a `'module:name'` path."""
+    module_name, _, name = path.partition(':')
+    return getattr(importlib.import_module(module_name), name)
+
+
+def select_entry_points(group):
+    """Return the entry points of `group`.
+
+    `entry_points(group=...)` is only accepted since python 3.10.
+    """
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, 'select'):
+        return all_entry_points.select(group=group)
+    # a dict of entry points by group before python 3.10
+    return all_entry_points.get(group, ())
+
+
+class OriginRegistry:
+    """Lazily loaded origin classes, with a routing table compiled
+    from their pages mapping each field to the origins serving it.
+    """
+    def __init__(self, builtins=BUILTIN_ORIGINS, group=ENTRY_POINT_GROUP):
+        self.builtins = builtins
+        self.group = group
+        self.lock = threading.RLock()
+        self._origins = None
+        # (disabled origin names, {field name: origin classes})
+        self._routes = None
+
+    def load(self):
+        """Return all registered origin classes, loading them first."""
+        if self._origins is None:
+            with self.lock:
+                if self._origins is None:
+                    self._origins = self._load()
+        return self._origins
+
+    def _load(self):
+        origins = [load_object(path) for path in self.builtins]
+        for entry_point in select_entry_points(self.group):
+            # pylint: disable=broad-exception-caught
+            # a broken plugin is logged and skipped, not breaking the builtins
+            try:
+                origin_cls = entry_point.load()
+            except Exception:
+                logger.error(
+                    'Failed to load origin `%s`:', entry_point.name, exc_info=1)
+                continue
+            if origin_cls not in origins:
+                origins.append(origin_cls)
+        logger.debug('Loaded origins: %s.',
+            ', '.join(origin_cls.__name__ for origin_cls in origins))
+        return origins
+
+    def register(self, origin_cls):
+        """Register `origin_cls` to be searched through after the others."""
+        with self.lock:
+            origins = self.load()
+            if origin_cls not in origins:
+                origins.append(origin_cls)
+            self._routes = None
+        return origin_cls
+
+    def unregister(self, origin_cls):
+        """Stop searching through `origin_cls`."""
+        with self.lock:
+            self.load().remove(origin_cls)
+            self._routes = None
+
+    def enabled(self):
+        """Return the tuple of origin classes not disabled by settings."""
+        disabled = settings['DISABLED_ORIGINS']
+        return tuple(origin_cls for origin_cls in self.load()
+                     if origin_cls.name not in disabled)
+
+    def get_routes(self):
+        """Return the routing table of enabled origins.
+
+        The table is compiled once and only recompiled after origins
+        are registered or disabled.
+        """
+        disabled = frozenset(settings['DISABLED_ORIGINS'])
+        routes = self._routes
+        if routes is None or routes[0] != disabled:
+            with self.lock:
+                table = {}
+                for origin_cls in self.enabled():
+                    for field_name in origin_cls.routes:
+                        table.setdefault(field_name, []).append(origin_cls)
+                routes = self._routes = (disabled, {
+                    field_name: tuple(origins)
+                    for field_name, origins in table.items()})
+        return routes[1]
+
+    def route(self, field_name):
+        """Return the origin classes able to fetch `field_name` in order."""
+        return self.get_routes().get(field_name, ())
+
+
+registry = OriginRegistry()
+
+
 def iter_origin_cls():
     """Return the origins tuple to be searched through."""
-    # old circular dependence
-    from .ccsn import CCSNOrigin
-    from .bzorg import BZOrgOrigin
-    from .csres import CSRESOrigin
-    from .bzko import BzkoOrigin
-
-    return (CCSNOrigin, BZOrgOrigin, CSRESOrigin, BzkoOrigin)
+    return registry.enabled()
@@ -2,16 +2,24 @@ import re
 
 from ..utils import NotFound
 from ..standard import Origin, StandardCode
-from ..page import DetailXPathPage, SearchXPathPage, PDFDownloader
+from ..page import (
+    DetailXPathPage, SearchXPathPage, PDFDownloader,
+    compile_xpath, xpath_get,)
 
 # pylint: disable=missing-class-docstring
 # no need
 
 class BzkoSearchPage(SearchXPathPage):
+    __slots__ = ()
+
     origin_only_fields = ('standard_id',)
 
     search_url = 'http://www.bzko.com/search.aspx'
     entry_xpath = r'//div[@class="c_content"]/li/a'
+    entry_code_xpath = r'./text()'
+    entry_tag = 'a'
+    entry_test_xpath = r'parent::li/parent::div[@class="c_content"]'
+    _detail_url_xpath = compile_xpath(r'./@href')
 
     def get_query_params(self):
         code = self.origin.std.code
@@ -19,8 +27,7 @@ class BzkoSearchPage(SearchXPathPage):
         return {'keyword': keyword}
 
     def is_entry_matching(self, entry):
-        full_title = entry.xpath('./text()').get()
-        code = StandardCode.parse(full_title)
+        code = StandardCode.parse(self.get_entry_code(entry))
         target = self.origin.std.code
         return (
             code.prefix == target.prefix
@@ -30,7 +37,7 @@ class BzkoSearchPage(SearchXPathPage):
         )
 
     def extract_fields(self, content):
-        detail_url = content.xpath('./@href').get()
+        detail_url = xpath_get(content, self._detail_url_xpath)
         standard_id = re.search(
             r'/std/([0-9]*)\.html',
             detail_url).group(1)
@@ -40,6 +47,8 @@ class BzkoSearchPage(SearchXPathPage):
 
 
 class BzkoDownloadPage(DetailXPathPage):
+    __slots__ = ()
+
     origin_only_fields = ('download_url',)
 
     field_xpaths = {
@@ -56,12 +65,16 @@ class BzkoDownloadPage(DetailXPathPage):
 
 
 class BzkoPDFDownloader(PDFDownloader):
-    pass
+    __slots__ = ()
 
 
 class BzkoOrigin(Origin):
     """Source of standard: www.bzko.com (标准库)"""
+    __slots__ = ()
+
     index = 'www.bzko.com'
     name = 'bzko'
     full_name = '标准库'
+    # pages declare gb2312, decoded as its superset like browsers do
+    encoding = 'GBK'
     pages = (BzkoSearchPage, BzkoDownloadPage, BzkoPDFDownloader)
@@ -1,7 +1,6 @@
 import re
-import os
-import time
 import logging
+import threading
 from urllib.parse import urljoin
 
 import parsel
@@ -19,6 +18,8 @@ logger = logging.getLogger(__name__)
 
 
 class BZOrgSearchPage(SearchXPathPage):
+    __slots__ = ()
+
     public_fields = (
         'title', 'ics', 'ccs', 'issuance_date', 'implementation_date',
         'status',)
@@ -26,6 +27,10 @@ class BZOrgSearchPage(SearchXPathPage):
 
     search_url = r'https://www.biaozhun.org/plus/search.php'
     entry_xpath = r'//div[@class="list"]/ul/li'
+    entry_code_xpath = r'string(./div[2]/div[1]/a)'
+    entry_tag = 'li'
+    entry_test_xpath = r'parent::ul/parent::div[@class="list"]'
+    harvestable = True
     field_xpaths = {
         'detail_page_url': (r'./div[2]/div[1]/a/@href', NotFound),
         'ics': (r'./div[2]//span[@class="ccsicon"]/em/text()', NotFound),
@@ -34,7 +39,6 @@ class BZOrgSearchPage(SearchXPathPage):
         'implementation_date': (r'./div[3]//em[1]/text()', NotFound),
         '_status': (r'.//div[@class="state"]/text()', NotFound),
     }
-    _full_title_xpath = r'./div[2]/div[1]/a//text()'
 
     def get_query_params(self):
         code = self.origin.std.code
@@ -47,18 +51,13 @@ class BZOrgSearchPage(SearchXPathPage):
         return super().request(*args, method='POST', **kwargs)
 
     def is_entry_matching(self, entry):
-        full_title = ''.join(
-            entry.xpath(self._full_title_xpath).getall()
-            )
-        parsed = StandardCode.parse(full_title)
+        parsed = StandardCode.parse(self.get_entry_code(entry))
         return parsed == self.origin.std.code
 
     def extract_fields(self, content):
         fields = super().extract_fields(content)
 
-        full_title = ''.join(
-            content.xpath(self._full_title_xpath).getall()
-            )
+        full_title = self.get_entry_code(content)
         fields['title'] = re.search(
             r'\d\s(.+)\s*$', full_title).groups()[0]
 
@@ -73,6 +72,8 @@ class BZOrgSearchPage(SearchXPathPage):
 
 
 class BZOrgDetailPage(DetailXPathPage):
+    __slots__ = ()
+
     origin_only_fields = ('download_page_url',)
 
     url_field = 'detail_page_url'
@@ -84,6 +85,8 @@ class BZOrgDetailPage(DetailXPathPage):
 
 
 class BZOrgDownloadPage(DetailXPathPage):
+    __slots__ = ()
+
     origin_only_fields = ('download_1_url', 'download_2_url')
 
     url_field = 'download_page_url'
@@ -95,64 +98,78 @@ class BZOrgDownloadPage(DetailXPathPage):
 
 
 class BZorgDownloader(PDFDownloader):
-    pass
+    __slots__ = ()
 
 
 class BZorgDownloaderA(BZorgDownloader):
+    __slots__ = ()
+
     url_field = 'download_1_url'
 
 
 class BZorgDownloaderB(BZorgDownloader):
+    __slots__ = ()
+
     url_field = 'download_2_url'
 
 
 class BZOrgOrigin(Origin):
     """Source of standard: www.biaozhun.org (标准网)"""
+    __slots__ = ()
+
     index = 'www.biaozhun.org'
     name = 'biaozhun'
     full_name = '标准网'
     pages = (
         BZOrgSearchPage, BZOrgDetailPage, BZOrgDownloadPage,
         BZorgDownloaderA, BZorgDownloaderB,)
+    scheme = 'https'
     request_timeout = 6
+    encoding = 'utf-8'
+    # the login, set without expiry
+    session_cookies = (
+        'DedeLoginTime', 'DedeLoginTime__ckMd5',
+        'DedeUserID', 'DedeUserID__ckMd5',
+        )
 
     logged_in = False
-    _cancel_login = False
+    _login_cancelled = threading.Event()
 
     @classmethod
-    def load_cached_session(cls):
-        """Load cached session info from local file"""
-        cache_path = get_absolute_path(settings['CACHE_DIR']) / cls.name
-        if not cache_path.is_file():
-            return False
-        with cache_path.open(encoding='UTF-8') as file:
-            for line in file.readlines():
-                if '=' not in line:
-                    continue
-                key, _, value = line.partition('=')
-                cls.session.cookies.set(key.strip(), value.strip())
-        return True
+    def init_session(cls):
+        session = super().init_session()
+        if settings['PERSIST_SESSIONS']:
+            try:
+                cls.import_legacy_session()
+            except OSError:
+                # tried again with the next session
+                logger.error('Failed to import the legacy session of `%s`:',
+                             cls.name, exc_info=1)
+        return session
 
     @classmethod
-    def cache_session(cls):
-        """Cache session info to local file"""
-        cache_dir = get_absolute_path(settings['CACHE_DIR'])
-        if not cache_dir.is_dir():
-            os.mkdir(cache_dir)
-
-        cache_path =  cache_dir / cls.name
-        with cache_path.open('w', encoding='UTF-8') as file:
-            for key in (
-                'DedeLoginTime', 'DedeLoginTime__ckMd5',
-                'DedeUserID', 'DedeUserID__ckMd5',
-                ):
-                value = cls.session.cookies.get(key, '')
-                file.write(f'{key}={value}\n')
+    def import_legacy_session(cls):
+        """Import the login stored by earlier versions as `key=value`
+        lines in file `CACHE_DIR/biaozhun`, then remove the file.
+        """
+        legacy_path = get_absolute_path(settings['CACHE_DIR']) / cls.name
+        if not legacy_path.is_file():
+            return
+        with legacy_path.open(encoding='UTF-8') as file:
+            for line in file:
+                key, _, value = line.partition('=')
+                key, value = key.strip(), value.strip()
+                # absent cookies were stored empty
+                if key in cls.session_cookies and value:
+                    cls.session.cookies.set(key, value, domain=cls.index)
+        cls.cache_session()
+        legacy_path.unlink()
+        logger.info('Imported the legacy session of `%s`.', cls.name)
 
     @classmethod
     def cancel_login(cls):
         """Cancel ongoing login process"""
-        cls._cancel_login = True
+        cls._login_cancelled.set()
 
     @classmethod
     def check_login(cls):
@@ -167,18 +184,18 @@ class BZOrgOrigin(Origin):
     @classmethod
     def login(cls):
         """Login to bzorg"""
-        if not cls.session:
-            cls.init_session()
+        # forget cancelling of an earlier login, before any request
+        #  which this login could be cancelled during
+        cls._login_cancelled.clear()
+        cls.get_session()
 
-        # try loading cached session info
-        if cls.load_cached_session():
+        # try the session loaded from cached cookies
+        if any(cookie.name == 'DedeUserID' for cookie in cls.session.cookies):
             if cls.check_login():
                 cls.logged_in = True
                 return None
             # cache expired so forget about it
-            cls.session.cookies.clear()
-            cache_path = get_absolute_path(settings['CACHE_DIR']) / cls.name
-            cache_path.unlink()
+            cls.clear_session()
 
         logger.info('Logging into www.biaozhun.org...')
 
@@ -208,17 +225,16 @@ class BZOrgOrigin(Origin):
         show_func = settings['SHOW_WECHAT_LOGIN_CODE_FUNC']
         show_func(cls, img_url)
 
-        cls._cancel_login = False
         status = None
         loops = 0
         while True:
-            if cls._cancel_login:
-                logger.info('Logging canceled.')
-                raise ContentUnavailable('Logging canceled')
             if loops > 40:
                 raise ContentUnavailable('Logging timeout')
 
-            time.sleep(1)
+            # wait a second between checks, unless canceled meanwhile
+            if cls._login_cancelled.wait(1):
+                logger.info('Logging canceled.')
+                raise ContentUnavailable('Logging canceled')
             checking_response = cls.request(
                 check_url,
                 params={'last': status} if status else {},
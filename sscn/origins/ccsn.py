@@ -6,11 +6,17 @@ from ..page import DetailXPathPage, SearchXPathPage, PDFDownloader
 # no need
 
 class CCSNSearchPage(SearchXPathPage):
+    __slots__ = ()
+
     public_fields = ('title', 'title_english', 'status')
     origin_only_fields = ('detail_page_url',)
 
     search_url = 'http://www.ccsn.org.cn/Xxbz/ForceStandardList.aspx'
     entry_xpath = r'//td[@class="DataListItemStyleCss"]'
+    entry_code_xpath = r'.//td[contains(@id,"_mainTd")]/*/text()'
+    entry_tag = 'td'
+    entry_test_xpath = r'@class="DataListItemStyleCss"'
+    harvestable = True
     field_xpaths = {
         '_title': (r'.//td[contains(@id,"_mainTd")]/*/text()', NotFound),
         'title_english': (
@@ -23,10 +29,7 @@ class CCSNSearchPage(SearchXPathPage):
         return {'keyword': code}
 
     def is_entry_matching(self, entry):
-        title = entry.xpath(
-            self.field_xpaths['_title'][0]
-            ).get()
-        parsed = StandardCode.parse(title)
+        parsed = StandardCode.parse(self.get_entry_code(entry))
         return parsed == self.origin.std.code
 
     def extract_fields(self, content):
@@ -37,6 +40,8 @@ class CCSNSearchPage(SearchXPathPage):
 
 
 class CCSNDetailPage(DetailXPathPage):
+    __slots__ = ()
+
     public_fields = (
         'issuance_date', 'implementation_date', 'issued_by',
     )
@@ -75,6 +80,8 @@ class CCSNDetailPage(DetailXPathPage):
 
 
 class CCSNDownloadPage(DetailXPathPage):
+    __slots__ = ()
+
     origin_only_fields = ('download_url',)
 
     url_field = 'download_page_url'
@@ -84,14 +91,17 @@ class CCSNDownloadPage(DetailXPathPage):
 
 
 class CCSNPDFDownloader(PDFDownloader):
-    pass
+    __slots__ = ()
 
 
 class CCSNOrigin(Origin):
     """Source of standard: www.ccsn.org.cn (国家工程建设标准化信息网)"""
+    __slots__ = ()
+
     index = 'www.ccsn.org.cn'
     name = 'ccsn'
     full_name = '国家工程建设标准化信息网'
+    encoding = 'utf-8'
     pages = (
         CCSNSearchPage, CCSNDetailPage,
         CCSNDownloadPage, CCSNPDFDownloader,
@@ -1,11 +1,15 @@
 import re
 import logging
+import sqlite3
 import parsel
 
 from ..settings import settings
 from ..utils import NotFound
 from ..standard import Origin, Status, StandardCode
-from ..page import DetailXPathPage, SearchXPathPage
+from ..supersession import graph
+from ..page import (
+    DetailXPathPage, SearchXPathPage,
+    compile_xpath, xpath_getall,)
 
 # pylint: disable=missing-class-docstring
 # no need
@@ -13,6 +17,8 @@ from ..page import DetailXPathPage, SearchXPathPage
 logger = logging.getLogger(__name__)
 
 class CSRESSearchPage(SearchXPathPage):
+    __slots__ = ()
+
     public_fields = (
         'title', 'issuance_date', 'implementation_date',
         'issued_by', 'status',)
@@ -21,6 +27,10 @@ class CSRESSearchPage(SearchXPathPage):
 
     search_url = 'http://www.csres.com/s.jsp?'
     entry_xpath = r'//tr[starts-with(@title,"编号")]'
+    entry_code_xpath = r'./td[1]/a/font/text()'
+    entry_tag = 'tr'
+    entry_test_xpath = r'starts-with(@title,"编号")'
+    harvestable = True
     field_xpaths = {
         '_info': (r'./@title', NotFound),
         '_status': (r'./td[5]/font/text()', NotFound),
@@ -41,7 +51,7 @@ class CSRESSearchPage(SearchXPathPage):
         return {'keyword': keyword}
 
     def is_entry_matching(self, entry):
-        code = entry.xpath(r'./td[1]/a/font/text()').get()
+        code = self.get_entry_code(entry)
         return str(self.origin.std.code) in code
 
     def extract_fields(self, content):
@@ -63,6 +73,8 @@ class CSRESSearchPage(SearchXPathPage):
 
 
 class CSRESDetailPage(DetailXPathPage):
+    __slots__ = ()
+
     public_fields = (
         'substitute', 'partial_substitutes', 'replaced', 'brief',
         )
@@ -74,6 +86,8 @@ class CSRESDetailPage(DetailXPathPage):
             r'.//td[table/tr/td[text()="标准简介"]]/table[2]/tr/td/text()',
             NotFound),
     }
+    _substitute_xpath = compile_xpath(
+        r'.//tr[td/span/strong[text()="替代情况："]]/td[2]//*/text()')
 
     def extract_fields(self, content):
         fields = super().extract_fields(content)
@@ -81,9 +95,7 @@ class CSRESDetailPage(DetailXPathPage):
         substitutes = []
         partial_substitutes = []
         replaced = []
-        subtitute_texts = content.xpath(
-            r'.//tr[td/span/strong[text()="替代情况："]]/td[2]//*/text()',
-            ).getall()
+        subtitute_texts = xpath_getall(content, self._substitute_xpath)
 
         statements = ''.join(subtitute_texts).split(';')
         for statement in statements:
@@ -109,12 +121,29 @@ class CSRESDetailPage(DetailXPathPage):
 
         return fields
 
+    def post_fetch(self, fetched_fields):
+        super().post_fetch(fetched_fields)
+        try:
+            graph.record(
+                self.origin.std.code,
+                substitute=fetched_fields['substitute'],
+                replaced=fetched_fields['replaced'],
+                partial_substitutes=fetched_fields['partial_substitutes'],
+                )
+        except (sqlite3.Error, ValueError):
+            # the fields are fetched anyway
+            logger.exception('Failed to record supersession of %s.',
+                             self.origin.std.code)
+
 class CSRESOrigin(Origin):
     """Source of standard: www.csres.com (工标网)"""
+    __slots__ = ()
+
     index = 'www.csres.com'
     name = 'csres'
     full_name = '工标网'
     request_timeout = 10
+    encoding = 'GBK'
     pages = (CSRESSearchPage, CSRESDetailPage,)
 
 
@@ -257,9 +286,11 @@ def compute_standard_sorting_key(standard):
     """Summarize a float value representing the relevance of a standard."""
     code = standard['code']
     title = standard['title']
+    # pylint: disable=broad-exception-caught
+    # a result failing to be scored is logged and sorted last
     try:
         score = _compute_standard_sorting_key(code, title)
-    except Exception:    # pylint: disable=broad-exception-caught; not silent
+    except Exception:
         logger.error('Error summarizing `%s`.', str(code), exc_info=1)
         return -1
     return score
@@ -286,6 +317,7 @@ def search_standards(raw_query):
                 'pageNum': current_page,
                 'SortIndex': 2,
             })
+        response.encoding = CSRESOrigin.get_encoding(response)
         root = parsel.Selector(text=response.text)
         results = root.xpath(entry_xpath)
 
@@ -1,24 +1,119 @@
 import re
 import io
+import time
 import logging
 import zipfile
+import threading
+import functools
 from urllib.parse import urljoin
 
 import parsel
-import rarfile
+from lxml import etree
 
 from .settings import settings
 from .utils import NotFound
+from .harvest import harvested
+from .metrics import metrics, CPU_BUCKETS
+from .tracing import tracer
+from .standard import StandardCode
+from .deadline import remaining, is_exceeded
 from .exceptions import (
     ContentNotFound, RequestError, ContentUnavailable,
-    FieldNotRegistered, StandardNotFound,)
+    FieldNotRegistered, StandardNotFound, DeadlineExceeded,)
 
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def compile_xpath(query):
+    """Compile an xpath `query` str into an `lxml.etree.XPath` object.
+
+    Compiled objects are cached so each distinct query is only compiled once.
+    """
+    return etree.XPath(query)
+
+
+def _stringify(result):
+    """Turn an xpath result into str the same way `parsel` does."""
+    if isinstance(result, etree._Element):  # pylint: disable=protected-access
+        return etree.tostring(
+            result, method='html', encoding='unicode', with_tail=False)
+    return str(result)
+
+
+def xpath_all(node, query):
+    """Perform xpath `query` on lxml element(s) `node`.
+
+    `node` could be a single element or a list of elements, in which
+    case the results of all elements are concatenated.
+    `query` could be either a str or a compiled `lxml.etree.XPath`.
+    Returns a list of raw lxml results.
+    """
+    if isinstance(query, str):
+        query = compile_xpath(query)
+    nodes = node if isinstance(node, list) else (node,)
+
+    results = []
+    for each in nodes:
+        result = query(each)
+        if isinstance(result, list):
+            results.extend(result)
+        else:
+            results.append(result)
+    return results
+
+
+def xpath_get(node, query, default=None):
+    """Like `parsel.SelectorList.get()`: return the first result as str."""
+    results = xpath_all(node, query)
+    if not results:
+        return default
+    return _stringify(results[0])
+
+
+def xpath_getall(node, query):
+    """Like `parsel.SelectorList.getall()`: return all results as strs."""
+    return [_stringify(result) for result in xpath_all(node, query)]
+
+
+class Flight:
+    """A fetch in progress, which concurrent callers wait for
+    instead of fetching the same page again.
+    """
+    __slots__ = ('done', 'fields', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.fields = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        """Wait for the fetch and return its fields or raise its error.
+
+        Raise `DeadlineExceeded` if not done within `timeout` seconds.
+        """
+        if not self.done.wait(timeout):
+            raise DeadlineExceeded()
+        if self.error is not None:
+            raise self.error
+        return self.fields
+
+
 class Page:
-    """Base Page class."""
+    """Base Page class.
+
+    Unless setting `RELEASE_RESPONSES` is off, a fetched page only keeps
+    the url it was finally requested from, while the response and
+    parsed content are released once the fields are extracted.
+
+    Pages are thread-safe: concurrent `get_field()` calls are coalesced
+    into a single fetch.
+    """
+    __slots__ = (
+        'origin', 'request_errored', 'success', 'response', 'url', 'error',
+        '_lock', '_flight')
+
     public_fields = ()
     origin_only_fields = ()
     preferred_fields = ()
@@ -29,6 +124,10 @@ class Page:
         self.request_errored = 0
         self.success = None
         self.response = None
+        self.url = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._flight = None
 
     def __repr__(self):
         return f'<{self.__class__.__name__} code={self.origin.std.code}>'
@@ -38,6 +137,40 @@ class Page:
         """
         logger.debug('%r: getting field "%s"...', self, name)
 
+        with self._lock:
+            flight = self._flight
+            in_flight = flight is not None
+            if not in_flight:
+                self.check_fetchable()
+                flight = self._flight = Flight()
+
+        # wait for the same page being fetched by another thread
+        if in_flight:
+            logger.debug('%r: waiting for the fetch in flight.', self)
+            try:
+                with tracer.span(f'{type(self).__name__}.wait', cat='page'):
+                    return flight.wait(remaining())[name]
+            except DeadlineExceeded:
+                if is_exceeded():
+                    raise
+                # the fetch ran out of its own deadline, not ours
+                return self.get_field(name)
+
+        try:
+            flight.fields = self.fetch_once()
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+
+        logger.debug('%r: field "%s" fetched.', self, name)
+        return flight.fields[name]
+
+    def check_fetchable(self):
+        """Raise if this page should not be fetched (again)."""
         # this page has already been fetched
         if self.success is not None:
             # non-NotFound fields must have been cached by Origin or Standard
@@ -51,25 +184,46 @@ class Page:
                 ):
                 raise ContentUnavailable()
 
-        try:
-            fields = self.fetch()
-        except RequestError as err:
-            self.success = False
-            self.request_errored += 1
-            self.response = err
-            raise
-        except ContentUnavailable as err:
-            raise err
-        except Exception as err:
-            logger.error('Page %s errored:', self, exc_info=1)
-            self.success = False
-            raise ContentUnavailable() from err
+    def fetch_once(self):
+        """Fetch the page and keep track of its success."""
+        labels = self.get_metric_labels()
+        with tracer.span(f'{labels["page"]}.fetch', cat='page', **labels) as span:
+            start = time.perf_counter()
+            result = 'error'
+            try:
+                fields = self.fetch()
+            except DeadlineExceeded:
+                result = 'deadline'
+                # not a failure of the page, it could be fetched later
+                raise
+            except RequestError as err:
+                result = 'request_error'
+                self.success = False
+                self.request_errored += 1
+                self.error = err
+                raise
+            except ContentUnavailable as err:
+                result = 'unavailable'
+                raise err
+            except Exception as err:
+                logger.error('Page %s errored:', self, exc_info=1)
+                self.success = False
+                raise ContentUnavailable() from err
+            else:
+                result = 'ok'
+            finally:
+                span.set(result=result)
+                metrics.inc('sscn_page_fetches_total', result=result, **labels)
+                metrics.observe('sscn_page_fetch_seconds',
+                                time.perf_counter() - start, **labels)
 
         self.success = True
         self.request_errored = 0
+        return fields
 
-        logger.debug('%r: field "%s" fetched.', self, name)
-        return fields[name]
+    def get_metric_labels(self):
+        """Labels of the metrics recorded for this page."""
+        return {'origin': self.origin.name, 'page': type(self).__name__}
 
     def fetch(self):
         """Fetch the remote page and return extracted fields.
@@ -78,8 +232,21 @@ class Page:
         if not url:
             raise ContentNotFound()
         response = self.request(url)
-        content = self.parse_response(response)
-        fields = self.extract_fields(content)
+        labels = self.get_metric_labels()
+        metrics.inc('sscn_page_bytes_total', len(response.content), **labels)
+
+        start = time.thread_time()
+        with tracer.span('parse_response', cat='parse', **labels):
+            content = self.parse_response(response)
+        parsed = time.thread_time()
+        with tracer.span('extract_fields', cat='parse', **labels):
+            fields = self.extract_fields(content)
+        metrics.observe('sscn_parse_cpu_seconds', parsed - start,
+                        buckets=CPU_BUCKETS, stage='parse', **labels)
+        metrics.observe('sscn_parse_cpu_seconds', time.thread_time() - parsed,
+                        buckets=CPU_BUCKETS, stage='extract', **labels)
+        if settings['RELEASE_RESPONSES']:
+            self.response = None
 
         self.post_fetch(fields)
         return fields
@@ -130,6 +297,7 @@ class Page:
             })
         response = self.origin.request(*args, **kwargs)
         self.response = response
+        self.url = response.url
         return response
 
     def get_url(self):
@@ -146,18 +314,27 @@ class Page:
         """
         raise NotImplementedError()
 
+    def get_encoding(self, response):
+        """Get the encoding of `response`, or None if unknown."""
+        return self.origin.get_encoding(response)
+
     def parse_response(self, response):
         """Parse the raw http `response` to its content."""
+        encoding = self.get_encoding(response)
+        if encoding:
+            response.encoding = encoding
         return response.text
 
     def parse_url_field(self, url_field):
         """Make sure extracted url is complete by joining with the request url."""
-        parsed = urljoin(self.response.url, url_field)
+        parsed = urljoin(self.url, url_field)
         return parsed
 
 
 class PDFDownloader(Page):
     """Abstract page class for downloading field `pdf`."""
+    __slots__ = ()
+
     public_fields = ('pdf',)
     url_field = 'download_url'
 
@@ -186,6 +363,9 @@ class PDFDownloader(Page):
         if file_format == 'pdf':
             return response.content
 
+        # pylint: disable=import-outside-toplevel
+        # only needed for rar archives, which are rare
+        import rarfile
         archive_formats = {'zip': zipfile.ZipFile,
                            'rar': rarfile.RarFile,}
         if file_format in archive_formats:
@@ -212,37 +392,77 @@ class XPathPage(Page):
                     'field_name': ('xpath_query', default),
                     ...
                 }
+
+    Xpath strs are compiled into `lxml.etree.XPath` objects once, when
+    the class is defined.
     """
+    __slots__ = ()
+
     base_node_xpath = None
     field_xpaths = None
 
+    _base_node_xpath = None
+    _field_xpaths = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.compile_xpaths()
+
+    @classmethod
+    def compile_xpaths(cls):
+        """Compile the xpath strs declared by the class."""
+        cls._base_node_xpath = (compile_xpath(cls.base_node_xpath)
+            if cls.base_node_xpath else None)
+        cls._field_xpaths = {
+            name: (compile_xpath(query), default)
+            for name, (query, default) in (cls.field_xpaths or {}).items()
+        }
+
     def get_url(self):
         raise NotImplementedError()
 
-    def get_base_node(self, html):
-        """Get the base xpath node from html content."""
-        root = parsel.Selector(text=html)
-        if not self.base_node_xpath:
+    def get_root(self, response):
+        """Parse raw http `response` into the root lxml element.
+
+        With setting `LXML_FAST_PATH`, the raw bytes are handed to lxml
+        directly, skipping decoding and `parsel.Selector` wrapping. If
+        neither the http headers nor the origin declares an encoding,
+        it's detected by lxml from the html meta tags.
+        """
+        if not settings['LXML_FAST_PATH']:
+            html = super().parse_response(response)
+            return parsel.Selector(text=html).root
+
+        parser = etree.HTMLParser(encoding=self.get_encoding(response))
+        root = etree.fromstring(
+            response.content.strip() or b'<html/>', parser=parser)
+        if root is None:
+            root = etree.fromstring(b'<html/>', parser=parser)
+        return root
+
+    def get_base_node(self, root):
+        """Get the base xpath node(s) from the `root` element."""
+        if self._base_node_xpath is None:
             return root
 
-        base = root.xpath(self.base_node_xpath)
+        base = xpath_all(root, self._base_node_xpath)
         return base
 
     def parse_response(self, response):
         """Parse raw http response into a root xpath node."""
-        html = super().parse_response(response)
-        base = self.get_base_node(html)
+        root = self.get_root(response)
+        base = self.get_base_node(root)
         return base
 
     def extract_fields(self, content):
         """Perform xpath search for fields in `field_xpaths` on root `base`."""
-        if not self.field_xpaths:
+        if not self._field_xpaths:
             return {}
 
         fields = {}
-        for name, args in self.field_xpaths.items():
+        for name, args in self._field_xpaths.items():
             query, default = args
-            field = content.xpath(query).get(NotFound)
+            field = xpath_get(content, query, NotFound)
             if (field is not NotFound
                     and not field):
                 field = default
@@ -255,6 +475,8 @@ class XPathPage(Page):
 
 class DetailXPathPage(XPathPage):
     """Abstract page class to get detailed fields of a standard."""
+    __slots__ = ()
+
     url_field = None
 
     def get_url(self):
@@ -263,17 +485,79 @@ class DetailXPathPage(XPathPage):
 
 
 class SearchXPathPage(XPathPage):
-    """Abstract page class to search for a standard."""
+    """Abstract page class to search for a standard.
+
+    entry_xpath: an xpath str selecting all search result entries
+    entry_code_xpath: an xpath str for the raw code text of an entry,
+                used to cheaply pre-filter entries before parsing codes
+    entry_tag, entry_test_xpath: the tag name of entries and an xpath
+                predicate str telling whether such an element is an
+                entry; enables incremental parsing
+    harvestable: whether fields of the other entries could be harvested
+                with setting `HARVEST_SEARCH_ENTRIES`
+    """
+    __slots__ = ()
+
     search_url = None
     entry_xpath = None
+    entry_code_xpath = None
+    entry_tag = None
+    entry_test_xpath = None
+    harvestable = False
+
+    _entry_xpath = None
+    _entry_code_xpath = None
+    _entry_test_xpath = None
+
+    @classmethod
+    def compile_xpaths(cls):
+        super().compile_xpaths()
+        cls._entry_xpath = (compile_xpath(cls.entry_xpath)
+            if cls.entry_xpath else None)
+        cls._entry_code_xpath = (compile_xpath(cls.entry_code_xpath)
+            if cls.entry_code_xpath else None)
+        cls._entry_test_xpath = (
+            compile_xpath(f'boolean({cls.entry_test_xpath})')
+            if cls.entry_test_xpath else None)
 
     def get_entries(self, base):
         """Get all entries from the root xpath node `base`
         of research request.
         """
-        entries = base.xpath(self.entry_xpath)
+        entries = xpath_all(base, self._entry_xpath)
         return entries
 
+    def iterparse_entries(self, response):
+        """Incrementally parse raw http `response` and yield entries
+        as soon as each of them is completely parsed.
+
+        The rest of the document is never parsed if the iteration
+        stops early.
+        """
+        events = etree.iterparse(
+            io.BytesIO(response.content),
+            events=('end',),
+            tag=self.entry_tag,
+            html=True,
+            encoding=self.get_encoding(response),
+            )
+        for _, element in events:
+            if (self._entry_test_xpath is None
+                    or self._entry_test_xpath(element)):
+                yield element
+
+    def get_entry_code(self, entry):
+        """Get the raw code text of search result `entry`."""
+        return xpath_get(entry, self._entry_code_xpath, '')
+
+    def is_entry_candidate(self, entry):
+        """Cheaply determine whether search result `entry` could
+        match with the required standard, without parsing its code.
+        """
+        if self._entry_code_xpath is None:
+            return True
+        return self.origin.std.code.number in self.get_entry_code(entry)
+
     def is_entry_matching(self, entry):
         """Determine whether search result `entry`
         matches with the required standard.
@@ -282,25 +566,76 @@ class SearchXPathPage(XPathPage):
         """
         raise NotImplementedError()
 
+    def find_entry(self, entries):
+        """Get the first matching entry from iterable `entries`.
+
+        Stop consuming `entries` as soon as the entry is found.
+        """
+        for entry in entries:
+            if (self.is_entry_candidate(entry)
+                    and self.is_entry_matching(entry)):
+                return entry
+
+        logger.info(
+            'Can not find %s in origin `%s`.',
+            self.origin.std.code,
+            self.origin.name,
+        )
+        raise StandardNotFound()
+
     def get_entry(self, base):
         """Get the matching entry from the root xpath node `base`
         of research request."""
         entries = self.get_entries(base)
-        matchings = [e for e in entries if self.is_entry_matching(e)]
-        if not matchings:
-            logger.info(
-                'Can not find %s in origin `%s`.',
-                self.origin.std.code,
-                self.origin.name,
-            )
-            raise StandardNotFound()
-        return matchings[0]
+        if self.is_harvesting():
+            self.harvest_entries(entries)
+        return self.find_entry(entries)
+
+    def is_harvesting(self):
+        """Whether to harvest fields of all entries on this page."""
+        return self.harvestable and settings['HARVEST_SEARCH_ENTRIES']
+
+    def harvest_entries(self, entries):
+        """Extract fields of every entry representing another concret
+        standard and cache them for later use.
+        """
+        target = self.origin.std.code
+        for entry in entries:
+            try:
+                code = StandardCode.parse(self.get_entry_code(entry))
+            except ValueError:
+                continue
+            if code == target or not code.is_concret():
+                continue
+
+            # pylint: disable=broad-exception-caught
+            # a malformed entry is logged and skipped, not failing the page
+            try:
+                fields = self.extract_fields(entry)
+            except Exception:
+                logger.debug(
+                    '%r: failed harvesting %s.', self, code, exc_info=1)
+                continue
+            harvested.add(code, type(self.origin), type(self), fields)
 
-    def get_base_node(self, html):
-        base = super().get_base_node(html)
+    def get_base_node(self, root):
+        base = super().get_base_node(root)
         entry = self.get_entry(base)
         return entry
 
+    def parse_response(self, response):
+        """Parse raw http response into the matching entry node.
+
+        With setting `INCREMENTAL_SEARCH_PARSE`, pages declaring
+        `entry_tag` stop parsing once the entry is found, unless
+        harvesting which needs every entry.
+        """
+        if (settings['INCREMENTAL_SEARCH_PARSE']
+                and self.entry_tag is not None
+                and not self.is_harvesting()):
+            return self.find_entry(self.iterparse_entries(response))
+        return super().parse_response(response)
+
     def get_url(self):
         return self.search_url
 
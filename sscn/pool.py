@@ -0,0 +1,86 @@
+"""Connection pools of origin sessions.
+
+Imported on first session, so that `requests` isn't loaded at startup.
+"""
+import contextvars
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectTimeout
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+
+from .settings import settings
+
+
+# seconds a request waits for a free connection of a full blocking pool
+pool_timeout = contextvars.ContextVar('pool_timeout', default=None)
+
+
+class BoundedPoolMixin:
+    """Wait for a free connection at most `pool_timeout` seconds,
+    which `requests` doesn't pass to the pools.
+    """
+    def _get_conn(self, timeout=None):
+        if timeout is None:
+            timeout = pool_timeout.get()
+        return super()._get_conn(timeout=timeout)
+
+
+class BoundedHTTPConnectionPool(BoundedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class BoundedHTTPSConnectionPool(BoundedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class CountingAdapter(HTTPAdapter):
+    """A `HTTPAdapter` that could report how the connections of its
+    pools are used.
+
+    With `pool_block`, waiting for a free connection is bounded by the
+    connect timeout of the request, then `ConnectTimeout` is raised.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': BoundedHTTPConnectionPool,
+            'https': BoundedHTTPSConnectionPool,
+        }
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        # pylint: disable=arguments-differ
+        # the other arguments are passed along in `kwargs`
+        wait = timeout[0] if isinstance(timeout, tuple) else timeout
+        if not isinstance(wait, (int, float)):
+            wait = settings['TIMEOUT']
+        token = pool_timeout.set(wait)
+        try:
+            return super().send(request, stream=stream, timeout=timeout, **kwargs)
+        except EmptyPoolError as err:
+            raise ConnectTimeout(err, request=request) from err
+        finally:
+            pool_timeout.reset(token)
+
+    def get_stats(self):
+        """Return counters of connections summed over all hosts:
+
+        - `active`: checked out for ongoing requests
+        - `idle`: kept alive in the pools for reuse
+        - `created`: opened since the adapter was created
+        - `requests`: requests sent through the pools
+        """
+        stats = dict.fromkeys(('active', 'idle', 'created', 'requests'), 0)
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None or pool.pool is None:
+                continue    # evicted or closed meanwhile
+            queue = pool.pool
+            # the queue is filled with None for connections not opened yet
+            idle = sum(conn is not None for conn in list(queue.queue))
+            stats['active'] += queue.maxsize - queue.qsize()
+            stats['idle'] += idle
+            stats['created'] += pool.num_connections
+            stats['requests'] += pool.num_requests
+        return stats
@@ -0,0 +1,219 @@
+"""Persistence of origin sessions across runs and processes.
+
+Persistent cookies of each origin are stored as json under
+`CACHE_DIR/sessions`, read and written under an exclusive file lock, so
+that processes sharing the cache dir don't overwrite each other's
+cookies. Origins could also be connected to ahead of the first request.
+"""
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+from .settings import settings
+from .utils import get_absolute_path
+from .origins import registry
+from .background import background
+
+
+logger = logging.getLogger(__name__)
+
+COOKIE_ATTRS = ('name', 'value', 'domain', 'path', 'expires', 'secure')
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _lock_file(file):
+        # blocks and retries for about 10 seconds before raising
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on `path` across processes, through
+    a `.lock` file beside it.
+    """
+    lock_path = path.with_name(path.name + '.lock')
+    with open(lock_path, 'a+b') as lock_file:
+        _lock_file(lock_file)
+        try:
+            yield
+        finally:
+            _unlock_file(lock_file)
+
+
+def get_session_path(name):
+    """Get the path the session of origin `name` is stored at."""
+    return get_absolute_path(settings['CACHE_DIR']) / 'sessions' / f'{name}.json'
+
+
+def _read_cookies(path):
+    try:
+        with open(path, encoding='UTF-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return []
+    except ValueError:
+        logger.warning('Ignored broken session file %s.', path)
+        return []
+
+
+def load_cookies(name, jar):
+    """Load stored cookies of origin `name` into cookie `jar`.
+
+    Return False if none is stored.
+    """
+    # pylint: disable=import-outside-toplevel
+    # only called with the first session, not to import `requests` at startup
+    from requests.cookies import create_cookie
+
+    path = get_session_path(name)
+    if not path.is_file():
+        return False
+    with file_lock(path):
+        cookies = _read_cookies(path)
+
+    now = time.time()
+    for cookie in cookies:
+        if cookie['expires'] is not None and cookie['expires'] < now:
+            continue
+        jar.set_cookie(create_cookie(**cookie))
+    logger.debug('Loaded %d cookies of `%s`.', len(cookies), name)
+    return bool(cookies)
+
+
+def get_persistent_cookies(jar, keep=()):
+    """Return the cookies in cookie `jar` that outlive the session, or
+    are named in `keep`, as a list of dicts of `COOKIE_ATTRS`.
+    """
+    # iterate a copy, since the jar may be updated by other threads
+    return [
+        {attr: getattr(cookie, attr) for attr in COOKIE_ATTRS}
+        for cookie in jar.copy()
+        if cookie.expires is not None or cookie.name in keep]
+
+
+def save_cookies(name, jar, keep=()):
+    """Store persistent cookies in cookie `jar` of origin `name`, and
+    session cookies named in `keep`.
+
+    Cookies stored by other processes meanwhile are kept unless
+    overwritten by those in `jar`.
+    """
+    path = get_session_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    jar_cookies = get_persistent_cookies(jar, keep)
+    with file_lock(path):
+        cookies = {
+            (cookie['domain'], cookie['path'], cookie['name']): cookie
+            for cookie in _read_cookies(path)}
+        for cookie in jar_cookies:
+            cookies[cookie['domain'], cookie['path'], cookie['name']] = cookie
+
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='UTF-8') as file:
+            json.dump(list(cookies.values()), file, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+def clear_cookies(name):
+    """Forget stored cookies of origin `name`."""
+    path = get_session_path(name)
+    if not path.is_file():
+        return
+    with file_lock(path):
+        path.unlink(missing_ok=True)
+
+
+class SessionSaver:
+    """Store the sessions of origins whose cookies may have changed,
+    at most once per `SESSION_SAVE_DELAY` seconds and at exit, instead
+    of on every response setting cookies.
+
+    A session is only written if its persistent cookies changed since
+    it was last saved. Session cookies named in `session_cookies` of
+    the origin are saved as well.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        # name: origin class of the sessions to be saved
+        self.pending = {}
+        # name: persistent cookies last saved
+        self.saved = {}
+        self.timer = None
+
+    def schedule(self, origin_cls):
+        """Save the session of `origin_cls` in a while."""
+        with self.lock:
+            self.pending[origin_cls.name] = origin_cls
+            if self.timer is None:
+                self.timer = threading.Timer(
+                    settings['SESSION_SAVE_DELAY'], self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        """Save the scheduled sessions now."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            timer, self.timer = self.timer, None
+        if timer is not None:
+            timer.cancel()
+        for origin_cls in pending.values():
+            try:
+                self.save(origin_cls)
+            except OSError:
+                logger.error('Failed to save the session of `%s`:',
+                             origin_cls.name, exc_info=1)
+
+    def save(self, origin_cls):
+        """Save the session of `origin_cls` if its persistent cookies
+        changed. Return whether it's written.
+        """
+        session = origin_cls.session
+        if session is None:
+            return False
+        keep = origin_cls.session_cookies
+        cookies = get_persistent_cookies(session.cookies, keep)
+        with self.lock:
+            if cookies == self.saved.get(origin_cls.name):
+                return False
+        save_cookies(origin_cls.name, session.cookies, keep)
+        with self.lock:
+            self.saved[origin_cls.name] = cookies
+        logger.debug('Saved the session of `%s`.', origin_cls.name)
+        return True
+
+    def forget(self, name):
+        """Forget what was saved for origin `name`."""
+        with self.lock:
+            self.pending.pop(name, None)
+            self.saved.pop(name, None)
+
+
+session_saver = SessionSaver()
+atexit.register(session_saver.flush)
+
+
+def preconnect_origins():
+    """Open keep-alive connections to the hosts of enabled origins
+    in background, see `Origin.preconnect()`.
+    """
+    for origin_cls in registry.enabled():
+        background.submit(origin_cls.preconnect)
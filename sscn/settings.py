@@ -7,11 +7,47 @@ def show_wechat_login_code(origin_cls, url):
 DEFAULT_SETTINGS = {
     'MAX_PAGE_RETRY': 2,
     'TIMEOUT': 3,
+    'FIELDS_DEADLINE': None,
     'REQUEST_MAX_RETRY': 1,
     'AUTO_LATEST': True,
+    'SUPERSESSION_TTL': 30*24*3600,
     'CACHE_DIR': '.sscn_cache',
+    'DISABLED_ORIGINS': (),
+    'COST_BASED_ORDERING': True,
     'SHOW_WECHAT_LOGIN_CODE_FUNC': show_wechat_login_code,
+    'FIELD_SOFT_TTLS': {'status': 24*3600},
+    'FIELD_REFRESHED_FUNC': None,
+    'BACKGROUND_WORKERS': 4,
+    'PREFETCH_WORKERS': 2,
+    'MAX_BATCH_QUEUE': 1024,
+    'TREE_PAGE_SIZE': 200,
+    'PREFETCH_DOWNLOAD': True,
+    'PREFETCH_HEAD': False,
+    'AVAILABILITY_TTL': 24*3600,
+    'AVAILABILITY_WORKERS': 8,
     'MAX_SEARCH_PAGES': 16,
+    'LXML_FAST_PATH': False,
+    'INCREMENTAL_SEARCH_PARSE': False,
+    'HARVEST_SEARCH_ENTRIES': False,
+    'MAX_HARVESTED_STANDARDS': 2048,
+    'RELEASE_RESPONSES': True,
+    'MAX_CACHED_BYTES': 64*1024*1024,
+    'PERSIST_SESSIONS': True,
+    'SESSION_SAVE_DELAY': 5,
+    'PRECONNECT_ORIGINS': False,
+    'POOL_SETTINGS': {
+        # hosts to keep pools for, and connections kept per host
+        'pool_connections': 4,
+        'pool_maxsize': 16,
+        # wait for a free connection instead of opening one to discard,
+        #  for at most the connect timeout of the request
+        'pool_block': True,
+        'keep_alive': True,
+    },
+    'ORIGIN_POOL_SETTINGS': {},
+    'METRICS': True,
+    'TRACING': False,
+    'MAX_TRACE_EVENTS': 100000,
 }
 
 
@@ -1,14 +1,22 @@
 import re
 import enum
+import time
 import logging
+import threading
 from collections import namedtuple
 
-import requests
-
 from sscn.utils import NotFound, HTTPHeaders
 from .settings import settings
-from .origins import iter_origin_cls
-from .exceptions import ContentUnavailable, RequestError
+from .origins import registry
+from .cache import StandardCache, sizeof
+from .harvest import harvested
+from .sessions import load_cookies, clear_cookies, session_saver
+from .costs import origin_stats
+from .metrics import metrics
+from .tracing import tracer, annotate
+from .background import background
+from .deadline import remaining, is_exceeded
+from .exceptions import ContentUnavailable, RequestError, DeadlineExceeded
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +38,8 @@ class StandardCode(BaseStdCode):
     |  ———————————— mandatory:   强制性。注'T'表示'推荐'，非强制
     ——————————————— prefix:      行业标准代号
     """
+    __slots__ = ()
+
     FIELDS = {
         'GB': '国家标准',
         'JC': '建材',
@@ -43,6 +53,10 @@ class StandardCode(BaseStdCode):
         r'(\.(?P<part>[0-9]))?'               # part
         r'[-\_\s]*(?P<year>[0-9]{4}|[5-9][0-9])?' # year
     )
+    PARSE_CACHE_SIZE = 65536
+    # parsed code strs and canonical instances, both mapped to the
+    #  canonical instances, cleared as a whole once full
+    _cache = {}
 
     def __new__(cls, number, prefix=None, is_mandatory=None, year=None, part=None):
         number = str(number)
@@ -72,15 +86,36 @@ class StandardCode(BaseStdCode):
         Raise a ValueError if unable to parse.
         Perform a fullmatch on `code` if `fullmatch` is truthy,
           perform a search otherwise.
+        Results are memoized, and equal codes are the same instance
+          until more than `PARSE_CACHE_SIZE` are cached.
         """
+        key = (code, True) if fullmatch else code
+        code_obj = cls._cache.get(key)
+        if code_obj is None:
+            code_obj = cls._parse(code, fullmatch)
+            if code_obj is None:
+                raise ValueError(
+                    f'"{code.strip().upper()}" is not a valid standard code.')
+            cls._cache[key] = code_obj
+        return code_obj
+
+    @classmethod
+    def _parse(cls, code, fullmatch):
+        """Underlying func of `parse()`. Return None if unable to parse."""
         code = code.strip().upper()
         if fullmatch:
             match = cls.CODE_PATTERN.fullmatch(code)
         else:
             match = cls.CODE_PATTERN.search(code)
         if not match:
-            raise ValueError(f'"{code}" is not a valid standard code.')
+            return None
+        return cls.from_match(match)
 
+    @classmethod
+    def from_match(cls, match, intern=True):
+        """Make an instance from a match of `CODE_PATTERN`, interned
+        unless `intern` is falsy.
+        """
         prefix, mandatory, number, part, year = match.group(
             'prefix', 'mandatory', 'number', 'part', 'year',
         )
@@ -92,14 +127,49 @@ class StandardCode(BaseStdCode):
         else:
             year = None
 
-        code_obj = cls(
-            prefix=prefix or None,
-            is_mandatory=is_mandatory,
-            number=number,
-            year=year,
-            part=part,
-            )
-        return code_obj
+        # fields are converted already, skip those of `__new__()`
+        code_obj = tuple.__new__(cls, (
+            number, prefix or None, is_mandatory, year,
+            int(part) if part else None,
+            ))
+        return cls.intern(code_obj) if intern else code_obj
+
+    @classmethod
+    def intern(cls, code_obj):
+        """Return the canonical instance equal to `code_obj`."""
+        cache = cls._cache
+        canonical = cache.get(code_obj)
+        if canonical is None:
+            if len(cache) >= cls.PARSE_CACHE_SIZE:
+                cache.clear()
+            canonical = cache[code_obj] = code_obj
+        return canonical
+
+    @classmethod
+    def finditer(cls, text):
+        """Iter through all codes found in `text` in one pass.
+
+        Yields tuples of `(code, match)`.
+        """
+        cache = cls._cache
+        for match in cls.CODE_PATTERN.finditer(text.upper()):
+            # the matched str parses into the same code, so results
+            #  are shared with `parse()`
+            string = match.group(0)
+            code_obj = cache.get(string)
+            if code_obj is None:
+                code_obj = cache[string] = cls.from_match(match)
+            yield code_obj, match
+
+    @classmethod
+    def parse_many(cls, text):
+        """Return a list of all codes found in `text`."""
+        return [code for code, _ in cls.finditer(text)]
+
+    @classmethod
+    def clear_cache(cls):
+        """Clear memoized parsing results and interned instances."""
+        cls._cache.clear()
 
     def is_concret(self):
         """Whether this code represent a specific standard."""
@@ -150,9 +220,12 @@ class ResourceNode:
     Base class for `Standard` and `Origin`. Can
     
     """
+    __slots__ = ('fields', 'subnodes', '_lock', '__weakref__')
+
     def __init__(self, **kwargs):
         self.fields = kwargs
         self.subnodes = {}
+        self._lock = threading.Lock()
 
     @classmethod
     def iter_subnode_cls(cls, field_name):
@@ -165,53 +238,136 @@ class ResourceNode:
         """
         if (name not in self.fields
                 or preferred):
+            if name in self.fields:
+                delta = sizeof(field) - sizeof(self.fields[name])
+            else:
+                delta = sizeof(name) + sizeof(field)
             self.fields[name] = field
+            self.resized(delta)
             return True
         return False
 
+    def resized(self, delta):
+        """Called after fields of this node grew by `delta` bytes,
+        estimated by `sscn.cache.sizeof()`. Implement by subclass if
+        needed.
+        """
+
     def get_field(self, name):
         """Require a field. Return the cached value or ask its
         subnodes for the value.
         """
+        with tracer.span(f'{type(self).__name__}.get_field', cat='field',
+                         node=repr(self), field=name) as span:
+            field = self.resolve_field(name)
+            span.set(found=field is not NotFound)
+        return field
+
+    def resolve_field(self, name):
+        """Return the cached field `name` or ask the subnodes for it,
+        see `get_field()`.
+        """
         logger.debug('%r: getting field "%s"...', self, name)
+        node_name = type(self).__name__
         if name in self.fields:
             logger.debug('%r: use cached value.', self)
+            metrics.inc('sscn_field_lookups_total',
+                        node=node_name, field=name, result='hit')
+            annotate(hit=True)
             return self.fields[name]
+        annotate(hit=False)
+        metrics.inc('sscn_field_lookups_total',
+                    node=node_name, field=name, result='miss')
 
         cls_iter = self.iter_subnode_cls(name)
+        skipped = False
         for cls in cls_iter:
+            left = remaining()
+            if left is not None:
+                latency = self.expected_latency(cls, name)
+                if left <= 0 or (latency is not None and latency > left
+                                 and self.allow_skip(cls, name)):
+                    logger.debug('%r: skipped %r for the deadline.', self, cls)
+                    annotate(**{f'skipped.{cls.__name__}': 'deadline'})
+                    skipped = True
+                    continue
             subnode = self.get_subnode(cls)
             logger.debug('dispatch to %r', subnode)
+            start = time.perf_counter()
             try:
                 field = subnode.get_field(name)
             except ContentUnavailable:
                 logger.debug(
                     '%r: catched ContentUnavailable,'
                     'continue', self)
-                continue
+                field = NotFound
+            self.record_attempt(
+                cls, name, field is not NotFound, time.perf_counter()-start)
             if field is not NotFound:
                 return field
             continue
 
-        # none of the subnodes found the field
-        self.fields[name] = NotFound
-        logger.debug('%r: field "%s" not found.', self, name)
-        return NotFound
+        # subnodes skipped or cut by the deadline may still have it
+        if skipped or is_exceeded():
+            logger.debug('%r: field "%s" not found in time.', self, name)
+            return self.fields.get(name, NotFound)
+
+        # none of the subnodes found the field, unless it was cached
+        #  by a concurrent fetch in the meantime
+        field = self.fields.setdefault(name, NotFound)
+        if field is NotFound:
+            logger.debug('%r: field "%s" not found.', self, name)
+        return field
+
+    def record_attempt(self, cls, name, hit, latency):
+        """Called after asking subnode class `cls` for field `name`,
+        taking `latency` seconds. Implement by subclass if needed.
+        """
+
+    def expected_latency(self, cls, name):
+        """Return the seconds asking subnode class `cls` for field `name`
+        is expected to take, or None if unknown. Subnodes expected to
+        miss the deadline are skipped. Implement by subclass if needed.
+        """
+        return None
+
+    def allow_skip(self, cls, name):
+        """Called when subnode class `cls` is expected to miss the
+        deadline getting field `name`. Return False to attempt it anyway.
+        Implement by subclass if needed.
+        """
+        return True
 
     def get_subnode(self, cls):
         """Return the subnode instance of class `cls` on this node.
         """
         # Each subnode has only one instance per ResourceNode class
-        instance = self.subnodes.setdefault(cls, cls(self))
+        instance = self.subnodes.get(cls)
+        if instance is None:
+            with self._lock:
+                instance = self.subnodes.get(cls)
+                if instance is None:
+                    instance = self.subnodes[cls] = cls(self)
         return instance
 
 
 class Standard(ResourceNode):
-    """Standard class that could search for and cache its fields."""
+    """Standard class that could search for and cache its fields.
+
+    Cached fields past their soft TTL in setting `FIELD_SOFT_TTLS` are
+    still returned at once, while refreshed in background
+    (stale-while-revalidate).
+    """
+    __slots__ = ('code', 'concret', 'field_times', 'size', '_revalidating')
+
     def __init__(self, code, **kwargs):
         self.code = code
         self.concret = self.code.is_concret()
+        self.field_times = dict.fromkeys(kwargs, time.time())
+        self._revalidating = set()
         super().__init__(**kwargs)
+        # bytes of fields of it and its origins, see `StandardCache`
+        self.size = sizeof(self.fields)
 
     def __str__(self):
         code = str(self.code)
@@ -225,9 +381,19 @@ class Standard(ResourceNode):
     def __repr__(self):
         return f'<Standard code="{self.code}">'
 
-    @classmethod
-    def iter_subnode_cls(cls, field_name):
-        return iter_origin_cls()
+    def iter_subnode_cls(self, field_name):
+        """Iters through origins serving `field_name`, cheapest first."""
+        return origin_stats.order(
+            registry.route(field_name), field_name, self.code.prefix)
+
+    def record_attempt(self, cls, name, hit, latency):
+        origin_stats.record(cls, name, self.code.prefix, hit, latency)
+
+    def expected_latency(self, cls, name):
+        return origin_stats.get_latency(cls, name, self.code.prefix)
+
+    def allow_skip(self, cls, name):
+        return origin_stats.record_skip(cls, name, self.code.prefix)
 
     def as_file_name(self, suffix='pdf'):
         """Make a filename for this standard to store."""
@@ -246,22 +412,129 @@ class Standard(ResourceNode):
             raise TypeError(
                 'Can only get fields from a concret standard instance.'
                 )
-        return super().get_field(name)
+        if name in self.fields:
+            if self.is_stale(name):
+                self.revalidate(name)
+        else:
+            self.apply_harvested()
+        field = super().get_field(name)
+        self.field_times.setdefault(name, time.time())
+        return field
+
+    def update_field(self, name, field, preferred=False):
+        updated = super().update_field(name, field, preferred=preferred)
+        if updated:
+            self.field_times[name] = time.time()
+        return updated
+
+    def resized(self, delta):
+        standards.resize(self, delta)
+
+    def is_stale(self, name):
+        """Whether cached field `name` is past its soft TTL."""
+        ttl = settings['FIELD_SOFT_TTLS'].get(name)
+        if ttl is None:
+            return False
+        return time.time() - self.field_times.get(name, 0) > ttl
+
+    def revalidate(self, name):
+        """Refresh field `name` in background.
+
+        Return the `Future` of the refresh, or None if it's already
+        being refreshed.
+        """
+        with self._lock:
+            if name in self._revalidating:
+                return None
+            self._revalidating.add(name)
+        logger.debug('%r: revalidating stale field "%s".', self, name)
+        return background.submit(self._revalidate, name)
+
+    def _revalidate(self, name):
+        try:
+            # a fresh standard goes through the pages again, without
+            #  applying harvested fields which may be as stale
+            field = ResourceNode.get_field(Standard(self.code), name)
+        finally:
+            with self._lock:
+                self._revalidating.discard(name)
+
+        if field is NotFound:
+            # keep the stale value until next TTL
+            self.field_times[name] = time.time()
+            return field
+
+        changed = field != self.fields.get(name)
+        self.update_field(name, field, preferred=True)
+        notify = settings['FIELD_REFRESHED_FUNC']
+        if changed and notify:
+            notify(self, name, field)
+        return field
+
+    def prefetch_download(self, head=False):
+        """Resolve the url the pdf would be downloaded from, so that
+        downloading needs no more page than the file itself.
+
+        Origins are tried in the order of downloading, until one has
+        an url. With `head`, the url is also requested by a HEAD request
+        to check and warm up the connection.
+        Return `(origin, url)`, or None if no origin has one.
+        """
+        for origin_cls in self.iter_subnode_cls('pdf'):
+            origin = self.get_subnode(origin_cls)
+            for _, url in origin.iter_download_urls():
+                logger.debug('%r: prefetched download url %s.', self, url)
+                if head:
+                    origin.request(url, method='HEAD', allow_redirects=True)
+                return origin, url
+        return None
+
+    def apply_harvested(self):
+        """Update fields harvested from other search pages as if
+        the pages were fetched for this standard.
+        """
+        for origin_cls, page_cls, fields in harvested.get(self.code):
+            origin = self.get_subnode(origin_cls)
+            page = origin.get_subnode(page_cls)
+            if page.success is not None:
+                continue
+            logger.debug('%r: use fields harvested by %r.', self, page)
+            page.post_fetch(fields)
+            page.success = True
+
+
+# standards shared by the whole process, use `standards.get(code)`
+#  instead of `Standard(code)` to reuse fetched fields
+standards = StandardCache(Standard)
 
 
 class Origin(ResourceNode):
     """Abstract Origin class for subclassing."""
+    __slots__ = ('std',)
+
     # basic info
     index = None
+    scheme = 'http'
     name = None
     full_name = None
 
     # settings
     pages = ()
     request_timeout = None
+    encoding = None
+    # overrides of setting `POOL_SETTINGS` for the origin
+    pool_settings = {}
+    # names of session cookies stored along with persistent ones,
+    #  e.g. of a login the server doesn't set to expire
+    session_cookies = ()
 
     # class data
     session = None
+    routes = {}
+    # public fields preferred by any page, as a plain attribute to be
+    # read on hot paths
+    preferred_field_set = frozenset()
+    _session_lock = threading.Lock()
     _public_fields = None
     _preferred_fields = None
 
@@ -272,6 +545,37 @@ class Origin(ResourceNode):
     def __repr__(self):
         return f'<{self.__class__.__name__} std="{self.std.code}">'
 
+    def resized(self, delta):
+        # accounted as the bytes of the standard
+        self.std.resized(delta)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.compile_routes()
+
+    @classmethod
+    def compile_routes(cls):
+        """Map each field to the page classes responsible for it.
+
+        Page classes are in the order of `cls.pages`, except that
+        pages with the field set in its `preferred_fields` come first.
+        """
+        routes = {}
+        for page_cls in cls.pages:
+            for field_name in page_cls.preferred_fields:
+                routes.setdefault(field_name, []).append(page_cls)
+
+        for page_cls in cls.pages:
+            for field_name in (page_cls.public_fields
+                               + page_cls.origin_only_fields):
+                pages = routes.setdefault(field_name, [])
+                if page_cls not in pages:
+                    pages.append(page_cls)
+
+        cls.routes = {field_name: tuple(pages)
+                      for field_name, pages in routes.items()}
+        cls.preferred_field_set = cls._get_page_fields('preferred_fields')
+
     @classmethod
     def _get_page_fields(cls, name):
         """Underlying func of `fields()` and `preferred_fields()`"""
@@ -305,46 +609,169 @@ class Origin(ResourceNode):
     @classmethod
     def iter_subnode_cls(cls, field_name):
         """Iters through all Page class responsible for `field_name`.
-        
-        Page classes are itered in the order of `cls.pages`,
-        except that pages with `field_name` set in its `preferred_fields`
-        are granted to be itered first.
+
+        See `compile_routes()` for the order.
         """
-        for page_cls in cls.pages:
-            if field_name in page_cls.preferred_fields:
-                yield page_cls
+        return cls.routes.get(field_name, ())
 
-        for page_cls in cls.pages:
-            if (field_name in page_cls.public_fields
-                or field_name in page_cls.origin_only_fields
-                ):
-                yield page_cls
+    def iter_download_urls(self):
+        """Iters through `(page_cls, url)` of the pdf downloaders
+        having an url, fetching the pages leading to the urls.
+        """
+        for page_cls in self.iter_subnode_cls('pdf'):
+            url_field = getattr(page_cls, 'url_field', None)
+            if url_field is None:
+                continue
+            url = self.get_field(url_field)
+            if url:
+                yield page_cls, url
+
+    @classmethod
+    def get_encoding(cls, response):
+        """Get the encoding to decode `response` with.
+
+        The charset declared in the http headers is respected, otherwise
+        fallback to the `encoding` declared by the origin, so that
+        `requests` never has to sniff the charset of the whole body.
+        Return None if unknown.
+        """
+        if 'charset' in response.headers.get('Content-Type', ''):
+            return response.encoding
+        return cls.encoding
 
     @classmethod
     def init_session(cls):
         """Init a Session object preserving the http connction.
         """
+        # pylint: disable=import-outside-toplevel
+        # the network stack is loaded with the first session
+        import requests
+        from .pool import CountingAdapter
+
+        pool_settings = cls.get_pool_settings()
         session = requests.session()
         session.headers.update(HTTPHeaders())
+        if not pool_settings['keep_alive']:
+            session.headers['Connection'] = 'close'
+        # one adapter for both schemes, so that their connections are
+        #  pooled and counted together
+        adapter = CountingAdapter(
+            pool_connections=pool_settings['pool_connections'],
+            pool_maxsize=pool_settings['pool_maxsize'],
+            pool_block=pool_settings['pool_block'])
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if settings['PERSIST_SESSIONS']:
+            load_cookies(cls.name, session.cookies)
         logger.info('Initiated session for origin `%s`.', cls.__name__)
         cls.session = session
         return session
 
+    @classmethod
+    def get_pool_settings(cls):
+        """Get the connection pool settings of the origin: setting
+        `POOL_SETTINGS`, updated by `pool_settings` of the class, then by
+        the origin's entry in setting `ORIGIN_POOL_SETTINGS`.
+        """
+        return {
+            **settings['POOL_SETTINGS'],
+            **cls.pool_settings,
+            **settings['ORIGIN_POOL_SETTINGS'].get(cls.name, {}),
+        }
+
+    @classmethod
+    def get_pool_stats(cls):
+        """Return the connection counters of the session, see
+        `CountingAdapter.get_stats()`, or None if there is no session.
+        """
+        if cls.session is None:
+            return None
+        return cls.session.get_adapter(f'{cls.scheme}://').get_stats()
+
+    @classmethod
+    def cache_session(cls):
+        """Store persistent cookies of the session now, if changed, to
+        be loaded by later runs or other processes.
+        """
+        session_saver.save(cls)
+
+    @classmethod
+    def clear_session(cls):
+        """Forget cookies of the session, stored ones included."""
+        if cls.session is not None:
+            cls.session.cookies.clear()
+        session_saver.forget(cls.name)
+        clear_cookies(cls.name)
+
+    @classmethod
+    def preconnect(cls):
+        """Open a keep-alive connection to the host of the origin,
+        so that the first real request doesn't pay for setting it up.
+        """
+        cls.request(f'{cls.scheme}://{cls.index}/', method='HEAD')
+
+    @classmethod
+    def get_session(cls):
+        """Return the session of the origin, init it on first use.
+
+        Threads requesting at the same time share a single session.
+        """
+        if cls.session is None:
+            with cls._session_lock:
+                if cls.session is None:
+                    cls.init_session()
+        return cls.session
+
+    @classmethod
+    def send(cls, session, method, url, **kwargs):
+        """Send a request through `session`, recording its status and
+        latency in `metrics`.
+        """
+        start = time.perf_counter()
+        status = 'error'
+        with tracer.span('request', cat='http', origin=cls.name,
+                         method=method, url=url) as span:
+            try:
+                response = session.request(method, url, **kwargs)
+                status = str(response.status_code)
+                return response
+            except BaseException as err:
+                status = type(err).__name__
+                raise
+            finally:
+                span.set(status=status)
+                metrics.inc('sscn_requests_total', origin=cls.name, status=status)
+                metrics.observe('sscn_request_seconds',
+                                time.perf_counter() - start, origin=cls.name)
+
     @classmethod
     def request(cls, url, method='GET', retry=0, timeout=None, **kwargs):
         """Make a request with a max retry of MAX_PAGE_RETRY.
+
+        Within a deadline, the timeout is cut to the remaining time and
+        `DeadlineExceeded` is raised once there is none.
         """
-        session = cls.session or cls.init_session()
+        # pylint: disable=import-outside-toplevel
+        # for its exceptions, loaded already by `get_session()`
+        import requests
+        session = cls.get_session()
         logger.info('Requesting `%s`. %s',
             url,
             f'(retry={retry})' if retry else '',
             )
         timeout = timeout or cls.request_timeout or settings['TIMEOUT']
+        left = remaining()
+        if left is not None:
+            if left <= 0:
+                raise DeadlineExceeded()
+            timeout = min(timeout, left)
 
         try:
-            response = session.request(method, url, timeout=timeout, **kwargs)
+            response = cls.send(session, method, url, timeout=timeout, **kwargs)
         except requests.Timeout as err:
             logger.info('Request time out.')
+            if is_exceeded():
+                raise DeadlineExceeded() from err
             # retry if time out
             if retry >= settings['REQUEST_MAX_RETRY']:
                 raise RequestError('Request time out.') from err
@@ -357,4 +784,11 @@ class Origin(ResourceNode):
                 err.response.reason)
             raise
 
+        # keep persistent cookies the server set for later runs
+        keep = cls.session_cookies
+        if settings['PERSIST_SESSIONS'] and any(
+                cookie.expires is not None or cookie.name in keep
+                for resp in (*response.history, response)
+                for cookie in resp.cookies):
+            session_saver.schedule(cls)
         return response
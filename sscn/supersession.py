@@ -0,0 +1,247 @@
+import time
+import sqlite3
+import logging
+import threading
+
+from .settings import settings
+from .utils import NotFound, get_absolute_path
+from .standard import Standard, StandardCode
+from .background import background
+
+
+logger = logging.getLogger(__name__)
+
+
+class SupersessionGraph:
+    """A persistent graph of which standards supersede which.
+
+    Nodes are concret codes grouped by series (the code without year
+    and mandatory flag), edges point from a standard to the one fully
+    replacing it. Built from the `substitute`/`replaced`/
+    `partial_substitutes` fields and stored in a sqlite database.
+    """
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS versions ('
+            'code TEXT PRIMARY KEY, series TEXT, year INTEGER, checked REAL)',
+        'CREATE INDEX IF NOT EXISTS versions_series '
+            'ON versions (series, year)',
+        'CREATE TABLE IF NOT EXISTS edges ('
+            'old TEXT, new TEXT, partial INTEGER, PRIMARY KEY (old, new))',
+    )
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.RLock()
+        self._connection = None
+        self._latest = {}
+        # when resolving codes in background was last scheduled
+        self._scheduled = {}
+
+    @property
+    def connection(self):
+        """The lazily opened sqlite connection."""
+        if self._connection is None:
+            path = self.path
+            if path is None:
+                cache_dir = get_absolute_path(settings['CACHE_DIR'])
+                cache_dir.mkdir(exist_ok=True)
+                path = cache_dir / 'supersession.sqlite3'
+            connection = sqlite3.connect(path, check_same_thread=False)
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def get_series(code):
+        """Get the key of all versions of a standard."""
+        return f'{code.prefix} {code.number}.{code.part or 0}'
+
+    def _add_version(self, code, checked=None):
+        self.connection.execute(
+            'INSERT INTO versions VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (code) DO UPDATE '
+                'SET checked = coalesce(excluded.checked, checked)',
+            (str(code), self.get_series(code), code.year, checked))
+
+    def _add_edge(self, old, new, partial=False):
+        self._add_version(old)
+        self._add_version(new)
+        self.connection.execute(
+            'INSERT OR REPLACE INTO edges VALUES (?, ?, ?)',
+            (str(old), str(new), int(partial)))
+
+    def record(self, code, substitute=None, replaced=None,
+               partial_substitutes=None):
+        """Record the substitution fields of concret `code`.
+
+        Codes in the fields could be any parsable strs.
+        """
+        parse = StandardCode.parse
+        with self.lock, self.connection:
+            self._add_version(code, checked=time.time())
+            if substitute:
+                self._add_edge(code, parse(substitute))
+            for old in replaced or ():
+                self._add_edge(parse(old), code)
+            for old in partial_substitutes or ():
+                self._add_edge(parse(old), code, partial=True)
+            self._latest.clear()
+
+    def record_versions(self, codes):
+        """Record concret `codes` as known versions, without edges."""
+        with self.lock, self.connection:
+            for code in codes:
+                self._add_version(code)
+            self._latest.clear()
+
+    def mark_checked(self, code):
+        """Record that edges of concret `code` were looked up just now,
+        even though none could be fetched.
+        """
+        with self.lock, self.connection:
+            self._add_version(code, checked=time.time())
+
+    def checked(self, code):
+        """Return when edges of `code` were last recorded, or None."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT checked FROM versions WHERE code = ?',
+                (str(code),)).fetchone()
+        return row[0] if row else None
+
+    def latest(self, code):
+        """Return the latest known version of `code`, or None if unknown.
+
+        A non-concret code resolves to the newest version of its series,
+        then full substitutions are followed to the current version.
+        """
+        if code in self._latest:
+            return self._latest[code]
+
+        with self.lock:
+            current = str(code) if code.is_concret() else None
+            if current is None:
+                row = self.connection.execute(
+                    'SELECT code FROM versions WHERE series = ? '
+                    'ORDER BY year DESC LIMIT 1',
+                    (self.get_series(code),)).fetchone()
+                current = row and row[0]
+
+            visited = set()
+            while current and current not in visited:
+                visited.add(current)
+                row = self.connection.execute(
+                    'SELECT new FROM edges JOIN versions ON new = code '
+                    'WHERE old = ? AND NOT partial '
+                    'ORDER BY year DESC LIMIT 1',
+                    (current,)).fetchone()
+                if row is None:
+                    break
+                current = row[0]
+
+            latest = StandardCode.parse(current) if current else None
+            self._latest[code] = latest
+        return latest
+
+    def is_stale(self, code):
+        """Whether edges of `code` were never or too long ago recorded."""
+        checked = self.checked(code)
+        return (checked is None
+            or time.time() - checked > settings['SUPERSESSION_TTL'])
+
+    def refresh(self, code):
+        """Fetch and record the substitution fields of concret `code`.
+
+        Return False if they can't be fetched, then `code` is still
+        marked checked, not to be looked up again within the ttl.
+        """
+        logger.info('Refreshing supersession of %s.', code)
+        std = Standard(code)
+        # fetching the fields records them, see `CSRESDetailPage.post_fetch`
+        if std.get_field('substitute') is NotFound:
+            self.mark_checked(code)
+            return False
+        return True
+
+    def refresh_series(self, code):
+        """Search for and record all versions of non-concret `code`."""
+        # pylint: disable=import-outside-toplevel
+        # circular dependence
+        from .origins.csres import search_standards
+
+        logger.info('Searching for versions of %s.', code)
+        results = search_standards(str(code))
+        if not isinstance(results, list):
+            return
+        series = self.get_series(code)
+        self.record_versions(
+            parsed for parsed in (
+                StandardCode.parse(result['code']) for result in results)
+            if parsed.is_concret() and self.get_series(parsed) == series)
+
+    def resolve(self, code, refresh=True):
+        """Resolve `code` to its current version.
+
+        With `refresh`, edges of the versions along the way are lazily
+        fetched if stale, costing a request per stale version. Otherwise
+        only the local graph is looked up.
+        Return None if no version is known.
+        """
+        latest = self.latest(code)
+        if not refresh:
+            return latest
+
+        if latest is None and not code.is_concret():
+            self.refresh_series(code)
+            latest = self.latest(code)
+
+        refreshed = set()
+        while latest is not None and latest not in refreshed:
+            if not self.is_stale(latest):
+                break
+            refreshed.add(latest)
+            if not self.refresh(latest):
+                break
+            latest = self.latest(code)
+        return latest
+
+    def resolve_nowait(self, code):
+        """Resolve `code` from the local graph, and refresh it in
+        background if not scheduled within `SUPERSESSION_TTL`, for the
+        next call to get the refreshed version.
+
+        If no version is known yet, there is nothing to return meanwhile,
+        so it is resolved at once instead, also once within the ttl.
+        Return None if no version could be found.
+        """
+        latest = self.latest(code)
+        now = time.monotonic()
+        with self.lock:
+            scheduled = self._scheduled.get(code)
+            due = (scheduled is None
+                or now - scheduled > settings['SUPERSESSION_TTL'])
+            if due:
+                self._scheduled[code] = now
+        if not due:
+            return latest
+        if latest is None:
+            return self.resolve(code)
+        background.submit(self.resolve, code)
+        return latest
+
+
+graph = SupersessionGraph()
+
+
+def resolve_code(code):
+    """Resolve non-concret `code` to its latest version if setting
+    `AUTO_LATEST` is on. Return `code` itself otherwise.
+
+    Only the local graph is looked up, stale versions are refreshed
+    in background, unless no version is known yet, see
+    `SupersessionGraph.resolve_nowait()`.
+    """
+    if code.is_concret() or not settings['AUTO_LATEST']:
+        return code
+    return graph.resolve_nowait(code) or code
@@ -0,0 +1,138 @@
+"""Optional span tracing of field resolution.
+
+With setting `TRACING` on, each `get_field()`, page fetch, parse step
+and http request is recorded as a span nested in the one it's called
+from, and could be exported as Chrome trace-event json, to be opened by
+`chrome://tracing` or https://ui.perfetto.dev.
+"""
+import os
+import json
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from .settings import settings
+
+
+# the span being recorded in the current context
+current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """A timed operation with attributes."""
+    __slots__ = ('name', 'cat', 'attrs')
+
+    def __init__(self, name, cat, attrs):
+        self.name = name
+        self.cat = cat
+        self.attrs = attrs
+
+    def __repr__(self):
+        return f'<Span name={self.name!r}>'
+
+    def set(self, **attrs):
+        """Set attributes of the span."""
+        self.attrs.update(attrs)
+
+
+class _NoopSpan:
+    """Stands for spans while tracing is off."""
+    __slots__ = ()
+
+    def set(self, **attrs):
+        """Do nothing."""
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def annotate(**attrs):
+    """Set attributes of the current span, if any."""
+    span = current_span.get()
+    if span is not None:
+        span.set(**attrs)
+
+
+class Tracer:
+    """Record finished spans as Chrome trace events, keeping the
+    latest `MAX_TRACE_EVENTS` ones.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = deque()
+        self.thread_names = {}
+
+    def __len__(self):
+        return len(self.events)
+
+    @contextmanager
+    def span(self, name, cat='sscn', **attrs):
+        """Record the code within as span `name` of category `cat`.
+        Yield the span, to set more attributes on.
+        """
+        if not settings['TRACING']:
+            yield NOOP_SPAN
+            return
+
+        span = Span(name, cat, attrs)
+        token = current_span.set(span)
+        start = time.perf_counter_ns()
+        try:
+            yield span
+        except BaseException as err:
+            span.attrs['error'] = type(err).__name__
+            raise
+        finally:
+            end = time.perf_counter_ns()
+            current_span.reset(token)
+            self.record(span, start, end)
+
+    def record(self, span, start, end):
+        """Record finished `span` as a complete event."""
+        thread = threading.current_thread()
+        event = {
+            'name': span.name, 'cat': span.cat, 'ph': 'X',
+            'ts': start / 1000, 'dur': (end - start) / 1000,
+            'pid': os.getpid(), 'tid': thread.ident,
+            'args': span.attrs,
+        }
+        with self.lock:
+            self.thread_names[thread.ident] = thread.name
+            self.events.append(event)
+            while len(self.events) > settings['MAX_TRACE_EVENTS']:
+                self.events.popleft()
+
+    def clear(self):
+        """Forget all recorded spans."""
+        with self.lock:
+            self.events.clear()
+            self.thread_names.clear()
+
+    def to_trace_events(self):
+        """Return the recorded spans in the Chrome trace-event format."""
+        pid = os.getpid()
+        with self.lock:
+            thread_events = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                 'args': {'name': name}}
+                for tid, name in self.thread_names.items()]
+            return {
+                'traceEvents': thread_events + list(self.events),
+                'displayTimeUnit': 'ms',
+            }
+
+    def export(self, path):
+        """Write the recorded spans to `path` as trace-event json."""
+        path = Path(path)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='UTF-8') as file:
+            # attributes such as fields are written as strs
+            json.dump(self.to_trace_events(), file,
+                      ensure_ascii=False, default=str)
+        os.replace(temp_path, path)
+
+
+tracer = Tracer()
@@ -6,7 +6,12 @@ from pathlib import Path
 from argparse import ArgumentParser
 
 from sscn.utils import NotFound, get_absolute_path
-from sscn.standard import StandardCode, Standard
+from sscn.standard import StandardCode, standards
+from sscn.settings import settings
+from sscn.supersession import resolve_code
+from sscn.sessions import preconnect_origins
+from sscn.metrics import metrics
+from sscn.tracing import tracer
 
 
 LOGGING_CONFIG = {
@@ -59,6 +64,7 @@ class SSCNCLI(cmd.Cmd):
                 or line.startswith('set ')
                 or line == 'download'
                 or line == 'unset'
+                or line.split(' ')[0] in ('metrics', 'trace')
                 or line == 'exit'
                 ):
                 line = 'get ' + line
@@ -72,11 +78,12 @@ class SSCNCLI(cmd.Cmd):
             self.print('Not valid.')
             return None
 
+        code = resolve_code(code)
         if not code.is_concret():
             self.print('Not concret.')
             return None
         self.print(f'Standard set: {code}.')
-        self.std = Standard(code)
+        self.std = standards.get(code)
         self.set_prompt()
         return None
 
@@ -119,6 +126,30 @@ class SSCNCLI(cmd.Cmd):
         self.print(f'Successfully download to {file_path}.')
         return None
 
+    def do_metrics(self, arg):
+        """Print metrics, or write them to file `arg` (json if it ends
+        with `.json`, otherwise in the Prometheus text format).
+        """
+        if arg:
+            metrics.write(arg)
+            self.print(f'Metrics written to {arg}.')
+        else:
+            self.print(metrics.to_prometheus(), end='')
+
+    def do_trace(self, arg):
+        """Turn tracing `on` or `off`, or write recorded spans to
+        file `arg` as Chrome trace-event json.
+        """
+        if arg in ('on', 'off'):
+            settings['TRACING'] = arg == 'on'
+            self.print(f'Tracing {arg}.')
+        elif arg:
+            tracer.export(arg)
+            self.print(f'Trace written to {arg}.')
+        else:
+            self.print(f'Tracing is {"on" if settings["TRACING"] else "off"}, '
+                       f'{len(tracer)} spans recorded.')
+
     def do_exit(self, arg):
         """Exit program."""
         self.print('Bye.')
@@ -142,4 +173,6 @@ if __name__ == '__main__':
         os.mkdir(absolute_download_dir)
     parsed_args['download_dir'] = absolute_download_dir
 
+    if settings['PRECONNECT_ORIGINS']:
+        preconnect_origins()
     SSCNCLI(**parsed_args).cmdloop()
@@ -3,11 +3,10 @@ import sys
 import logging
 from pathlib import Path
 
-import yaml
 import webview
 
 from sscn.settings import settings
-from sscn.gui.api import Api
+from sscn.gui.api import Api, warm_up
 from sscn.utils import get_absolute_path
 
 
@@ -17,13 +16,19 @@ api = Api()
 DEFAULT_SETTINGS = {
     'FOLDER_DIR': 'folders',
     'DOWNLOAD_DIR': 'download',
-    'MAX_CACHED_STANDARDS': 5,
+    'PREFETCH_FIELDS': (
+        'title', 'status', 'issuance_date', 'implementation_date'),
+    'JOB_WORKERS': 4,
+    'FIELDS_DEADLINE': 8,
+    'METRICS_FILE': 'metrics.prom',
+    'TRACE_FILE': 'trace.json',
     'WEBVIEW_DEBUG': 0,
     'LOGGING_FORMAT': '%(asctime)s %(thread)d [%(levelname)s]: %(message)s',
     'LOGGING_DATEFMT': '%m/%d %H:%M:%S',
     'LOGGING_LEVEL': 'WARN',
     'LOGGING_FILE': 'sscn.log',
-    'SHOW_WECHAT_LOGIN_CODE_FUNC': api.show_wechat_login_code
+    'SHOW_WECHAT_LOGIN_CODE_FUNC': api.show_wechat_login_code,
+    'FIELD_REFRESHED_FUNC': api.on_field_refreshed,
 }
 SETTINGS_FILE = 'config.yaml'
 settings.default_settings.update(DEFAULT_SETTINGS)
@@ -35,12 +40,31 @@ def load_settings():
     path = get_absolute_path(SETTINGS_FILE)
     if not path.is_file():
         return None
+    # pylint: disable=import-outside-toplevel
+    # yaml is slow to import and only needed with a settings file
+    import yaml
     with open(path, encoding='UTF8') as settings_file:
         local_settings = yaml.safe_load(settings_file)
     settings.update(local_settings)
     return None
 
 
+def create_window():
+    """Create the main window, shown once `webview.start()`."""
+    window = webview.create_window(
+        'SimpleStandardCN',
+        './assets/layout.html',
+        js_api=api,
+        width=900,
+        height=500,
+        resizable=False,
+        frameless=True,
+        easy_drag=True,
+        )
+    api.window = window
+    return window
+
+
 if __name__ == '__main__':
     load_settings()
 
@@ -62,16 +86,6 @@ if __name__ == '__main__':
     )
     logger.debug('PATH: %s', os.environ['PATH'])
 
-    window = webview.create_window(
-        'SimpleStandardCN',
-        './assets/layout.html',
-        js_api=api,
-        width=900,
-        height=500,
-        resizable=False,
-        frameless=True,
-        easy_drag=True,
-        )
-    api.window = window
-
-    webview.start(debug=bool(settings['WEBVIEW_DEBUG']))
+    create_window()
+    # the network stack is loaded once the window is shown
+    webview.start(warm_up, debug=bool(settings['WEBVIEW_DEBUG']))
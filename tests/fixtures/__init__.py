@@ -0,0 +1,73 @@
+"""Saved HTML pages of the origins, for tests and benchmarks."""
+from pathlib import Path
+
+import requests
+
+from sscn.origins.ccsn import (
+    CCSNOrigin, CCSNSearchPage, CCSNDetailPage, CCSNDownloadPage)
+from sscn.origins.bzorg import (
+    BZOrgOrigin, BZOrgSearchPage, BZOrgDetailPage, BZOrgDownloadPage)
+from sscn.origins.csres import CSRESOrigin, CSRESSearchPage, CSRESDetailPage
+from sscn.origins.bzko import BzkoOrigin, BzkoSearchPage, BzkoDownloadPage
+
+
+FIXTURES_DIR = Path(__file__).parent
+
+# fixture name: (url the page was requested from, charset sent by the server)
+FIXTURES = {
+    'ccsn_search': (
+        'http://www.ccsn.org.cn/Xxbz/ForceStandardList.aspx', None),
+    'ccsn_detail': (
+        'http://www.ccsn.org.cn/Xxbz/ForceStandardDetail.aspx?Guid=50016', None),
+    'ccsn_download': (
+        'http://www.ccsn.org.cn/xxbz/ShowFullText.aspx?Guid=a1b2c3d4', None),
+    'bzorg_search': ('https://www.biaozhun.org/plus/search.php', None),
+    'bzorg_detail': ('https://www.biaozhun.org/gb/50016-2014.html', None),
+    'bzorg_download': (
+        'https://www.biaozhun.org/plus/download.php?id=8888', None),
+    'csres_search': ('http://www.csres.com/s.jsp?keyword=GB50016-2014', None),
+    'csres_detail': ('http://www.csres.com/detail/50016.html', None),
+    'bzko_search': ('http://www.bzko.com/search.aspx?keyword=50016-2014', None),
+    'bzko_download': (
+        'http://www.bzko.com/Common/ShowDownloadUrl.aspx?id=500162014', None),
+}
+
+# (origin class, page class, fixture name) of every saved page
+FIXTURE_PAGES = (
+    (CCSNOrigin, CCSNSearchPage, 'ccsn_search'),
+    (CCSNOrigin, CCSNDetailPage, 'ccsn_detail'),
+    (CCSNOrigin, CCSNDownloadPage, 'ccsn_download'),
+    (BZOrgOrigin, BZOrgSearchPage, 'bzorg_search'),
+    (BZOrgOrigin, BZOrgDetailPage, 'bzorg_detail'),
+    (BZOrgOrigin, BZOrgDownloadPage, 'bzorg_download'),
+    (CSRESOrigin, CSRESSearchPage, 'csres_search'),
+    (CSRESOrigin, CSRESDetailPage, 'csres_detail'),
+    (BzkoOrigin, BzkoSearchPage, 'bzko_search'),
+    (BzkoOrigin, BzkoDownloadPage, 'bzko_download'),
+)
+
+
+def load_fixture(name):
+    """Return the raw bytes of fixture `name`."""
+    return (FIXTURES_DIR / f'{name}.html').read_bytes()
+
+
+def make_response(name):
+    """Build a `requests.Response` as if fixture `name` was just requested."""
+    url, charset = FIXTURES[name]
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = load_fixture(name)    # pylint: disable=protected-access
+    response.headers['Content-Type'] = (
+        f'text/html; charset={charset}' if charset else 'text/html')
+    response.encoding = charset
+    return response
+
+
+def extract_fixture(page, name):
+    """Let `page` parse fixture `name` and return the extracted fields."""
+    response = make_response(name)
+    page.url = response.url
+    content = page.parse_response(response)
+    return page.extract_fields(content)
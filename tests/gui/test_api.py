@@ -0,0 +1,129 @@
+import sys
+import json
+import time
+import tempfile
+import subprocess
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from sscn.settings import settings
+from sscn.standard import Standard, StandardCode, Status
+from sscn.gui.api import Api, get_standard_fields
+
+
+class GetStandardFieldsTestCase(TestCase):
+    """Testcase for getting fields to be passed to js"""
+    def make_standard(self, status):
+        """Make a standard with cached fields."""
+        return Standard(
+            StandardCode.parse('GB 50016-2006'),
+            title='建筑设计防火规范', status=status, substitute='GB 50016-2014')
+
+    def test_dependent(self):
+        """dependent fields should be included if their bases match"""
+        std = self.make_standard(Status.OBSOLETE)
+        self.assertEqual(
+            get_standard_fields(std, ['title', 'status'], ['substitute']),
+            {'title': '建筑设计防火规范', 'status': '过时',
+             'substitute': 'GB 50016-2014'})
+
+    def test_dependent_excluded(self):
+        """dependent fields should be excluded if their bases don't match"""
+        std = self.make_standard(Status.VALID)
+        self.assertEqual(
+            get_standard_fields(std, ['title'], ['substitute']),
+            {'title': '建筑设计防火规范'})
+
+
+class FieldsBatchTestCase(TestCase):
+    """Testcase for getting fields of many standards in one call"""
+    def setUp(self):
+        self.api = Api()
+        self.api.window = Mock()
+        self.calls = []
+        self.api.window.evaluate_js.side_effect = self.calls.append
+
+    def tearDown(self):
+        self.api.prefetcher.stop()
+
+    def wait_done(self, batch_id=1, timeout=2):
+        """Wait until batch `batch_id` is done."""
+        deadline = time.monotonic() + timeout
+        while (f'onFieldsBatchDone({batch_id})' not in self.calls
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+
+    def test_batch(self):
+        """results of each code should be pushed to js"""
+        codes = ['GB 50016-2014', 'GB 50017-2017', 'not a code']
+        with patch.object(Standard, 'get_field', return_value=Status.VALID):
+            self.assertEqual(
+                self.api.get_fields_batch(1, codes, ['status']), 3)
+            self.wait_done()
+
+        results = {}
+        for call in self.calls[:-1]:
+            # strip `onFieldsBatch(` and `)` to load the args as a list
+            batch_id, code, result = json.loads(
+                '[' + call[len('onFieldsBatch('):-1] + ']')
+            self.assertEqual(batch_id, 1)
+            results[code] = result
+        self.assertEqual(results, {
+            'GB 50016-2014': {'status': '现行'},
+            'GB 50017-2017': {'status': '现行'},
+            'not a code': None,
+        })
+        self.assertEqual(self.calls[-1], 'onFieldsBatchDone(1)')
+
+    def test_same_level(self):
+        """a later batch of the same level should drop the earlier one"""
+        level = [['a.yaml'], []]
+        with patch.object(Standard, 'get_field', return_value=Status.VALID):
+            with self.api.prefetcher.interactive():
+                self.api.get_fields_batch(
+                    1, ['GB 50016-2014'], ['status'], [], level)
+                self.api.get_fields_batch(
+                    2, ['GB 50017-2017'], ['status'], [], level)
+                self.assertEqual(self.calls, ['onFieldsBatchDone(1)'])
+            self.wait_done(2)
+        self.assertEqual(self.calls[1:], [
+            'onFieldsBatch(2, "GB 50017-2017", {"status": "现行"})',
+            'onFieldsBatchDone(2)',
+        ])
+
+
+class FolderAvailabilityTestCase(TestCase):
+    """Testcase for probing the availability of a folder file"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        settings['FOLDER_DIR'] = self.temp_dir.name
+        (Path(self.temp_dir.name) / 'a.yaml').touch()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        settings.user_settings.pop('FOLDER_DIR', None)
+
+    def test_invalid_code(self):
+        """invalid and non-concret codes should be skipped"""
+        tree = [{'code': 'GB 50016-2014'}, {'code': 'not a code'},
+                ('sub', [{'code': 'GB 50017'}])]
+        with patch('sscn.gui.api.load_folder_file', return_value=tree), \
+             patch('sscn.gui.api.availability_many',
+                   side_effect=lambda codes: dict.fromkeys(codes, [])) as mock:
+            self.assertEqual(Api().get_folder_availability(['a.yaml']),
+                             {'GB 50016-2014': []})
+        mock.assert_called_once_with([StandardCode.parse('GB 50016-2014')])
+
+
+class StartupTestCase(TestCase):
+    """Testcase for what importing the api loads"""
+    def test_deferred_imports(self):
+        """the network stack and parsers should not be loaded at startup"""
+        deferred = ('requests', 'parsel', 'lxml', 'yaml', 'rarfile')
+        process = subprocess.run(
+            [sys.executable, '-c',
+             'import sys, sscn.gui.api; '
+             f'print([name for name in {deferred!r} if name in sys.modules])'],
+            capture_output=True, text=True, check=True)
+        self.assertEqual(process.stdout.strip(), '[]')
@@ -0,0 +1,85 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from sscn.settings import settings
+from sscn.gui.folder import (
+    _list_dir, load_downloaded_level, load_folder_level, load_folder_file_level)
+
+
+FOLDER_FILE = """\
+- 基础标准:
+    - 术语标准:
+        - GB/T 50083-2014 工程结构设计基本术语标准
+    - GB 50009-2012 建筑结构荷载规范
+- GB 50016-2014 建筑设计防火规范
+"""
+
+
+class TreeLevelTestCase(TestCase):
+    """Testcase for loading folder trees level by level"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        settings.user_settings.pop('TREE_PAGE_SIZE', None)
+
+    def test_downloaded_level(self):
+        """only direct children should be paginated in order"""
+        (self.path / 'GB').mkdir()
+        (self.path / 'GB' / 'GB_50016_2014_建筑设计防火规范.pdf').touch()
+        for number in range(5):
+            (self.path / f'JGJ_{number+1}_2010_某规程.pdf').touch()
+        (self.path / 'notes.txt').touch()
+
+        page = load_downloaded_level(self.path, limit=4)
+        self.assertEqual(page['nodes'][0], ('GB', None))
+        self.assertEqual(
+            [node['code'] for node in page['nodes'][1:]],
+            ['JGJ 1-2010', 'JGJ 2-2010', 'JGJ 3-2010'])
+        self.assertEqual(page['cursor'], 4)
+
+        page = load_downloaded_level(self.path, cursor=4, limit=4)
+        self.assertEqual(
+            [node['code'] for node in page['nodes']],
+            ['JGJ 4-2010', 'JGJ 5-2010'])
+        self.assertIsNone(page['cursor'])
+
+    def test_downloaded_level_cached(self):
+        """later pages of a level should reuse the cached listing"""
+        for number in range(3):
+            (self.path / f'JGJ_{number+1}_2010_某规程.pdf').touch()
+        _list_dir.cache_clear()
+        load_downloaded_level(self.path, limit=2)
+        load_downloaded_level(self.path, cursor=2, limit=2)
+        info = _list_dir.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_modified(self):
+        """cached levels should be reloaded once modified"""
+        settings['TREE_PAGE_SIZE'] = 10
+        (self.path / 'a.yaml').touch()
+        self.assertEqual(load_folder_level(self.path)['nodes'], ['a.yaml'])
+        (self.path / 'b.yaml').touch()
+        self.assertEqual(
+            load_folder_level(self.path)['nodes'], ['a.yaml', 'b.yaml'])
+
+    def test_folder_file_level(self):
+        """levels of classification files should be loaded by node path"""
+        file_path = self.path / 'folder.yaml'
+        file_path.write_text(FOLDER_FILE, encoding='UTF8')
+
+        page = load_folder_file_level(file_path, limit=10)
+        self.assertEqual(page['nodes'], [
+            ('基础标准', None),
+            {'code': 'GB 50016-2014', 'title': '建筑设计防火规范'},
+        ])
+        page = load_folder_file_level(file_path, ['基础标准'], limit=10)
+        self.assertEqual(page['nodes'], [
+            ('术语标准', None),
+            {'code': 'GB 50009-2012', 'title': '建筑结构荷载规范'},
+        ])
+        with self.assertRaises(KeyError):
+            load_folder_file_level(file_path, ['不存在'], limit=10)
@@ -0,0 +1,108 @@
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from sscn.settings import settings
+from sscn.gui.api import Api
+from sscn.gui.jobs import JobManager, check_cancelled
+
+
+class JobManagerTestCase(TestCase):
+    """Testcase for class `JobManager`"""
+    def setUp(self):
+        settings['JOB_WORKERS'] = 2
+        self.notified = []
+        self.done = threading.Event()
+        self.manager = JobManager(self.notify)
+
+    def tearDown(self):
+        self.manager.shutdown()
+        settings.user_settings.pop('JOB_WORKERS', None)
+
+    def notify(self, func, *args):
+        """Record notifications, setting `done` once a job ends."""
+        self.notified.append((func, *args))
+        if func != 'onJobProgress':
+            self.done.set()
+
+    def test_result(self):
+        """results of jobs should be passed to js"""
+        job_id = self.manager.submit(lambda a, b: a + b, (1, 2), 'js-1')
+        self.assertEqual(job_id, 'js-1')
+        self.assertTrue(self.done.wait(2))
+        self.assertEqual(self.notified, [('onJobResult', 'js-1', 3)])
+
+    def test_error(self):
+        """errors of jobs should be passed to js"""
+        def fail():
+            raise ValueError('failed')
+        job_id = self.manager.submit(fail)
+        self.assertTrue(self.done.wait(2))
+        self.assertEqual(self.notified, [('onJobError', job_id, 'failed')])
+
+    def test_cancel(self):
+        """cancelled jobs should stop at their next check"""
+        started = threading.Event()
+        interrupted = threading.Event()
+
+        def work():
+            started.set()
+            # waits until cancelled
+            interrupted.wait(2)
+            check_cancelled()
+            return 'finished'
+
+        job_id = self.manager.submit(work)
+        self.assertTrue(started.wait(2))
+        self.manager.jobs[job_id].on_cancel(interrupted.set)
+        self.assertTrue(self.manager.cancel(job_id))
+        self.assertTrue(self.done.wait(2))
+        self.assertEqual(self.notified, [('onJobCancelled', job_id)])
+        self.assertFalse(self.manager.cancel(job_id))
+
+    def test_shutdown(self):
+        """jobs not started yet should be dropped on shutdown"""
+        settings['JOB_WORKERS'] = 1
+        started = threading.Event()
+        release = threading.Event()
+        def work():
+            started.set()
+            release.wait(2)
+        running_id = self.manager.submit(work)
+        self.assertTrue(started.wait(2))
+        pending_id = self.manager.submit(lambda: 'finished')
+        running = self.manager.jobs[running_id].future
+        pending = self.manager.jobs[pending_id].future
+        self.manager.shutdown()
+        self.assertEqual(self.notified, [('onJobCancelled', pending_id)])
+        self.assertNotIn(pending_id, self.manager.jobs)
+        release.set()
+        self.assertTrue(pending.cancelled())
+        self.assertIsNone(running.result(2))
+
+    def test_cancel_pending(self):
+        """jobs cancelled before started should be resolved at once"""
+        settings['JOB_WORKERS'] = 1
+        started = threading.Event()
+        release = threading.Event()
+        def work():
+            started.set()
+            release.wait(2)
+        self.manager.submit(work)
+        self.assertTrue(started.wait(2))
+        pending_id = self.manager.submit(lambda: 'finished')
+        self.assertTrue(self.manager.cancel(pending_id))
+        self.assertEqual(self.notified, [('onJobCancelled', pending_id)])
+        self.assertFalse(self.manager.cancel(pending_id))
+        release.set()
+
+
+class ApiJobTestCase(TestCase):
+    """Testcase for starting jobs from js"""
+    def test_not_allowed(self):
+        """only whitelisted methods should be run as jobs"""
+        api = Api()
+        api.window = Mock()
+        with self.assertRaises(ValueError):
+            api.start_job('js-1', 'close', [])
+        api.window.evaluate_js.assert_not_called()
@@ -0,0 +1,151 @@
+import time
+import threading
+from unittest import TestCase
+from unittest.mock import Mock
+
+from sscn.settings import settings
+from sscn.gui.prefetch import Prefetcher
+
+
+class PrefetcherTestCase(TestCase):
+    """Testcase for class `Prefetcher`"""
+    def setUp(self):
+        settings['PREFETCH_FIELDS'] = ('title', 'status')
+        settings['PREFETCH_WORKERS'] = 2
+        self.lock = threading.Lock()
+        self.fetched = []
+        self.active = 0
+        self.max_active = 0
+        self.prefetcher = Prefetcher(self.get_standard)
+
+    def tearDown(self):
+        self.prefetcher.stop()
+        settings.user_settings.pop('PREFETCH_FIELDS', None)
+        settings.user_settings.pop('PREFETCH_WORKERS', None)
+        settings.user_settings.pop('MAX_BATCH_QUEUE', None)
+
+    def get_standard(self, code):
+        """Make a fake standard taking a while to get fields."""
+        def get_field(name):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            time.sleep(0.01)
+            with self.lock:
+                self.active -= 1
+                self.fetched.append((code, name))
+
+        return Mock(concret=True, get_field=get_field)
+
+    def wait_fetched(self, number, timeout=2):
+        """Wait until `number` fields are fetched."""
+        deadline = time.monotonic() + timeout
+        while len(self.fetched) < number and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_prefetch(self):
+        """fields of all codes should be prefetched by capped workers"""
+        codes = [f'GB {50000+i}-2014' for i in range(6)]
+        self.prefetcher.prefetch(codes)
+        self.wait_fetched(12)
+        self.assertEqual(
+            sorted(self.fetched),
+            sorted((code, name) for code in codes
+                   for name in ('title', 'status')))
+        self.assertLessEqual(self.max_active, 2)
+
+    def test_interactive(self):
+        """prefetching should pause during interactive requests"""
+        with self.prefetcher.interactive():
+            self.prefetcher.prefetch(['GB 50016-2014'])
+            time.sleep(0.05)
+            self.assertEqual(self.fetched, [])
+        self.wait_fetched(2)
+        self.assertEqual(len(self.fetched), 2)
+
+    def test_replace_pending(self):
+        """newly visible codes should replace the pending ones"""
+        with self.prefetcher.interactive():
+            self.prefetcher.prefetch(['GB 50016-2014'])
+            self.prefetcher.prefetch(['GB 50017-2017'])
+        self.wait_fetched(2)
+        self.assertEqual(
+            {code for code, _ in self.fetched}, {'GB 50017-2017'})
+
+    def test_restart(self):
+        """workers stopped without waiting should be replaced once they
+        exit, never exceeding the cap
+        """
+        settings['PREFETCH_WORKERS'] = 1
+        codes = [f'GB {50000+i}-2014' for i in range(3)]
+        self.prefetcher.prefetch(codes[:1])
+        while not self.active:
+            time.sleep(0.001)
+        self.prefetcher.stop(wait=False)
+        self.prefetcher.prefetch(codes[1:])
+        self.wait_fetched(5)
+        self.assertEqual(self.max_active, 1)
+        # the stopped worker should give up the rest of its standard
+        self.assertEqual(
+            sorted(self.fetched),
+            [(codes[0], 'title')] + sorted(
+                (code, name) for code in codes[1:]
+                for name in ('title', 'status')))
+        self.assertEqual(len(self.prefetcher.workers), 1)
+
+
+class BatchTestCase(TestCase):
+    """Testcase for running batches by the prefetch workers"""
+    def setUp(self):
+        settings['PREFETCH_WORKERS'] = 1
+        self.prefetcher = Prefetcher(Mock())
+        self.done = []
+        self.dropped = []
+
+    def tearDown(self):
+        self.prefetcher.stop()
+        settings.user_settings.pop('PREFETCH_WORKERS', None)
+        settings.user_settings.pop('MAX_BATCH_QUEUE', None)
+
+    def submit(self, key, items):
+        """Queue a batch of `items` while pausing the workers."""
+        self.prefetcher.submit_batch(
+            key, items, self.done.append, on_drop=self.dropped.extend)
+
+    def wait_done(self, number, timeout=2):
+        """Wait until `number` items are run."""
+        deadline = time.monotonic() + timeout
+        while len(self.done) < number and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_batch(self):
+        """items should be run ahead of codes to prefetch"""
+        with self.prefetcher.interactive():
+            self.prefetcher.prefetch(['GB 50016-2014'])
+            self.submit('a', [1, 2])
+            time.sleep(0.05)
+            self.assertEqual(self.done, [])
+        self.wait_done(2)
+        self.assertEqual(self.done, [1, 2])
+
+    def test_same_key(self):
+        """a later batch of the same key should drop the queued items"""
+        with self.prefetcher.interactive():
+            self.submit('a', [1, 2])
+            self.submit('b', [3])
+            self.submit('a', [4])
+        self.wait_done(2)
+        self.assertEqual(self.done, [3, 4])
+        self.assertEqual(self.dropped, [1, 2])
+
+    def test_bounded(self):
+        """items of the oldest batches should be dropped once too many
+        are queued
+        """
+        settings['MAX_BATCH_QUEUE'] = 3
+        with self.prefetcher.interactive():
+            self.submit('a', [1, 2])
+            self.submit('b', [3, 4])
+        self.wait_done(3)
+        self.assertEqual(self.done, [1, 3, 4])
+        self.assertEqual(self.dropped, [2])
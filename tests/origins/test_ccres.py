@@ -0,0 +1,40 @@
+import sqlite3
+from unittest import TestCase
+from unittest.mock import patch
+
+from sscn.standard import Standard, StandardCode, Status
+from sscn.origins.csres import CSRESOrigin, CSRESSearchPage, CSRESDetailPage
+from tests.fixtures import extract_fixture
+
+
+class CSRESPagesTestCase(TestCase):
+    """Testcase for pages of origin `CSRESOrigin`"""
+    def setUp(self):
+        std = Standard(StandardCode.parse('GB 50016-2014'))
+        self.origin = CSRESOrigin(std)
+
+    def test_search_page(self):
+        """test extracting fields of the matching entry"""
+        fields = extract_fixture(CSRESSearchPage(self.origin), 'csres_search')
+        self.assertEqual(
+            fields['detail_page_url'], 'http://www.csres.com/detail/50016.html')
+        self.assertEqual(fields['issued_by'], '中华人民共和国住房和城乡建设部')
+        self.assertEqual(fields['issuance_date'], '2014-08-27')
+        self.assertIsInstance(fields['status'], Status)
+
+    def test_detail_page(self):
+        """test extracting substitution chains"""
+        fields = extract_fixture(CSRESDetailPage(self.origin), 'csres_detail')
+        self.assertEqual(fields['replaced'], ['GB 50016-2006', 'GB 50045-95'])
+        self.assertEqual(fields['substitute'], 'GB 50016-2014')
+        self.assertIsNone(fields['partial_substitutes'])
+        self.assertEqual(fields['brief'], '本规范适用于新建、扩建和改建的建筑。')
+
+    def test_detail_page_record_error(self):
+        """fields should be fetched even if recording supersession fails"""
+        page = CSRESDetailPage(self.origin)
+        with patch('sscn.origins.csres.graph') as graph, \
+             self.assertLogs('sscn.origins.csres', 'ERROR'):
+            graph.record.side_effect = sqlite3.OperationalError('locked')
+            page.post_fetch(extract_fixture(page, 'csres_detail'))
+        self.assertEqual(self.origin.std.fields['substitute'], 'GB 50016-2014')
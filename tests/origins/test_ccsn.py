@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+from sscn.standard import Standard, StandardCode, Status
+from sscn.origins.ccsn import CCSNOrigin, CCSNSearchPage, CCSNDetailPage
+from tests.fixtures import extract_fixture
+
+
+class CCSNPagesTestCase(TestCase):
+    """Testcase for pages of origin `CCSNOrigin`"""
+    def setUp(self):
+        std = Standard(StandardCode.parse('GB 50016-2014'))
+        self.origin = CCSNOrigin(std)
+
+    def test_search_page(self):
+        """test extracting fields of the matching entry"""
+        fields = extract_fixture(CCSNSearchPage(self.origin), 'ccsn_search')
+        self.assertEqual(fields['title'], '建筑设计防火规范')
+        self.assertEqual(fields['status'], Status.VALID)
+        self.assertTrue(fields['detail_page_url'].endswith('Guid=50016'))
+
+    def test_detail_page(self):
+        """test extracting fields of the detail page"""
+        fields = extract_fixture(CCSNDetailPage(self.origin), 'ccsn_detail')
+        self.assertEqual(fields['issuance_date'], '2014-08-27')
+        self.assertEqual(fields['issued_by'], '中华人民共和国公安部')
+        self.assertEqual(
+            fields['download_page_url'],
+            'http://www.ccsn.org.cn/xxbz/ShowFullText.aspx?Guid=a1b2c3d4')
@@ -0,0 +1,126 @@
+import io
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+from sscn.utils import NotFound
+from sscn.settings import settings
+from sscn.standard import Origin, Standard, StandardCode
+from sscn.origins.ccsn import CCSNOrigin
+from sscn.origins.bzorg import BZOrgOrigin
+from sscn.origins.bzko import BzkoOrigin
+from sscn.availability import (
+    availability, availability_many, availability_cache, probe_url)
+
+
+def make_response(status_code=200, **headers):
+    """Build a `requests.Response` with `headers`."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO()
+    response.headers.update(
+        {name.replace('_', '-'): value for name, value in headers.items()})
+    return response
+
+
+PDF_HEADERS = {'Content_Type': 'application/pdf', 'Content_Length': '1024'}
+
+
+class ProbeUrlTestCase(TestCase):
+    """Testcase for probing a download url"""
+    def probe(self, *responses):
+        """Probe an url answered by `responses` in turn."""
+        with patch.object(CCSNOrigin, 'request', side_effect=responses) as mock:
+            result = probe_url(CCSNOrigin, 'http://foo/bar.pdf')
+        return result, mock
+
+    def test_head(self):
+        """the size should be known from a HEAD request"""
+        result, mock = self.probe(make_response(**PDF_HEADERS))
+        self.assertEqual(result, (True, 1024))
+        self.assertEqual(mock.call_count, 1)
+
+    def test_range(self):
+        """fallback to a ranged GET if HEAD is not supported"""
+        result, mock = self.probe(
+            make_response(405),
+            make_response(
+                206, Content_Type='application/pdf',
+                Content_Range='bytes 0-0/2048', Content_Length='1'))
+        self.assertEqual(result, (True, 2048))
+        mock.assert_called_with(
+            'http://foo/bar.pdf', headers={'Range': 'bytes=0-0'}, stream=True)
+
+    def test_html(self):
+        """html pages should not be regarded as files"""
+        html_headers = {'Content_Type': 'text/html; charset=utf-8'}
+        result, _ = self.probe(
+            make_response(**html_headers), make_response(**html_headers))
+        self.assertEqual(result, (False, None))
+
+    def test_request_error(self):
+        """urls failing to be requested should be unavailable"""
+        result, _ = self.probe(requests.ConnectionError('refused'))
+        self.assertEqual(result, (False, None))
+
+    def test_timeout(self):
+        """urls timing out should be unavailable"""
+        settings['REQUEST_MAX_RETRY'] = 0
+        try:
+            with patch.object(CCSNOrigin, 'send',
+                              side_effect=requests.ReadTimeout) as mock:
+                result = probe_url(CCSNOrigin, 'http://foo/bar.pdf')
+        finally:
+            settings.user_settings.pop('REQUEST_MAX_RETRY', None)
+        self.assertEqual(result, (False, None))
+        self.assertEqual(mock.call_args[0][1], 'HEAD')
+
+
+class AvailabilityTestCase(TestCase):
+    """Testcase for the pdf availability of standards"""
+    def setUp(self):
+        self.code = StandardCode.parse('GB 50016-2014')
+        self.std = Standard(self.code)
+        # pretend the pages before the downloaders have been fetched
+        for origin_cls, fields in (
+                (CCSNOrigin, {'download_url': 'http://foo/1.pdf'}),
+                (BZOrgOrigin, {'download_1_url': NotFound,
+                               'download_2_url': 'http://foo/2.rar'}),
+                (BzkoOrigin, {'download_url': NotFound}),
+                ):
+            self.std.get_subnode(origin_cls).fields.update(fields)
+
+    def tearDown(self):
+        availability_cache.clear()
+
+    def test_availability(self):
+        """every origin should be probed and the results cached"""
+        with patch.object(Origin, 'request',
+                          return_value=make_response(**PDF_HEADERS)):
+            results = availability(self.code, self.std)
+        self.assertEqual(
+            [result['origin'] for result in results], ['ccsn', 'biaozhun'])
+
+        with patch.object(Origin, 'request') as mock:
+            self.assertIs(availability(self.code), results)
+        mock.assert_not_called()
+
+    def test_request_error(self):
+        """other urls should still be probed if one fails"""
+        def request(url, **kwargs):
+            if url == 'http://foo/1.pdf':
+                raise requests.ConnectionError('refused')
+            return make_response(**PDF_HEADERS)
+
+        with patch.object(Origin, 'request', side_effect=request):
+            results = availability(self.code, self.std)
+        self.assertEqual(
+            [result['origin'] for result in results], ['biaozhun'])
+
+    def test_availability_many(self):
+        """availability of multiple codes should be probed at once"""
+        codes = [StandardCode.parse(f'GB 5001{i}-2014') for i in range(4)]
+        with patch.object(Origin, 'get_field', return_value=NotFound):
+            results = availability_many(codes + codes[:1])
+        self.assertEqual(results, dict.fromkeys(codes, []))
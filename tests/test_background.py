@@ -0,0 +1,37 @@
+import threading
+from unittest import TestCase
+
+from sscn.settings import settings
+from sscn.background import BackgroundTasks
+
+
+class BackgroundTasksTestCase(TestCase):
+    """Testcase for class `BackgroundTasks`"""
+    def setUp(self):
+        settings['BACKGROUND_WORKERS'] = 1
+        self.background = BackgroundTasks()
+
+    def tearDown(self):
+        self.background.shutdown()
+        settings.user_settings.pop('BACKGROUND_WORKERS', None)
+
+    def test_shutdown_nowait(self):
+        """tasks not started yet should be cancelled without waiting"""
+        started = threading.Event()
+        release = threading.Event()
+        def work():
+            started.set()
+            return release.wait(2)
+        running = self.background.submit(work)
+        self.assertTrue(started.wait(2))
+        pending = self.background.submit(lambda: 'finished')
+        self.background.shutdown(wait=False)
+        release.set()
+        self.assertTrue(pending.cancelled())
+        self.assertTrue(running.result(2))
+
+    def test_shutdown(self):
+        """submitted tasks should be done before shutting down"""
+        future = self.background.submit(lambda: 'finished')
+        self.background.shutdown()
+        self.assertEqual(future.result(0), 'finished')
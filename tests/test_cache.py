@@ -0,0 +1,68 @@
+import gc
+from unittest import TestCase
+from unittest.mock import patch
+
+from sscn.settings import settings
+from sscn.cache import StandardCache
+from sscn.standard import Standard, StandardCode
+from sscn.origins.ccsn import CCSNOrigin
+
+
+class StandardCacheTestCase(TestCase):
+    """Testcase for class `StandardCache`"""
+    def setUp(self):
+        self.cache = StandardCache(Standard)
+        self.codes = [StandardCode.parse(f'GB {50000+i}-2014') for i in range(4)]
+        # standards report their growth to the process-wide cache
+        self.patcher = patch('sscn.standard.standards', self.cache)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        settings.user_settings.pop('MAX_CACHED_BYTES', None)
+
+    def test_shared(self):
+        """the same standard should be returned for the same code"""
+        std = self.cache.get(self.codes[0])
+        self.assertIs(self.cache.get(self.codes[0]), std)
+
+    def test_bounded_by_bytes(self):
+        """least recently used standards should be evicted by size"""
+        size = Standard(self.codes[0], title='x'*1000).size
+        settings['MAX_CACHED_BYTES'] = size * 2.5
+        for code in self.codes[:3]:
+            self.cache.get(code).update_field('title', 'x'*1000)
+        self.assertEqual(len(self.cache), 2)
+        self.assertNotIn(self.codes[0], self.cache.entries)
+        self.assertLessEqual(self.cache.size, settings['MAX_CACHED_BYTES'])
+
+    def test_resize(self):
+        """growing fields should be accounted by their delta"""
+        std = self.cache.get(self.codes[0])
+        size = self.cache.size
+        std.update_field('title', 'x'*1000)
+        self.assertGreater(self.cache.size, size + 1000)
+        std.update_field('title', 'x', preferred=True)
+        self.assertLess(self.cache.size, size + 1000)
+        self.assertEqual(self.cache.size, std.size)
+
+    def test_resize_subnode(self):
+        """fields of origins should be accounted to their standard"""
+        std = self.cache.get(self.codes[0])
+        size = self.cache.size
+        std.get_subnode(CCSNOrigin).update_field('detail_page_url', 'x'*1000)
+        self.assertGreater(std.size, size + 1000)
+        self.assertEqual(self.cache.size, std.size)
+
+    def test_weak(self):
+        """evicted standards should be returned while still referenced"""
+        settings['MAX_CACHED_BYTES'] = 0
+        kept = self.cache.get(self.codes[0])
+        self.cache.get(self.codes[1])
+        self.assertNotIn(self.codes[0], self.cache.entries)
+        self.assertIs(self.cache.get(self.codes[0]), kept)
+
+        self.cache.get(self.codes[2])
+        del kept
+        gc.collect()
+        self.assertNotIn(self.codes[0], self.cache)
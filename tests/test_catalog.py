@@ -0,0 +1,105 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from sscn.utils import NotFound
+from sscn.standard import StandardCode as StdCode, Status
+from sscn.catalog import Catalog, pack_code, unpack_code
+
+
+class PackCodeTestCase(TestCase):
+    """Testcase for packing codes into int keys"""
+    def test_round_trip(self):
+        """unpacking a packed code should give the same code"""
+        for code in (
+                StdCode('50016', 'GB', True, 2014),
+                StdCode('50001', 'GB', False, 2017, 1),
+                StdCode('229', 'JGJ', False, 2010),
+                StdCode('50001', 'GB', False),
+                StdCode('50001'),
+                ):
+            with self.subTest(code=code):
+                self.assertEqual(unpack_code(pack_code(code)), code)
+
+    def test_order(self):
+        """packed keys should sort by prefix, mandatory, number and year"""
+        codes = [
+            StdCode('50016', 'GB', True, 2014),
+            StdCode('50016', 'GB', True, 2006),
+            StdCode('229', 'JGJ', False, 2010),
+            StdCode('3', 'GB', True, 2019),
+            StdCode('50016', 'GBJ', True, 1987),
+            StdCode('50001', 'GB', False, 2017),
+        ]
+        self.assertEqual(
+            sorted(codes, key=pack_code),
+            sorted(codes, key=lambda c: (
+                c.prefix, (True, False).index(c.is_mandatory),
+                int(c.number), c.part or 0, c.year)))
+
+    def test_leading_zeros(self):
+        """numbers with leading zeros can't be packed"""
+        with self.assertRaises(ValueError):
+            pack_code(StdCode('03', 'JGJ', True, 2010))
+
+
+class CatalogTestCase(TestCase):
+    """Testcase for class `Catalog`"""
+    def setUp(self):
+        self.catalog = Catalog()
+        for number, year in ((50016, 2014), (50002, 2012), (50016, 2006),
+                             (50999, 2011), (51000, 2020), (50500, 2009)):
+            self.catalog.add(
+                StdCode(number, 'GB', False, year),
+                title=f'标准{number}', status=Status.VALID,
+                issuance_date=f'{year}-08-27', ics=NotFound)
+        self.catalog.add(
+            StdCode('50016', 'GB', True, 2014), title='建筑设计防火规范',
+            issued_by=NotFound)
+
+    def test_get(self):
+        """test getting fields of a standard"""
+        self.assertEqual(len(self.catalog), 7)
+        self.assertEqual(
+            self.catalog.get(StdCode('50002', 'GB', False, 2012)),
+            {'title': '标准50002', 'status': Status.VALID,
+             'issuance_date': '2012-08-27'})
+        self.assertIsNone(self.catalog.get(StdCode('1', 'GB', False, 2012)))
+
+    def test_update(self):
+        """adding an existing code should update its fields"""
+        code = StdCode('50002', 'GB', False, 2012)
+        self.catalog.add(code, status=Status.OBSOLETE)
+        self.assertEqual(len(self.catalog), 7)
+        fields = self.catalog.get(code)
+        self.assertEqual(fields['status'], Status.OBSOLETE)
+        self.assertEqual(fields['title'], '标准50002')
+
+    def test_query(self):
+        """test a sorted range query"""
+        results = self.catalog.query('GB', False, (50000, 50999), (2011, None))
+        self.assertEqual(
+            [str(code) for code, _ in results],
+            ['GB/T 50002-2012', 'GB/T 50016-2014', 'GB/T 50999-2011'])
+        results = self.catalog.query('GB', numbers=(50016, 50016))
+        self.assertEqual(len(list(results)), 3)
+
+    def test_save_load(self):
+        """a loaded catalog should equal the saved one"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'catalog')
+            self.catalog.save(path)
+            loaded = Catalog.load(path)
+
+            self.assertEqual(list(loaded), list(self.catalog))
+            self.assertEqual(
+                [code for code, _ in loaded.query('GB', True)],
+                [StdCode('50016', 'GB', True, 2014)])
+
+            # loaded catalogs stay writable
+            loaded.add(StdCode('1', 'GB', False, 2000), title='新标准')
+            self.assertEqual(len(loaded), 8)
+            self.assertEqual(
+                loaded.get(StdCode('50016', 'GB', True, 2014)),
+                {'title': '建筑设计防火规范'})
+            del loaded
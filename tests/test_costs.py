@@ -0,0 +1,77 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from sscn.utils import NotFound
+from sscn.settings import settings
+from sscn.costs import OriginStats, origin_stats
+from sscn.standard import Standard, StandardCode
+from sscn.origins.ccsn import CCSNOrigin
+from sscn.origins.bzorg import BZOrgOrigin
+from sscn.origins.csres import CSRESOrigin
+
+
+class OriginStatsTestCase(TestCase):
+    """Testcase for ordering origins by expected cost"""
+    def setUp(self):
+        self.stats = OriginStats()
+
+    def tearDown(self):
+        settings.user_settings.pop('COST_BASED_ORDERING', None)
+        origin_stats.clear()
+
+    def test_unobserved(self):
+        """origins should keep their order before any attempt"""
+        origins = (CCSNOrigin, BZOrgOrigin)
+        self.assertEqual(self.stats.order(origins, 'title', 'GB'), origins)
+
+    def test_order(self):
+        """origins missing a field should be tried last"""
+        for _ in range(5):
+            self.stats.record(CCSNOrigin, 'issued_by', 'JGJ', False, 0.5)
+            self.stats.record(CSRESOrigin, 'issued_by', 'JGJ', True, 0.8)
+        self.assertEqual(
+            self.stats.order((CCSNOrigin, CSRESOrigin), 'issued_by', 'JGJ'),
+            (CSRESOrigin, CCSNOrigin))
+        # stats are kept per prefix
+        self.assertEqual(
+            self.stats.order((CCSNOrigin, CSRESOrigin), 'issued_by', 'GB'),
+            (CCSNOrigin, CSRESOrigin))
+
+        settings['COST_BASED_ORDERING'] = False
+        self.assertEqual(
+            self.stats.order((CCSNOrigin, CSRESOrigin), 'issued_by', 'JGJ'),
+            (CCSNOrigin, CSRESOrigin))
+
+    def test_preferred(self):
+        """origins preferring a field should be tried first"""
+        for _ in range(5):
+            self.stats.record(CSRESOrigin, 'status', 'GB', False, 2)
+            self.stats.record(CCSNOrigin, 'status', 'GB', True, 0.1)
+        self.assertEqual(
+            self.stats.order((CCSNOrigin, CSRESOrigin), 'status', 'GB'),
+            (CSRESOrigin, CCSNOrigin))
+
+    def test_latency(self):
+        """expected latencies should be smoothed towards the prior"""
+        self.assertIsNone(self.stats.get_latency(CCSNOrigin, 'title', 'GB'))
+        self.stats.record(CCSNOrigin, 'title', 'GB', True, 5)
+        self.assertEqual(self.stats.get_latency(CCSNOrigin, 'title', 'GB'), 3)
+        for _ in range(4):
+            self.stats.record(CCSNOrigin, 'title', 'GB', True, 0)
+        self.assertEqual(self.stats.get_latency(CCSNOrigin, 'title', 'GB'), 1)
+
+    def test_standard(self):
+        """standards should learn to skip origins missing a field"""
+        def get_issued_by(origin, name):
+            if isinstance(origin, CCSNOrigin):
+                return NotFound
+            return '住房和城乡建设部'
+
+        with patch.object(CCSNOrigin, 'get_field', get_issued_by), \
+                patch.object(CSRESOrigin, 'get_field', get_issued_by):
+            for year in (2010, 2011, 2012):
+                std = Standard(StandardCode.parse(f'JGJ 3-{year}'))
+                std.get_field('issued_by')
+            std = Standard(StandardCode.parse('JGJ 3-2013'))
+            self.assertEqual(
+                std.iter_subnode_cls('issued_by'), (CSRESOrigin, CCSNOrigin))
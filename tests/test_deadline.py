@@ -0,0 +1,81 @@
+import time
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from sscn.utils import NotFound
+from sscn.costs import origin_stats
+from sscn.deadline import deadline, remaining
+from sscn.exceptions import DeadlineExceeded
+from sscn.standard import Standard, StandardCode
+from sscn.origins.ccsn import CCSNOrigin, CCSNDetailPage
+
+
+class DeadlineTestCase(TestCase):
+    """Testcase for resolving fields within a deadline"""
+    def setUp(self):
+        self.std = Standard(StandardCode.parse('GB 50016-2014'))
+
+    def tearDown(self):
+        origin_stats.clear()
+
+    def test_nested(self):
+        """an inner deadline should not outlast the enclosing one"""
+        self.assertIsNone(remaining())
+        with deadline(1):
+            with deadline(10):
+                self.assertLessEqual(remaining(), 1)
+        self.assertIsNone(remaining())
+
+    def test_request_timeout(self):
+        """requests should time out by the deadline"""
+        session = Mock()
+        session.request.return_value = Mock(history=[], cookies={})
+        with patch.object(CCSNOrigin, 'session', session):
+            with deadline(0.5):
+                CCSNOrigin.request('http://www.ccsn.org.cn/')
+            self.assertLessEqual(session.request.call_args.kwargs['timeout'], 0.5)
+
+            with deadline(0), self.assertRaises(DeadlineExceeded):
+                CCSNOrigin.request('http://www.ccsn.org.cn/')
+        self.assertEqual(session.request.call_count, 1)
+
+    def test_skip_slow_origin(self):
+        """origins expected to miss the deadline should be skipped,
+        without caching the field as not found"""
+        origin_stats.record(CCSNOrigin, 'title', 'GB', True, 5)
+        with patch.object(Standard, 'iter_subnode_cls',
+                          return_value=(CCSNOrigin,)), \
+             patch.object(CCSNOrigin, 'get_field') as get_field:
+            with deadline(1):
+                self.assertIs(self.std.get_field('title'), NotFound)
+            get_field.assert_not_called()
+        self.assertNotIn('title', self.std.fields)
+
+    def test_retry_slow_origin(self):
+        """origins skipped many times in a row should be attempted again"""
+        origin_stats.record(CCSNOrigin, 'title', 'GB', True, 5)
+        with patch.object(Standard, 'iter_subnode_cls',
+                          return_value=(CCSNOrigin,)), \
+             patch.object(CCSNOrigin, 'get_field',
+                          return_value='title') as get_field:
+            for _ in range(origin_stats.RETRY_AFTER_SKIPS):
+                std = Standard(StandardCode.parse('GB 50016-2014'))
+                with deadline(1):
+                    field = std.get_field('title')
+        get_field.assert_called_once_with('title')
+        self.assertEqual(field, 'title')
+        self.assertNotIn((CCSNOrigin, 'title', 'GB'), origin_stats.skips)
+
+    def test_page_not_failed(self):
+        """pages cut by the deadline should be fetched again later"""
+        def fetch(page):
+            time.sleep(0.02)
+            raise DeadlineExceeded()
+
+        page = self.std.get_subnode(CCSNOrigin).get_subnode(CCSNDetailPage)
+        with patch.object(CCSNDetailPage, 'fetch', autospec=True,
+                          side_effect=fetch):
+            with deadline(0.01), self.assertRaises(DeadlineExceeded):
+                page.get_field('issued_by')
+        self.assertIsNone(page.success)
+        self.assertEqual(page.request_errored, 0)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from sscn.settings import settings
+from sscn.harvest import harvested
+from sscn.standard import Origin, Standard, StandardCode, Status
+from sscn.origins.csres import CSRESOrigin, CSRESSearchPage
+from tests.fixtures import extract_fixture
+
+
+class HarvestTestCase(TestCase):
+    """Testcase for harvesting sibling search entries"""
+    def setUp(self):
+        settings['HARVEST_SEARCH_ENTRIES'] = True
+        std = Standard(StandardCode.parse('GB 50016-2014'))
+        self.page = CSRESSearchPage(CSRESOrigin(std))
+
+    def tearDown(self):
+        settings.user_settings.pop('HARVEST_SEARCH_ENTRIES', None)
+        harvested.clear()
+
+    def test_harvest_entries(self):
+        """every other entry should be harvested"""
+        extract_fixture(self.page, 'csres_search')
+        self.assertEqual(len(harvested), 199)
+        self.assertNotIn(self.page.origin.std.code, harvested)
+
+        code = StandardCode.parse('GB/T 50002-2012')
+        (origin_cls, page_cls, fields), = harvested.get(code)
+        self.assertIs(origin_cls, CSRESOrigin)
+        self.assertIs(page_cls, CSRESSearchPage)
+        self.assertEqual(
+            fields['detail_page_url'], 'http://www.csres.com/detail/50002.html')
+
+    def test_no_harvest(self):
+        """nothing should be harvested without the setting"""
+        settings['HARVEST_SEARCH_ENTRIES'] = False
+        extract_fixture(self.page, 'csres_search')
+        self.assertEqual(len(harvested), 0)
+
+    def test_apply_harvested(self):
+        """harvested fields should be used without requesting"""
+        extract_fixture(self.page, 'csres_search')
+
+        std = Standard(StandardCode.parse('GB/T 50002-2012'))
+        with patch.object(Origin, 'request', side_effect=AssertionError):
+            self.assertIsInstance(std.get_field('status'), Status)
+            self.assertEqual(std.get_field('issuance_date'), '2012-08-27')
+
+        origin = std.subnodes[CSRESOrigin]
+        self.assertTrue(origin.subnodes[CSRESSearchPage].success)
+        self.assertEqual(
+            origin.fields['detail_page_url'],
+            'http://www.csres.com/detail/50002.html')
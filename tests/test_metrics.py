@@ -0,0 +1,100 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from sscn.metrics import Histogram, Metrics, metrics
+from sscn.standard import Standard, StandardCode
+from sscn.origins.ccsn import CCSNOrigin, CCSNDetailPage
+from tests.fixtures import FIXTURES, make_response
+
+
+class MetricsTestCase(TestCase):
+    """Testcase for class `Metrics`"""
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_quantile(self):
+        """quantiles should be estimated by bucket bounds"""
+        histogram = Histogram((0.1, 1, 10))
+        for value in (0.05, 0.05, 0.5, 5):
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.9), 10)
+        self.assertIsNone(Histogram((1,)).quantile(0.5))
+
+    def test_prometheus(self):
+        """metrics should be exported in the Prometheus text format"""
+        self.metrics.inc('sscn_requests_total', origin='ccsn', status='200')
+        self.metrics.inc('sscn_requests_total', origin='ccsn', status='200')
+        self.metrics.observe('sscn_request_seconds', 0.3, origin='ccsn')
+        text = self.metrics.to_prometheus()
+        self.assertIn('# TYPE sscn_requests_total counter\n', text)
+        self.assertIn('sscn_requests_total{origin="ccsn",status="200"} 2\n', text)
+        self.assertIn('sscn_request_seconds_bucket{origin="ccsn",le="0.25"} 0\n', text)
+        self.assertIn('sscn_request_seconds_bucket{origin="ccsn",le="0.5"} 1\n', text)
+        self.assertIn('sscn_request_seconds_bucket{origin="ccsn",le="+Inf"} 1\n', text)
+        self.assertIn('sscn_request_seconds_count{origin="ccsn"} 1\n', text)
+
+    def test_write_json(self):
+        """a json snapshot should be written by suffix"""
+        self.metrics.inc('sscn_requests_total', origin='ccsn', status='200')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'metrics.json'
+            self.metrics.write(path)
+            snapshot = json.loads(path.read_text(encoding='UTF-8'))
+        self.assertEqual(snapshot['counters'], [{
+            'name': 'sscn_requests_total',
+            'labels': {'origin': 'ccsn', 'status': '200'}, 'value': 1}])
+
+
+class InstrumentationTestCase(TestCase):
+    """Testcase for metrics recorded while getting fields"""
+    def setUp(self):
+        metrics.clear()
+        self.std = Standard(StandardCode.parse('GB 50016-2014'))
+        self.origin = self.std.get_subnode(CCSNOrigin)
+        self.origin.fields['detail_page_url'] = FIXTURES['ccsn_detail'][0]
+
+    def tearDown(self):
+        metrics.clear()
+
+    def test_page(self):
+        """fetches, bytes and parse times of pages should be recorded"""
+        response = make_response('ccsn_detail')
+        page = self.origin.get_subnode(CCSNDetailPage)
+        with patch.object(CCSNOrigin, 'request', return_value=response):
+            page.get_field('issued_by')
+
+        labels = {'origin': 'ccsn', 'page': 'CCSNDetailPage'}
+        self.assertEqual(metrics.get_counter(
+            'sscn_page_fetches_total', result='ok', **labels), 1)
+        self.assertEqual(metrics.get_counter(
+            'sscn_page_bytes_total', **labels), len(response.content))
+        names = {name for name, _ in metrics.histograms}
+        self.assertLessEqual(
+            {'sscn_page_fetch_seconds', 'sscn_parse_cpu_seconds'}, names)
+
+    def test_request(self):
+        """requests should be counted by status"""
+        session = Mock()
+        session.request.return_value = Mock(
+            status_code=404, history=[], cookies={})
+        with patch.object(CCSNOrigin, 'session', session):
+            CCSNOrigin.request('http://www.ccsn.org.cn/')
+        self.assertEqual(metrics.get_counter(
+            'sscn_requests_total', origin='ccsn', status='404'), 1)
+        self.assertEqual(
+            metrics.summarize()['origins']['ccsn']['errors'], 1)
+
+    def test_field_lookups(self):
+        """cache hits and misses of fields should be counted"""
+        self.std.fields['title'] = '建筑设计防火规范'
+        self.std.get_field('title')
+        with patch.object(Standard, 'iter_subnode_cls', return_value=()):
+            self.std.get_field('issued_by')
+        self.assertEqual(metrics.summarize()['fields'], {
+            'title': {'hits': 1, 'misses': 0},
+            'issued_by': {'hits': 0, 'misses': 1},
+        })
@@ -0,0 +1,210 @@
+import time
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from lxml import etree
+
+from sscn.settings import settings
+from sscn.exceptions import RequestError
+from sscn.standard import Standard, StandardCode
+from sscn.page import (
+    XPathPage, SearchXPathPage, compile_xpath, xpath_get, xpath_getall)
+from sscn.origins.ccsn import CCSNOrigin, CCSNDetailPage
+from sscn.origins.csres import CSRESOrigin, CSRESSearchPage
+from tests.fixtures import (
+    FIXTURES, FIXTURE_PAGES, extract_fixture, make_response)
+
+
+class XPathPageTestCase(TestCase):
+    """Testcase for class `XPathPage`"""
+    def setUp(self):
+        self.std = Standard(StandardCode.parse('GB 50016-2014'))
+
+    def tearDown(self):
+        settings.user_settings.pop('LXML_FAST_PATH', None)
+        settings.user_settings.pop('INCREMENTAL_SEARCH_PARSE', None)
+
+    def test_compile_on_subclassing(self):
+        """xpaths should be compiled when the class is defined"""
+        class FooPage(XPathPage):
+            base_node_xpath = r'//div'
+            field_xpaths = {'foo': (r'./p/text()', None)}
+
+        self.assertIsInstance(FooPage._base_node_xpath, etree.XPath)
+        query, default = FooPage._field_xpaths['foo']
+        self.assertIsInstance(query, etree.XPath)
+        self.assertIsNone(default)
+        self.assertIs(query, compile_xpath(r'./p/text()'))
+
+    def test_xpath_helpers(self):
+        """helpers should return strs like `parsel` does"""
+        root = etree.HTML('<div><p>a</p><p>b</p><a href="x">c</a></div>')
+        self.assertEqual(xpath_get(root, '//p/text()'), 'a')
+        self.assertEqual(xpath_getall(root, '//p/text()'), ['a', 'b'])
+        self.assertEqual(xpath_get(root, '//a/@href'), 'x')
+        self.assertEqual(xpath_get(root, '//a'), '<a href="x">c</a>')
+        self.assertIsNone(xpath_get(root, '//span'))
+
+    def test_fast_path(self):
+        """lxml fast path should extract the same fields as parsel"""
+        for origin_cls, page_cls, fixture in FIXTURE_PAGES:
+            with self.subTest(page=page_cls.__name__):
+                origin = origin_cls(self.std)
+                settings['LXML_FAST_PATH'] = False
+                expected = extract_fixture(page_cls(origin), fixture)
+                settings['LXML_FAST_PATH'] = True
+                fields = extract_fixture(page_cls(origin), fixture)
+                self.assertEqual(fields, expected)
+
+    def test_incremental_parse(self):
+        """incremental parsing should find the same entries"""
+        for origin_cls, page_cls, fixture in FIXTURE_PAGES:
+            if not issubclass(page_cls, SearchXPathPage):
+                continue
+            with self.subTest(page=page_cls.__name__):
+                origin = origin_cls(self.std)
+                expected = extract_fixture(page_cls(origin), fixture)
+                settings['INCREMENTAL_SEARCH_PARSE'] = True
+                fields = extract_fixture(page_cls(origin), fixture)
+                settings['INCREMENTAL_SEARCH_PARSE'] = False
+                self.assertEqual(fields, expected)
+
+
+class SearchXPathPageTestCase(TestCase):
+    """Testcase for class `SearchXPathPage`"""
+    def test_find_entry_early_exit(self):
+        """entries should stop being matched after the first match"""
+        std = Standard(StandardCode.parse('GB 50016-2014'))
+        page = CSRESSearchPage(CSRESOrigin(std))
+        with patch.object(
+                CSRESSearchPage, 'is_entry_matching', autospec=True,
+                side_effect=CSRESSearchPage.is_entry_matching) as mock:
+            extract_fixture(page, 'csres_search')
+        # only "GB/T 50016-2014" and "GB 50016-2014" contain "50016",
+        #  while 80 more entries follow the match
+        self.assertEqual(mock.call_count, 2)
+
+
+class PageReleaseTestCase(TestCase):
+    """Testcase for releasing responses of fetched pages"""
+    def setUp(self):
+        self.std = Standard(StandardCode.parse('GB 50016-2014'))
+        self.origin = CCSNOrigin(self.std)
+        self.origin.fields['detail_page_url'] = FIXTURES['ccsn_detail'][0]
+
+    def tearDown(self):
+        settings.user_settings.pop('RELEASE_RESPONSES', None)
+
+    def fetch(self):
+        """Fetch the detail page from its fixture."""
+        page = self.origin.get_subnode(CCSNDetailPage)
+        with patch.object(
+                CCSNOrigin, 'request',
+                return_value=make_response('ccsn_detail')):
+            page.get_field('issued_by')
+        return page
+
+    def test_release(self):
+        """the response should be released while url fields are joined"""
+        page = self.fetch()
+        self.assertIsNone(page.response)
+        self.assertEqual(page.url, FIXTURES['ccsn_detail'][0])
+        self.assertTrue(self.origin.get_field('download_page_url')
+            .startswith('http://www.ccsn.org.cn/xxbz/ShowFullText.aspx'))
+
+    def test_keep(self):
+        """the response should be kept if setting is off"""
+        settings['RELEASE_RESPONSES'] = False
+        page = self.fetch()
+        self.assertIsNotNone(page.response)
+
+    def test_slots(self):
+        """nodes and pages should not carry instance dicts"""
+        page = CCSNDetailPage(self.origin)
+        for obj in (self.std, self.origin, page):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+
+class PageConcurrencyTestCase(TestCase):
+    """Testcase for fetching a page from multiple threads"""
+    def setUp(self):
+        self.std = Standard(StandardCode.parse('GB 50016-2014'))
+        self.origin = CCSNOrigin(self.std)
+        self.origin.fields['detail_page_url'] = FIXTURES['ccsn_detail'][0]
+
+    def get_concurrently(self, request, number=8):
+        """Get field `issued_by` from `number` threads at the same time."""
+        def get_field():
+            try:
+                page = self.origin.get_subnode(CCSNDetailPage)
+                return page.get_field('issued_by')
+            except RequestError as err:
+                return err
+
+        with patch.object(CCSNOrigin, 'request', side_effect=request) as mock, \
+                ThreadPoolExecutor(number) as executor:
+            futures = [executor.submit(get_field) for _ in range(number)]
+            results = [future.result() for future in futures]
+        return mock.call_count, results
+
+    def test_coalesce(self):
+        """concurrent callers should share a single fetch"""
+        def request(*args, **kwargs):
+            time.sleep(0.05)
+            return make_response('ccsn_detail')
+
+        call_count, results = self.get_concurrently(request)
+        self.assertEqual(call_count, 1)
+        self.assertEqual(set(results), {self.std.fields['issued_by']})
+
+    def test_coalesce_error(self):
+        """the error of a shared fetch should be raised to every caller"""
+        def request(*args, **kwargs):
+            time.sleep(0.05)
+            raise RequestError(None)
+
+        call_count, results = self.get_concurrently(request)
+        self.assertEqual(call_count, 1)
+        for result in results:
+            self.assertIsInstance(result, RequestError)
+
+    def test_subnode(self):
+        """a single subnode instance should be made per class"""
+        with ThreadPoolExecutor(8) as executor:
+            subnodes = set(executor.map(
+                lambda _: self.std.get_subnode(CCSNOrigin), range(64)))
+        self.assertEqual(len(subnodes), 1)
+
+
+class PageEncodingTestCase(TestCase):
+    """Testcase for decoding responses with declared encodings"""
+    def test_origin_encoding(self):
+        """the origin's encoding should be used if headers declare none"""
+        std = Standard(StandardCode.parse('GB 50016-2014'))
+        page = CSRESSearchPage(CSRESOrigin(std))
+        response = make_response('csres_search')
+        page.parse_response(response)
+        self.assertEqual(response.encoding, 'GBK')
+
+    def test_builtin_origins(self):
+        """pages of every builtin origin should be decoded without
+        sniffing the charset
+        """
+        std = Standard(StandardCode.parse('GB 50016-2014'))
+        for origin_cls, page_cls, fixture in FIXTURE_PAGES:
+            with self.subTest(fixture=fixture):
+                self.assertIsNotNone(origin_cls.encoding)
+                response = make_response(fixture)
+                page_cls(origin_cls(std)).parse_response(response)
+                if response.encoding is not None:
+                    self.assertEqual(response.encoding, origin_cls.encoding)
+
+    def test_header_encoding(self):
+        """the charset declared in http headers should be respected"""
+        std = Standard(StandardCode.parse('GB 50016-2014'))
+        origin = CSRESOrigin(std)
+        response = make_response('csres_search')
+        response.headers['Content-Type'] = 'text/html; charset=gb18030'
+        response.encoding = 'gb18030'
+        self.assertEqual(origin.get_encoding(response), 'gb18030')
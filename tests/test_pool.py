@@ -0,0 +1,84 @@
+import time
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+from sscn.settings import settings
+from sscn.origins.ccsn import CCSNOrigin
+from sscn.exceptions import RequestError
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answer every request with a small keep-alive response."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    # named by `BaseHTTPRequestHandler`
+    def do_GET(self):   # pylint: disable=invalid-name
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # keep the test output quiet
+    def log_message(self, *args):   # pylint: disable=arguments-differ
+        pass
+
+
+class ConnectionPoolTestCase(TestCase):
+    """Testcase for connection pools of origin sessions"""
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        self.server.daemon_threads = True
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        settings['PERSIST_SESSIONS'] = False
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        settings.user_settings.pop('PERSIST_SESSIONS', None)
+        settings.user_settings.pop('ORIGIN_POOL_SETTINGS', None)
+        settings.user_settings.pop('REQUEST_MAX_RETRY', None)
+
+    def test_pool_settings(self):
+        """settings of an origin should override the defaults"""
+        settings['ORIGIN_POOL_SETTINGS'] = {'ccsn': {'pool_maxsize': 2}}
+        pool_settings = CCSNOrigin.get_pool_settings()
+        self.assertEqual(pool_settings['pool_maxsize'], 2)
+        self.assertEqual(
+            pool_settings['pool_block'], settings['POOL_SETTINGS']['pool_block'])
+
+    def test_reuse(self):
+        """parallel requests should reuse at most `pool_maxsize` connections"""
+        settings['ORIGIN_POOL_SETTINGS'] = {'ccsn': {'pool_maxsize': 4}}
+        with patch.object(CCSNOrigin, 'session', None), \
+             ThreadPoolExecutor(8) as executor:
+            list(executor.map(
+                lambda _: CCSNOrigin.request(self.url).content, range(64)))
+            stats = CCSNOrigin.get_pool_stats()
+            CCSNOrigin.session.close()
+
+        self.assertEqual(stats['requests'], 64)
+        self.assertLessEqual(stats['created'], 4)
+        self.assertEqual(stats['active'], 0)
+        self.assertEqual(stats['idle'], stats['created'])
+
+    def test_blocked(self):
+        """waiting for a connection of a full pool should time out"""
+        settings['ORIGIN_POOL_SETTINGS'] = {
+            'ccsn': {'pool_maxsize': 1, 'pool_block': True}}
+        settings['REQUEST_MAX_RETRY'] = 0
+        with patch.object(CCSNOrigin, 'session', None):
+            # the connection is held until the body is read
+            response = CCSNOrigin.request(self.url, stream=True)
+            start = time.monotonic()
+            with self.assertRaises(RequestError):
+                CCSNOrigin.request(self.url, timeout=0.1)
+            self.assertLess(time.monotonic() - start, 1)
+            response.close()
+            CCSNOrigin.session.close()
@@ -0,0 +1,114 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from sscn.page import Page
+from sscn.settings import settings
+from sscn.standard import Origin
+from sscn.origins import OriginRegistry, registry
+from sscn.origins.ccsn import CCSNOrigin, CCSNSearchPage
+from sscn.origins.bzorg import BZOrgOrigin
+from sscn.origins.csres import CSRESOrigin
+from sscn.origins.bzko import BzkoOrigin
+
+
+class FooPage(Page):
+    __slots__ = ()
+
+    public_fields = ('title', 'status')
+
+
+class BarPage(Page):
+    __slots__ = ()
+
+    public_fields = ('title', 'status')
+    preferred_fields = ('status',)
+
+
+class FooOrigin(Origin):
+    __slots__ = ()
+
+    name = 'foo'
+    pages = (FooPage, BarPage)
+
+
+class OriginRoutesTestCase(TestCase):
+    """Testcase for routing fields to pages of an origin"""
+    def test_routes(self):
+        """pages should be in order with preferred ones first"""
+        self.assertEqual(FooOrigin.iter_subnode_cls('title'), (FooPage, BarPage))
+        self.assertEqual(FooOrigin.iter_subnode_cls('status'), (BarPage, FooPage))
+        self.assertEqual(FooOrigin.iter_subnode_cls('pdf'), ())
+
+    def test_preferred_field_set(self):
+        """preferred fields should be compiled into a plain frozenset"""
+        self.assertEqual(FooOrigin.__dict__['preferred_field_set'],
+                         frozenset({'status'}))
+        self.assertEqual(CSRESOrigin.__dict__['preferred_field_set'],
+                         frozenset({'status'}))
+
+
+class OriginRegistryTestCase(TestCase):
+    """Testcase for class `OriginRegistry`"""
+    def tearDown(self):
+        settings.user_settings.pop('DISABLED_ORIGINS', None)
+
+    def test_builtins(self):
+        """builtin origins should be loaded once in order"""
+        origins = registry.load()
+        self.assertIs(registry.load(), origins)
+        self.assertEqual(
+            registry.enabled(),
+            (CCSNOrigin, BZOrgOrigin, CSRESOrigin, BzkoOrigin))
+
+    def test_route(self):
+        """fields should be routed to origins serving them"""
+        self.assertEqual(
+            registry.route('title'),
+            (CCSNOrigin, BZOrgOrigin, CSRESOrigin))
+        self.assertEqual(registry.route('substitute'), (CSRESOrigin,))
+        self.assertEqual(registry.route('no_such_field'), ())
+        self.assertIn(CCSNSearchPage, CCSNOrigin.iter_subnode_cls('title'))
+
+    def test_disabled(self):
+        """disabled origins should neither be searched nor routed to"""
+        settings['DISABLED_ORIGINS'] = ('ccsn', 'csres')
+        self.assertEqual(registry.enabled(), (BZOrgOrigin, BzkoOrigin))
+        self.assertEqual(registry.route('title'), (BZOrgOrigin,))
+
+    def test_register(self):
+        """registered origins should be routed to after the others"""
+        foo_registry = OriginRegistry(
+            builtins=('sscn.origins.csres:CSRESOrigin',))
+        self.assertEqual(foo_registry.route('title'), (CSRESOrigin,))
+        foo_registry.register(FooOrigin)
+        self.assertEqual(foo_registry.route('title'), (CSRESOrigin, FooOrigin))
+        foo_registry.unregister(FooOrigin)
+        self.assertEqual(foo_registry.route('title'), (CSRESOrigin,))
+
+    def test_entry_points(self):
+        """origins should be loaded from entry points"""
+        entry_point = Mock()
+        entry_point.load.return_value = FooOrigin
+        broken_entry_point = Mock()
+        broken_entry_point.load.side_effect = ImportError
+
+        with patch('sscn.origins.entry_points') as mock:
+            mock.return_value.select.return_value = [
+                broken_entry_point, entry_point]
+            foo_registry = OriginRegistry(builtins=())
+            self.assertEqual(foo_registry.enabled(), (FooOrigin,))
+        mock.assert_called_once_with()
+        mock.return_value.select.assert_called_once_with(group='sscn.origins')
+
+    def test_entry_points_by_group(self):
+        """origins should be loaded from entry points grouped in a dict,
+        as returned before python 3.10
+        """
+        entry_point = Mock()
+        entry_point.load.return_value = FooOrigin
+
+        with patch('sscn.origins.entry_points', return_value={
+                'sscn.origins': [entry_point], 'other': [Mock()]}) as mock:
+            foo_registry = OriginRegistry(builtins=())
+            self.assertEqual(foo_registry.enabled(), (FooOrigin,))
+        mock.assert_called_once_with()
@@ -0,0 +1,138 @@
+import time
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import requests
+
+from sscn.settings import settings
+from sscn.origins.ccsn import CCSNOrigin
+from sscn.origins.bzorg import BZOrgOrigin
+from sscn.sessions import (
+    load_cookies, save_cookies, clear_cookies, get_session_path,
+    session_saver)
+
+# a week later
+EXPIRES = int(time.time()) + 7*24*3600
+
+
+class CookiePersistenceTestCase(TestCase):
+    """Testcase for storing cookies of origins"""
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        settings['CACHE_DIR'] = self.temp_dir.name
+
+    def tearDown(self):
+        settings.user_settings.pop('CACHE_DIR', None)
+        session_saver.forget(CCSNOrigin.name)
+        session_saver.forget(BZOrgOrigin.name)
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """stored cookies should be loaded, except expired and
+        session-only ones
+        """
+        jar = requests.cookies.RequestsCookieJar()
+        jar.set('user', '42', domain='example.com', path='/', expires=EXPIRES)
+        jar.set('old', '1', domain='example.com', expires=time.time()-60)
+        jar.set('session', '1', domain='example.com')
+        save_cookies('test', jar)
+
+        loaded = requests.cookies.RequestsCookieJar()
+        self.assertTrue(load_cookies('test', loaded))
+        self.assertEqual(loaded.get_dict(), {'user': '42'})
+
+    def test_merge(self):
+        """cookies stored by other processes should be kept"""
+        for name in ('a', 'b'):
+            jar = requests.cookies.RequestsCookieJar()
+            jar.set(name, '1', domain='example.com', expires=EXPIRES)
+            save_cookies('test', jar)
+
+        loaded = requests.cookies.RequestsCookieJar()
+        load_cookies('test', loaded)
+        self.assertEqual(loaded.get_dict(), {'a': '1', 'b': '1'})
+
+    def test_clear(self):
+        """cleared cookies should not be loaded"""
+        jar = requests.cookies.RequestsCookieJar()
+        jar.set('user', '42', domain='example.com', expires=EXPIRES)
+        save_cookies('test', jar)
+        clear_cookies('test')
+        self.assertFalse(get_session_path('test').exists())
+        self.assertFalse(load_cookies('test', jar))
+
+    def make_session(self):
+        """Make a session answering requests with a persistent cookie."""
+        session = requests.session()
+        session.cookies.set('ASP.NET_SessionId', 'abc',
+                            domain='www.ccsn.org.cn', expires=EXPIRES)
+        session.request = Mock(return_value=Mock(
+            history=[], cookies=session.cookies.copy()))
+        return session
+
+    def test_request_caches_cookies(self):
+        """cookies set by responses should be stored in a while"""
+        settings['SESSION_SAVE_DELAY'] = 0.01
+        session = self.make_session()
+        try:
+            with patch.object(CCSNOrigin, 'session', session), \
+                 patch('sscn.sessions.save_cookies',
+                       wraps=save_cookies) as save:
+                CCSNOrigin.request('http://www.ccsn.org.cn/')
+                CCSNOrigin.request('http://www.ccsn.org.cn/')
+                save.assert_not_called()
+                deadline = time.monotonic() + 2
+                while not save.called and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                save.assert_called_once()
+        finally:
+            settings.user_settings.pop('SESSION_SAVE_DELAY', None)
+
+        loaded = requests.cookies.RequestsCookieJar()
+        load_cookies(CCSNOrigin.name, loaded)
+        self.assertEqual(loaded.get_dict(), {'ASP.NET_SessionId': 'abc'})
+
+    def test_unchanged(self):
+        """sessions should only be written if their cookies changed"""
+        session = self.make_session()
+        with patch.object(CCSNOrigin, 'session', session), \
+             patch('sscn.sessions.save_cookies') as save:
+            self.assertTrue(session_saver.save(CCSNOrigin))
+            self.assertFalse(session_saver.save(CCSNOrigin))
+            session.cookies.set('ASP.NET_SessionId', 'def',
+                                domain='www.ccsn.org.cn', expires=EXPIRES)
+            self.assertTrue(session_saver.save(CCSNOrigin))
+        self.assertEqual(save.call_count, 2)
+
+    def test_session_cookies(self):
+        """session cookies declared by the origin should be stored"""
+        session = requests.session()
+        session.cookies.set('DedeUserID', '42', domain='www.biaozhun.org')
+        session.cookies.set('PHPSESSID', 'abc', domain='www.biaozhun.org')
+        with patch.object(BZOrgOrigin, 'session', session):
+            self.assertTrue(session_saver.save(BZOrgOrigin))
+
+        loaded = requests.cookies.RequestsCookieJar()
+        load_cookies(BZOrgOrigin.name, loaded)
+        self.assertEqual(loaded.get_dict(), {'DedeUserID': '42'})
+
+    def test_legacy_session(self):
+        """the login stored by earlier versions should be imported once"""
+        legacy_path = Path(self.temp_dir.name) / 'biaozhun'
+        legacy_path.write_text(
+            'DedeLoginTime=1600000000\nDedeLoginTime__ckMd5=\n'
+            'DedeUserID=42\nDedeUserID__ckMd5=abc\n', encoding='UTF-8')
+
+        with patch.object(BZOrgOrigin, 'session', None):
+            session = BZOrgOrigin.get_session()
+        self.assertEqual(session.cookies.get_dict(), {
+            'DedeLoginTime': '1600000000',
+            'DedeUserID': '42', 'DedeUserID__ckMd5': 'abc'})
+        self.assertFalse(legacy_path.exists())
+
+        session_saver.forget(BZOrgOrigin.name)
+        with patch.object(BZOrgOrigin, 'session', None):
+            session = BZOrgOrigin.get_session()
+        self.assertEqual(session.cookies.get('DedeUserID'), '42')
@@ -0,0 +1,99 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from sscn.utils import NotFound
+from sscn.settings import settings
+from sscn.harvest import harvested
+from sscn.standard import Origin, Standard, StandardCode, Status
+from sscn.origins.ccsn import CCSNOrigin, CCSNSearchPage
+from sscn.origins.bzorg import BZOrgOrigin
+
+
+class RevalidateTestCase(TestCase):
+    """Testcase for refreshing stale fields in background"""
+    def setUp(self):
+        self.std = Standard(
+            StandardCode.parse('GB 50016-2014'), status=Status.VALID)
+        self.notify = Mock()
+        settings['FIELD_REFRESHED_FUNC'] = self.notify
+
+    def tearDown(self):
+        settings.user_settings.pop('FIELD_REFRESHED_FUNC', None)
+
+    def test_fresh(self):
+        """fresh fields should be returned without refreshing"""
+        with patch.object(Standard, 'revalidate') as revalidate:
+            self.assertIs(self.std.get_field('status'), Status.VALID)
+        revalidate.assert_not_called()
+
+    def test_stale(self):
+        """stale fields should be returned at once and refreshed"""
+        self.std.field_times['status'] = 0
+        with patch.object(Standard, 'revalidate') as revalidate:
+            self.assertIs(self.std.get_field('status'), Status.VALID)
+        revalidate.assert_called_once_with('status')
+
+    def test_revalidate(self):
+        """refreshed fields should be written back and notified"""
+        self.std.field_times['status'] = 0
+        with patch.object(Origin, 'get_field', return_value=Status.OBSOLETE):
+            self.std.revalidate('status').result()
+        self.assertIs(self.std.fields['status'], Status.OBSOLETE)
+        self.assertFalse(self.std.is_stale('status'))
+        self.notify.assert_called_once_with(
+            self.std, 'status', Status.OBSOLETE)
+
+    def test_revalidate_not_found(self):
+        """stale fields should be kept if they can't be refreshed"""
+        self.std.field_times['status'] = 0
+        with patch.object(Origin, 'get_field', return_value=NotFound):
+            self.std.revalidate('status').result()
+        self.assertIs(self.std.fields['status'], Status.VALID)
+        self.assertFalse(self.std.is_stale('status'))
+        self.notify.assert_not_called()
+
+    def test_revalidate_harvested(self):
+        """stale fields should be refreshed from the origins rather than
+        from harvested fields
+        """
+        self.std.field_times['status'] = 0
+        harvested.add(self.std.code, CCSNOrigin, CCSNSearchPage, {
+            'title': '建筑设计防火规范', 'title_english': None,
+            'status': Status.VALID, 'detail_page_url': None,
+        })
+        try:
+            with patch.object(Origin, 'get_field', return_value=Status.OBSOLETE):
+                self.std.revalidate('status').result()
+        finally:
+            harvested.clear()
+        self.assertIs(self.std.fields['status'], Status.OBSOLETE)
+        self.notify.assert_called_once_with(
+            self.std, 'status', Status.OBSOLETE)
+
+
+class PrefetchDownloadTestCase(TestCase):
+    """Testcase for resolving download urls ahead of downloading"""
+    def setUp(self):
+        self.std = Standard(StandardCode.parse('GB 50016-2014'))
+        # pretend the pages before the downloaders have been fetched
+        for origin_cls, fields in (
+                (CCSNOrigin, {'download_url': NotFound}),
+                (BZOrgOrigin, {'download_1_url': NotFound,
+                               'download_2_url': 'http://foo/bar.rar'}),
+                ):
+            self.std.get_subnode(origin_cls).fields.update(fields)
+
+    def test_prefetch(self):
+        """the first download url should be resolved"""
+        with patch.object(Origin, 'request') as request:
+            origin, url = self.std.prefetch_download()
+        request.assert_not_called()
+        self.assertIsInstance(origin, BZOrgOrigin)
+        self.assertEqual(url, 'http://foo/bar.rar')
+
+    def test_prefetch_head(self):
+        """the download url should be requested by HEAD"""
+        with patch.object(Origin, 'request') as request:
+            self.std.prefetch_download(head=True)
+        request.assert_called_once_with(
+            'http://foo/bar.rar', method='HEAD', allow_redirects=True)
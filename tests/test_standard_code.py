@@ -1,4 +1,5 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 from sscn.standard import StandardCode as StdCode
 
@@ -79,3 +80,48 @@ class StandardCodeTestCase(TestCase):
         self.assertEqual(str(code), 'GB/T 50001.1-2010')
         code = code._replace(is_mandatory=True)
         self.assertEqual(str(code), 'GB 50001.1-2010')
+
+    def test_parse_memoized(self):
+        """equal codes should be parsed into the same instance"""
+        code = StdCode.parse('GB/T 50001-2017')
+        self.assertIs(StdCode.parse('GB/T 50001-2017'), code)
+        self.assertIs(StdCode.parse('gbt50001_2017'), code)
+        with self.assertRaises(ValueError):
+            StdCode.parse('not a code')
+
+        StdCode.clear_cache()
+        self.assertIsNot(StdCode.parse('GB/T 50001-2017'), code)
+
+    def test_intern_bounded(self):
+        """the cache should be cleared once full, keeping parsed and
+        interned instances consistent
+        """
+        StdCode.clear_cache()
+        with patch.object(StdCode, 'PARSE_CACHE_SIZE', 4):
+            first = StdCode.parse('GB 1-2000')
+            self.assertIs(StdCode.parse('GB 1-2000'), first)
+            self.assertIs(StdCode.intern(StdCode('1', 'GB', True, 2000)), first)
+            self.assertEqual(StdCode.parse_many('GB 1-2000'), [first])
+            StdCode.parse('GB 2-2000')
+            StdCode.parse('GB 3-2000')
+            self.assertLessEqual(len(StdCode._cache), 4)
+            second = StdCode.parse('GB 1-2000')
+            self.assertIsNot(second, first)
+            self.assertIs(StdCode.intern(StdCode('1', 'GB', True, 2000)), second)
+        StdCode.clear_cache()
+
+    def test_slots(self):
+        """instances shouldn't carry a `__dict__`"""
+        code = StdCode.parse('GB 50016-2014')
+        self.assertFalse(hasattr(code, '__dict__'))
+
+    def test_parse_many(self):
+        """test finding all codes in a text"""
+        codes = StdCode.parse_many(
+            '替代GB 50016-2006;gb 50045-95;被GB/T 50001.1-2017代替')
+        self.assertEqual(codes, [
+            StdCode('50016', 'GB', True, 2006),
+            StdCode('50045', 'GB', True, 1995),
+            StdCode('50001', 'GB', False, 2017, 1),
+        ])
+        self.assertIs(codes[0], StdCode.parse('GB 50016-2006'))
@@ -0,0 +1,129 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from sscn.utils import NotFound
+from sscn.settings import settings
+from sscn.standard import StandardCode
+from sscn.supersession import SupersessionGraph, resolve_code
+
+
+parse = StandardCode.parse
+
+
+class SupersessionGraphTestCase(TestCase):
+    """Testcase for class `SupersessionGraph`"""
+    def setUp(self):
+        self.graph = SupersessionGraph(':memory:')
+        self.graph.record(
+            parse('GB 50016-2014'),
+            substitute='GB 50016-2018',
+            replaced=['GB 50016-2006', 'GB 50045-95'],
+            )
+        self.graph.record(parse('GB 50016-2018'))
+
+    def test_latest(self):
+        """obsolete codes should resolve to the current version"""
+        for code in ('GB 50016-2006', 'GB 50045-95', 'GB 50016-2014',
+                     'GB 50016-2018'):
+            with self.subTest(code=code):
+                self.assertEqual(
+                    self.graph.latest(parse(code)), parse('GB 50016-2018'))
+
+    def test_latest_non_concret(self):
+        """non-concret codes should resolve to the newest version"""
+        self.assertEqual(
+            self.graph.latest(parse('GB/T 50016')), parse('GB 50016-2018'))
+        self.assertEqual(
+            self.graph.latest(parse('GB 50045')), parse('GB 50016-2018'))
+        self.assertIsNone(self.graph.latest(parse('GB 1')))
+
+    def test_partial_substitutes(self):
+        """partial substitutions shouldn't be followed"""
+        self.graph.record(
+            parse('GB 50001-2017'), partial_substitutes=['GB 50002-2010'])
+        self.assertEqual(
+            self.graph.latest(parse('GB 50002-2010')), parse('GB 50002-2010'))
+
+    def test_resolve_refresh(self):
+        """stale versions should be refreshed lazily"""
+        self.graph.record_versions([parse('GB 50001-2010')])
+
+        def refresh(code):
+            if code == parse('GB 50001-2010'):
+                self.graph.record(code, substitute='GB 50001-2017')
+            else:
+                self.graph.record(code)
+            return True
+
+        with patch.object(self.graph, 'refresh', side_effect=refresh) as mock:
+            self.assertEqual(
+                self.graph.resolve(parse('GB 50001')), parse('GB 50001-2017'))
+            self.assertEqual(mock.call_count, 2)
+
+            # fresh edges are resolved locally
+            self.assertEqual(
+                self.graph.resolve(parse('GB 50001-2010')),
+                parse('GB 50001-2017'))
+            self.assertEqual(mock.call_count, 2)
+
+    def test_resolve_nowait(self):
+        """codes should be resolved locally, and refreshed in background
+        at most once within the ttl
+        """
+        with patch('sscn.supersession.background') as background:
+            self.assertEqual(
+                self.graph.resolve_nowait(parse('GB 50016')),
+                parse('GB 50016-2018'))
+            background.submit.assert_called_once_with(
+                self.graph.resolve, parse('GB 50016'))
+
+            self.graph.resolve_nowait(parse('GB 50016'))
+            self.assertEqual(background.submit.call_count, 1)
+
+    def test_resolve_nowait_unknown(self):
+        """codes of no known version should be resolved at once, and
+        looked up at most once within the ttl
+        """
+        def refresh_series(code):
+            self.graph.record_versions([parse('GB 1-2020')])
+
+        with patch('sscn.supersession.background') as background, \
+             patch.object(self.graph, 'refresh', return_value=True), \
+             patch.object(self.graph, 'refresh_series',
+                          side_effect=refresh_series) as mock:
+            self.assertEqual(
+                self.graph.resolve_nowait(parse('GB 1')), parse('GB 1-2020'))
+            background.submit.assert_not_called()
+
+            mock.side_effect = None
+            self.assertIsNone(self.graph.resolve_nowait(parse('GB 2')))
+            self.assertIsNone(self.graph.resolve_nowait(parse('GB 2')))
+            self.assertEqual(mock.call_count, 2)
+
+    def test_resolve_code_first(self):
+        """the first resolution of a code should be a concret code"""
+        def refresh_series(code):
+            self.graph.record_versions([parse('GB 1-2020')])
+
+        settings['AUTO_LATEST'] = True
+        try:
+            with patch('sscn.supersession.graph', self.graph), \
+                 patch('sscn.supersession.background'), \
+                 patch.object(self.graph, 'refresh', return_value=True), \
+                 patch.object(self.graph, 'refresh_series',
+                              side_effect=refresh_series):
+                code = resolve_code(parse('GB 1'))
+        finally:
+            settings.user_settings.pop('AUTO_LATEST', None)
+        self.assertEqual(code, parse('GB 1-2020'))
+        self.assertTrue(code.is_concret())
+
+    def test_refresh_not_found(self):
+        """codes whose fields can't be fetched should be marked checked"""
+        code = parse('GB 50001-2010')
+        self.graph.record_versions([code])
+        self.assertTrue(self.graph.is_stale(code))
+        with patch('sscn.supersession.Standard') as standard:
+            standard.return_value.get_field.return_value = NotFound
+            self.assertFalse(self.graph.refresh(code))
+        self.assertFalse(self.graph.is_stale(code))
@@ -0,0 +1,72 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from sscn.settings import settings
+from sscn.tracing import tracer
+from sscn.standard import Standard, StandardCode
+from sscn.origins.ccsn import CCSNOrigin
+from tests.fixtures import FIXTURES, make_response
+
+
+class TracingTestCase(TestCase):
+    """Testcase for tracing field resolution"""
+    def setUp(self):
+        tracer.clear()
+        settings['TRACING'] = True
+        self.std = Standard(StandardCode.parse('GB 50016-2014'))
+        origin = self.std.get_subnode(CCSNOrigin)
+        origin.fields['detail_page_url'] = FIXTURES['ccsn_detail'][0]
+
+    def tearDown(self):
+        settings.user_settings.pop('TRACING', None)
+        tracer.clear()
+
+    def get_issued_by(self):
+        """Get a field through the ccsn detail page fixture."""
+        with patch.object(Standard, 'iter_subnode_cls',
+                          return_value=(CCSNOrigin,)), \
+             patch.object(CCSNOrigin, 'request',
+                          return_value=make_response('ccsn_detail')):
+            return self.std.get_field('issued_by')
+
+    def test_nested(self):
+        """spans should be nested in the order of the calls"""
+        self.get_issued_by()
+        events = {event['name']: event for event in tracer.events}
+        chain = ['Standard.get_field', 'CCSNOrigin.get_field',
+                 'CCSNDetailPage.fetch', 'parse_response']
+        for outer, inner in zip(chain, chain[1:]):
+            outer, inner = events[outer], events[inner]
+            self.assertLessEqual(outer['ts'], inner['ts'])
+            self.assertGreaterEqual(
+                outer['ts'] + outer['dur'], inner['ts'] + inner['dur'])
+        self.assertEqual(events['Standard.get_field']['args']['hit'], False)
+        self.assertEqual(events['Standard.get_field']['args']['found'], True)
+        self.assertEqual(events['CCSNDetailPage.fetch']['args']['result'], 'ok')
+
+    def test_hit(self):
+        """cached fields should be traced as hits"""
+        self.get_issued_by()
+        tracer.clear()
+        self.get_issued_by()
+        self.assertEqual(len(tracer), 1)
+        self.assertEqual(tracer.events[0]['args']['hit'], True)
+
+    def test_off(self):
+        """nothing should be recorded while tracing is off"""
+        settings['TRACING'] = False
+        self.get_issued_by()
+        self.assertEqual(len(tracer), 0)
+
+    def test_export(self):
+        """spans should be exported as trace-event json"""
+        self.get_issued_by()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / 'trace.json'
+            tracer.export(path)
+            trace = json.loads(path.read_text(encoding='UTF-8'))
+        phases = {event['ph'] for event in trace['traceEvents']}
+        self.assertEqual(phases, {'M', 'X'})